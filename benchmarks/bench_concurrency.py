@@ -0,0 +1,72 @@
+"""
+Load test for the async tool handlers: calls list_events through FastMCP's
+in-memory transport at increasing concurrency, with a fake Calendar backend
+that takes --latency seconds per request. With blocking handlers throughput
+stays at one call per latency period; with the handlers offloaded to the
+worker pool it scales with concurrency up to MCP_TOOL_WORKERS.
+
+Run from the project root:
+    python -m benchmarks.bench_concurrency [--latency 0.1] [--calls 64] [--concurrency 1 4 16]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import httplib2
+from fastmcp import Client
+from googleapiclient.discovery import build_from_document
+
+from google_auth.services.discovery import load_discovery_document
+from google_auth.services.service_pool import service_pool
+
+
+class SlowCalendarHttp:
+    """An httplib2 stand-in that answers every request with an empty event list after a delay."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        time.sleep(self.latency)
+        return httplib2.Response({"status": 200}), json.dumps({"items": []}).encode()
+
+
+async def run_level(client: Client, calls: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call():
+        async with semaphore:
+            await client.call_tool("list_events", {"time_min": "2030-01-01T00:00:00Z"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_call() for _ in range(calls)))
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.1, help="Seconds per fake API request.")
+    parser.add_argument('--calls', type=int, default=64)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    args = parser.parse_args()
+
+    # Measure the worker pool, not the client-side rate limit.
+    os.environ.setdefault('GOOGLE_API_RATE_CALENDAR', '10000')
+
+    service = build_from_document(load_discovery_document('calendar', 'v3'), http=SlowCalendarHttp(args.latency))
+    service_pool.install('calendar', service)
+
+    from mcp_server.run_calendar_mcp import mcp
+
+    print(f"{'concurrency':>11} {'seconds':>8} {'calls/s':>8}")
+    async with Client(mcp) as client:
+        for concurrency in args.concurrency:
+            elapsed = await run_level(client, args.calls, concurrency)
+            print(f"{concurrency:>11} {elapsed:>8.2f} {args.calls / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Compares the cost of building the Calendar and Gmail clients:
+
+  network  - build(..., static_discovery=False), fetches the discovery document (opt-in)
+  static   - build(...), parses googleapiclient's packaged copy on every build
+  bundled  - build_from_document() with the document read once per process
+  pooled   - ServicePool.get() once the client is warm, i.e. every call after the first
+
+Run from the project root:
+    python -m benchmarks.bench_discovery_startup [--rounds 20] [--network]
+"""
+
+import argparse
+import statistics
+import time
+
+import httplib2
+from googleapiclient.discovery import build, build_from_document
+
+from google_auth.services import discovery
+from google_auth.services.service_pool import ServicePool
+
+
+def _time_ms(fn, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list[float]):
+    print(f"  {label:<8} first={timings[0]:8.2f} ms  median={statistics.median(timings):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--network', action='store_true', help="Also time fetching the document over the network.")
+    args = parser.parse_args()
+
+    for api_name, api_version in discovery.BUNDLED_APIS:
+        print(f"{api_name} {api_version}")
+        http = httplib2.Http()
+
+        if args.network:
+            _report("network", _time_ms(
+                lambda: build(api_name, api_version, http=http, static_discovery=False, cache_discovery=False),
+                args.rounds,
+            ))
+
+        _report("static", _time_ms(lambda: build(api_name, api_version, http=http), args.rounds))
+
+        discovery._document_text.cache_clear()
+        _report("bundled", _time_ms(
+            lambda: build_from_document(discovery.load_discovery_document(api_name, api_version), http=http),
+            args.rounds,
+        ))
+
+        pool = ServicePool()
+        pool.register(
+            api_name,
+            load_credentials=lambda: _BenchCredentials(),
+            build_service=lambda creds: build_from_document(
+                discovery.load_discovery_document(api_name, api_version), http=http
+            ),
+        )
+        _report("pooled", _time_ms(lambda: pool.get(api_name), args.rounds))
+
+
+class _BenchCredentials:
+    """Stand-in credentials that never expire, so the pool never rebuilds."""
+    valid = True
+    refresh_token = None
+    expiry = None
+
+
+if __name__ == "__main__":
+    main()
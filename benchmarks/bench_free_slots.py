@@ -0,0 +1,56 @@
+"""
+Measures how find_free_slots scales with the number of busy intervals, using
+synthetic calendars (no network or credentials needed).
+
+Run from the project root:
+    python -m benchmarks.bench_free_slots [--calendars 10 25 50] [--events 20 100 500]
+"""
+
+import argparse
+import random
+import time
+
+from google_auth.services.intervals import find_free_slots
+
+DAY = 24 * 3600
+
+
+def synthetic_calendar(events: int, window_start: float, window_end: float, rng: random.Random) -> list:
+    """Random meetings of 15 minutes to 2 hours, aligned to quarter hours."""
+    intervals = []
+    for _ in range(events):
+        start = window_start + rng.randrange(0, int(window_end - window_start), 900)
+        intervals.append((start, start + rng.choice((900, 1800, 3600, 5400, 7200))))
+    return intervals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calendars', type=int, nargs='+', default=[10, 25, 50])
+    parser.add_argument('--events', type=int, nargs='+', default=[20, 100, 500], help="Meetings per calendar.")
+    parser.add_argument('--days', type=int, default=365, help="Length of the search window.")
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    window_start = 1_893_456_000.0  # 2030-01-01T00:00:00Z
+    window_end = window_start + args.days * DAY
+
+    print(f"{'calendars':>9} {'events/cal':>10} {'intervals':>10} {'median ms':>10} {'slots':>6}")
+    for calendars in args.calendars:
+        for events in args.events:
+            busy = []
+            for _ in range(calendars):
+                busy.extend(synthetic_calendar(events, window_start, window_end, rng))
+
+            timings, slots = [], []
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                slots = find_free_slots(busy, window_start, window_end, duration=1800, max_slots=10, working_hours=(9, 17))
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            print(f"{calendars:>9} {events:>10} {len(busy):>10} {timings[len(timings) // 2]:>10.2f} {len(slots):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import-time regression check for the MCP servers, based on `python -X importtime`.
+
+For each server module it reports the total import time and the heaviest
+imports. It fails (exit code 1) if a server eagerly imports one of the
+DEFERRED modules, which should load on the first tool call instead of before
+the stdio handshake, or if the import takes longer than --budget-ms.
+
+Run from the project root:
+    python -m benchmarks.bench_import_time [--budget-ms 1500] [--top 8]
+"""
+
+import argparse
+import subprocess
+import sys
+
+SERVERS = [
+    'mcp_server.run_calendar_mcp',
+    'mcp_server.run_gmail_mcp',
+    'mcp_server.run_meet_mcp',
+    'mcp_server.run_workspace_mcp',
+]
+
+# Heavy modules that must only be imported on first use.
+DEFERRED = [
+    'google_auth_oauthlib',
+    'googleapiclient.discovery',
+    'googleapiclient.http',
+    'google_auth_httplib2',
+    'google.oauth2.credentials',
+    'google.apps.meet_v2',
+    'grpc',
+]
+
+_PROBE = "import sys, {module}; print(','.join(m for m in {deferred!r} if m in sys.modules))"
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Returns (self_us, cumulative_us, module) rows, with indentation kept in the module name."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def measure(module: str) -> tuple[int, list, list[str]]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module, deferred=DEFERRED)],
+        capture_output=True, text=True, check=True,
+    )
+    rows = parse_importtime(result.stderr)
+    total = next(cumulative for _, cumulative, name in rows if name.strip() == module)
+    eager = [name for name in result.stdout.strip().split(',') if name]
+    return total, rows, eager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=None, help="Fail if a server takes longer than this to import.")
+    parser.add_argument('--top', type=int, default=8, help="How many of the heaviest imports to list per server.")
+    args = parser.parse_args()
+
+    failed = False
+    for module in SERVERS:
+        total, rows, eager = measure(module)
+        print(f"{module}: {total / 1000:.1f} ms")
+
+        # Direct imports of the server module (importtime indents them by three spaces), heaviest first.
+        direct = [(cumulative, name.strip()) for _, cumulative, name in rows if name.startswith('   ') and not name.startswith('    ')]
+        for cumulative, name in sorted(direct, reverse=True)[:args.top]:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+        if eager:
+            print(f"  FAIL: imported at startup: {', '.join(eager)}")
+            failed = True
+        if args.budget_ms is not None and total / 1000 > args.budget_ms:
+            print(f"  FAIL: over the {args.budget_ms:.0f} ms budget")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
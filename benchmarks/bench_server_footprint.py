@@ -0,0 +1,59 @@
+"""
+Compares the startup time and peak memory of running the Calendar, Gmail and
+Meet servers as three processes against the unified workspace server.
+Each measurement imports the server module(s) in a fresh interpreter, which is
+what a container pays before the stdio handshake.
+
+Run from the project root:
+    python -m benchmarks.bench_server_footprint [--rounds 3]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {imports}
+{setup}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+SEPARATE = ['mcp_server.run_calendar_mcp', 'mcp_server.run_gmail_mcp', 'mcp_server.run_meet_mcp']
+UNIFIED_SETUP = "mcp_server.run_workspace_mcp.mount_services(['calendar', 'gmail', 'meet'])"
+
+
+def probe(imports: str, setup: str = "") -> dict:
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(imports=imports, setup=setup)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    separate_seconds, separate_rss = [], []
+    unified_seconds, unified_rss = [], []
+    for _ in range(args.rounds):
+        runs = [probe(module) for module in SEPARATE]
+        separate_seconds.append(sum(run["seconds"] for run in runs))
+        separate_rss.append(sum(run["max_rss_kb"] for run in runs))
+        run = probe('mcp_server.run_workspace_mcp', UNIFIED_SETUP)
+        unified_seconds.append(run["seconds"])
+        unified_rss.append(run["max_rss_kb"])
+
+    print(f"{'deployment':<22} {'startup s':>10} {'peak RSS MB':>12}")
+    print(f"{'3 separate servers':<22} {statistics.median(separate_seconds):>10.2f} {statistics.median(separate_rss) / 1024:>12.1f}")
+    print(f"{'unified server':<22} {statistics.median(unified_seconds):>10.2f} {statistics.median(unified_rss) / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Benchmarks the MCP tools end to end against a local fake of the Calendar,
+Gmail and Meet APIs (see fake_google.py), so it runs offline, e.g. in CI.
+
+Every scenario calls one tool --calls times at --concurrency through the
+unified server's FastMCP in-memory transport. The whole path is measured:
+tool dispatch, the worker pool, the request executor, googleapiclient or the
+Meet REST client, and real HTTP to the fake. Reported per scenario:
+p50/p95/p99 latency, throughput, and calls that returned an error. With
+--memory, a second pass under tracemalloc reports peak traced memory per
+concurrent call.
+
+Run from the project root:
+    python -m benchmarks.bench_tools [--latency 0.02] [--jitter 0.01] [--error-rate 0.0]
+        [--calls 100] [--concurrency 8] [--scenarios list_events send_email ...]
+        [--memory] [--json results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+from fastmcp import Client
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+
+
+def _window(fake: FakeGoogle, days: int) -> dict:
+    return {'time_min': fake.base_time.isoformat(), 'time_max': (fake.base_time + timedelta(days=days)).isoformat()}
+
+
+def _new_event(fake: FakeGoogle, index: int) -> dict:
+    start = fake.base_time + timedelta(days=30, minutes=30 * index)
+    return {'summary': f"Bench {index}", 'start_datetime': start.isoformat(), 'end_datetime': (start + timedelta(minutes=30)).isoformat()}
+
+
+def _sync_inbox(fake: FakeGoogle, index: int) -> dict:
+    # A new message arrives between polls, as for a monitoring agent.
+    fake.receive_message()
+    return {'format': 'metadata'}
+
+
+# name -> (tool, function (fake, call index, attachment path) -> arguments)
+SCENARIOS = {
+    'list_events': ('list_events', lambda fake, i, _: {'max_results': 50}),
+    'list_events_paginated': ('list_events', lambda fake, i, _: {'max_results': 250, 'paginate': True}),
+    'list_events_expanded': ('list_events', lambda fake, i, _: {'max_results': 250, 'single_events': False, **_window(fake, 30)}),
+    'get_event_by_id': ('get_event_by_id', lambda fake, i, _: {'event_id': fake.random_event_id()}),
+    'create_event': ('create_event', lambda fake, i, _: _new_event(fake, i)),
+    'update_event': ('update_event', lambda fake, i, _: {'event_id': fake.random_event_id(), 'updated_summary': f"Updated {i}"}),
+    'schedule_meeting': ('schedule_meeting', lambda fake, i, _: {**_new_event(fake, i), 'attendees': ['team']}),
+    'find_free_slots': ('find_free_slots', lambda fake, i, _: {'calendar_ids': ['primary', 'team'], 'duration_minutes': 60, **_window(fake, 7)}),
+    'batch_calendar_operations': ('batch_calendar_operations', lambda fake, i, _: {
+        'operations': [{'op': 'get', 'event_id': fake.random_event_id()} for _ in range(20)]}),
+    'sync_events': ('sync_events', lambda fake, i, _: {'reset': True}),
+    'list_emails': ('list_emails', lambda fake, i, _: {'max_results': 50}),
+    'list_emails_full': ('list_emails', lambda fake, i, _: {'max_results': 50, 'format': 'full'}),
+    'sync_inbox': ('sync_inbox', lambda fake, i, _: _sync_inbox(fake, i)),
+    'bulk_modify_emails': ('bulk_modify_emails', lambda fake, i, _: {'query': 'in:inbox', 'remove_label_ids': ['UNREAD'], 'max_messages': 2500}),
+    'get_email_details': ('get_email_details', lambda fake, i, _: {'message_id': fake.random_message_id()}),
+    'send_email': ('send_email', lambda fake, i, path: {'to': 'someone@example.com', 'subject': f"Bench {i}", 'body': "Hello", 'attachments': [path]}),
+    'send_email_async': ('send_email', lambda fake, i, _: {'to': 'someone@example.com', 'subject': f"Bench async {i}", 'body': "Hello", 'async_mode': True}),
+    'create_meet_space': ('create_meet_space', lambda fake, i, _: {}),
+    'get_meet_space': ('get_meet_space', lambda fake, i, _: {'name': fake.any_space_name()}),
+}
+
+# Scenarios that measure the steady state, after one call has done the initial full sync.
+PRIMED = {'sync_inbox'}
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run_scenario(client: Client, fake: FakeGoogle, name: str, calls: int, concurrency: int, attachment: str) -> dict:
+    tool, make_args = SCENARIOS[name]
+    if name in PRIMED:
+        await client.call_tool(tool, make_args(fake, -1, attachment))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one_call(index: int):
+        nonlocal errors
+        arguments = make_args(fake, index, attachment)
+        async with semaphore:
+            started = time.perf_counter()
+            result = await client.call_tool(tool, arguments, raise_on_error=False)
+            latencies.append(time.perf_counter() - started)
+        text = result.content[0].text if result.content else ''
+        if result.is_error or text.startswith('{"error"'):
+            errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_call(index) for index in range(calls)))
+    elapsed = time.perf_counter() - started
+    return {
+        'scenario': name,
+        'calls': calls,
+        'errors': errors,
+        'p50_ms': 1000 * statistics.median(latencies),
+        'p95_ms': 1000 * percentile(latencies, 0.95),
+        'p99_ms': 1000 * percentile(latencies, 0.99),
+        'calls_per_s': calls / elapsed,
+    }
+
+
+async def measure_memory(client: Client, fake: FakeGoogle, name: str, calls: int, concurrency: int, attachment: str) -> float:
+    """Returns the peak traced memory, in KB, per concurrent call of a scenario."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await run_scenario(client, fake, name, calls, concurrency, attachment)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - baseline) / 1024 / min(calls, concurrency)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.02, help="Seconds the fake waits per HTTP request.")
+    parser.add_argument('--jitter', type=float, default=0.01, help="Extra random latency, up to this many seconds.")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of requests that fail.")
+    parser.add_argument('--error-status', type=int, default=503, help="HTTP status of injected errors (e.g. 429, 503).")
+    parser.add_argument('--calls', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--attachment-kb', type=int, default=64, help="Size of the send_email attachment.")
+    parser.add_argument('--memory', action='store_true', help="Also measure memory per call under tracemalloc (slower).")
+    parser.add_argument('--keep-rate-limits', action='store_true', help="Keep the client-side API rate limits.")
+    parser.add_argument('--json', help="Write the results to this file.")
+    args = parser.parse_args()
+
+    if not args.keep_rate_limits:
+        for api in ('CALENDAR', 'GMAIL', 'MEET'):
+            os.environ.setdefault(f'GOOGLE_API_RATE_{api}', '100000')
+
+    # Sync cursors, Meet spaces and queued jobs of the fake go to a throwaway
+    # directory, never into the real credentials/ of a deployment.
+    state_dir = tempfile.mkdtemp(prefix='bench_tools-')
+    os.environ.setdefault('GOOGLE_SYNC_STATE_FILE', os.path.join(state_dir, 'sync_state.json'))
+    os.environ.setdefault('MEET_SPACE_POOL_FILE', os.path.join(state_dir, 'meet_space_pool.json'))
+    os.environ.setdefault('MCP_JOB_QUEUE_PATH', os.path.join(state_dir, 'jobs.sqlite3'))
+
+    fake = FakeGoogle(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status).start()
+
+    from mcp_server.run_workspace_mcp import mcp, mount_services
+
+    mount_services(['calendar', 'gmail', 'meet'])
+    # After mount_services, which resets the pool to the shared credentials.
+    install_fake_services(fake)
+
+    results = []
+    with tempfile.NamedTemporaryFile(suffix='.pdf') as attachment:
+        attachment.write(os.urandom(args.attachment_kb * 1024))
+        attachment.flush()
+
+        async with Client(mcp) as client:
+            # get_meet_space needs at least one space to exist.
+            await client.call_tool('create_meet_space', {})
+            print(f"{'scenario':<26} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'calls/s':>8} {'errors':>6}"
+                  + (f" {'KB/call':>8}" if args.memory else ''))
+            for name in args.scenarios:
+                result = await run_scenario(client, fake, name, args.calls, args.concurrency, attachment.name)
+                if args.memory:
+                    result['kb_per_call'] = await measure_memory(
+                        client, fake, name, min(args.calls, 4 * args.concurrency), args.concurrency, attachment.name)
+                results.append(result)
+                print(f"{name:<26} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                      f"{result['calls_per_s']:>8.1f} {result['errors']:>6}"
+                      + (f" {result['kb_per_call']:>8.1f}" if args.memory else ''))
+
+    fake.stop()
+    print(f"\nfake backend requests: {json.dumps(fake.requests, sort_keys=True)}", file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'settings': vars(args), 'results': results, 'backend_requests': fake.requests}, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,541 @@
+"""
+An in-process fake of the Google Calendar v3, Gmail v1 and Meet v2 REST
+endpoints the MCP tools use, for benchmarks that must run offline.
+
+The fake listens on 127.0.0.1 on a free port. Each HTTP request waits
+`latency` seconds plus up to `jitter` seconds. A fraction `error_rate` of
+requests fails with `error_status`; 429s carry a Retry-After of 0. Errors
+are also injected into the sub-requests of batch requests. fail_next()
+scripts the failures of the next requests instead, e.g. for tests. Call
+counts are kept in `fake.requests`.
+
+    fake = FakeGoogle(latency=0.05).start()
+    install_fake_services(fake)   # points the service pool at the fake
+    ...
+    fake.stop()
+"""
+
+import base64
+import email
+import email.parser
+import email.utils
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+_REASONS = {200: 'OK', 204: 'No Content', 304: 'Not Modified', 308: 'Resume Incomplete', 404: 'Not Found', 412: 'Precondition Failed',
+            405: 'Method Not Allowed', 429: 'Too Many Requests', 500: 'Internal Server Error', 502: 'Bad Gateway',
+            503: 'Service Unavailable', 504: 'Gateway Timeout'}
+
+_WORDS = "meeting project update review budget team launch agenda notes follow design draft plan".split()
+
+
+def _rfc3339(moment: datetime) -> str:
+    return moment.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+
+def _error(status: int, message: str) -> tuple:
+    return status, {}, {"error": {"code": status, "message": message, "errors": [{"reason": "backendError", "message": message}]}}
+
+
+class FakeGoogle:
+    """The fake backend. Its state (events, messages, spaces) lives in memory."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 503,
+                 events: int = 500, messages: int = 500, body_chars: int = 2000, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = {}
+        self._scripted_errors = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._server = None
+        self.base_time = datetime.now(UTC).replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+        self.calendars = {'primary': {}, 'team': {}}
+        for index in range(events):
+            calendar = self.calendars['primary' if index % 2 == 0 else 'team']
+            start = self.base_time + timedelta(minutes=30 * self._random.randrange(0, 24 * 2 * 14))
+            self._store_event(calendar, {
+                'summary': f"{self._random.choice(_WORDS).title()} {index}",
+                'start': {'dateTime': _rfc3339(start)},
+                'end': {'dateTime': _rfc3339(start + timedelta(minutes=self._random.choice((30, 60, 90))))},
+                'attendees': [{'email': f'person{n}@example.com'} for n in range(self._random.randrange(1, 5))],
+            })
+        self.messages = {}
+        for index in range(messages):
+            message_id = f"{index:016x}"
+            self.messages[message_id] = self._make_message(message_id, index, body_chars)
+        self.spaces = {}
+        self.sent = []  # sizes of the sent messages
+        self.last_sent = None  # the raw bytes of the latest one
+        self._uploads = {}
+        self._sent_by_message_id = {}
+        # Mailbox history: (historyId, record) pairs after _history_floor.
+        self.history_id = 1000 + messages
+        self._history = []
+        self._history_floor = self.history_id
+
+    # -- server -------------------------------------------------------------
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, payload = fake.dispatch(self.command, self.path, dict(self.headers), body, top_level=True)
+                if isinstance(payload, (dict, list)):
+                    payload = json.dumps(payload).encode()
+                    headers.setdefault('Content-Type', 'application/json; charset=UTF-8')
+                payload = payload or b''
+                self.send_response(status, _REASONS.get(status))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fake-google', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    # -- dispatch -----------------------------------------------------------
+
+    def _count(self, key: str):
+        with self._lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def _inject_error(self):
+        with self._lock:
+            failing = self.error_rate and self._random.random() < self.error_rate
+        if not failing:
+            return None
+        self._count('injected_errors')
+        status, headers, payload = _error(self.error_status, "Injected error")
+        if self.error_status == 429:
+            headers['Retry-After'] = '0'
+        return status, headers, payload
+
+    def fail_next(self, status: int, count: int = 1, retry_after: str = None, after_processing: bool = False):
+        """
+        Makes the next `count` requests fail with `status`, with a Retry-After
+        header if given. With `after_processing`, each request takes effect
+        before it fails, like a 502 from a frontend whose backend has acted.
+        """
+        headers = {'Retry-After': retry_after} if retry_after is not None else {}
+        with self._lock:
+            self._scripted_errors.extend([(status, headers, after_processing)] * count)
+
+    def _scripted_error(self):
+        with self._lock:
+            if not self._scripted_errors:
+                return None
+            status, headers, after_processing = self._scripted_errors.pop(0)
+        self._count('scripted_errors')
+        _, _, payload = _error(status, "Scripted error")
+        return (status, dict(headers), payload), after_processing
+
+    def dispatch(self, method: str, target: str, headers: dict, body: bytes, top_level: bool = False) -> tuple:
+        """Handles one request and returns (status, headers, payload)."""
+        split = urlsplit(target)
+        path = unquote(split.path)
+        query = {key: values[-1] for key, values in parse_qs(split.query).items()}
+        headers = {name.lower(): value for name, value in headers.items()}
+
+        if top_level:
+            self._count('http')
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            if delay:
+                time.sleep(delay)
+            if path == '/batch' or path.startswith('/batch/'):
+                self._count('batch')
+                return self._batch(headers, body)
+        injected = self._inject_error()
+        if injected:
+            return injected
+        scripted = self._scripted_error()
+        if scripted is None:
+            return self._route(method, path, query, headers, body)
+        error, after_processing = scripted
+        if after_processing:
+            self._route(method, path, query, headers, body)
+        return error
+
+    def _route(self, method: str, path: str, query: dict, headers: dict, body: bytes) -> tuple:
+        parts = [part for part in path.split('/') if part]
+        try:
+            if parts[:2] == ['calendar', 'v3']:
+                return self._calendar(method, parts[2:], query, headers, body)
+            if parts[:2] == ['gmail', 'v1'] or parts[:3] == ['upload', 'gmail', 'v1']:
+                return self._gmail(method, parts, query, body)
+            if parts[:1] == ['upload-session']:
+                return self._resumable_chunk(parts[1], headers, body)
+            if parts[:2] == ['v2', 'spaces']:
+                return self._meet(method, parts[2:], body)
+        except (KeyError, IndexError, ValueError) as e:
+            return _error(400, f"Bad request: {e}")
+        return _error(404, f"No fake for {method} {path}")
+
+    def _batch(self, headers: dict, body: bytes) -> tuple:
+        content_type = headers['content-type']
+        message = email.message_from_bytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        boundary = uuid.uuid4().hex
+        out = []
+        for part in message.get_payload():
+            request_text = part.get_payload()
+            if isinstance(request_text, list):
+                request_text = request_text[0].as_string()
+            head, _, sub_body = request_text.replace('\r\n', '\n').partition('\n\n')
+            request_line, *header_lines = head.split('\n')
+            sub_method, sub_target, _ = request_line.split(' ', 2)
+            sub_headers = dict(line.split(': ', 1) for line in header_lines if ': ' in line)
+            self._count('batch_subrequests')
+            status, _, payload = self.dispatch(sub_method, sub_target, sub_headers, sub_body.encode())
+            content_id = part['Content-ID'].strip('<>')
+            payload_text = json.dumps(payload) if payload is not None else ''
+            out.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\nContent-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{payload_text}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        return 200, {'Content-Type': f'multipart/mixed; boundary={boundary}'}, ''.join(out).encode()
+
+    # -- calendar -----------------------------------------------------------
+
+    def _store_event(self, calendar: dict, event: dict, event_id: str = None) -> dict:
+        event = dict(event)
+        event['id'] = event_id or event.get('id') or f"evt{next(self._ids):08d}"
+        event['etag'] = f'"{next(self._ids)}"'
+        event['status'] = event.get('status', 'confirmed')
+        event['updated'] = _rfc3339(datetime.now(UTC))
+        event.setdefault('htmlLink', f"https://calendar.google.com/event?eid={event['id']}")
+        calendar[event['id']] = event
+        return event
+
+    def _calendar(self, method: str, parts: list, query: dict, headers: dict, body: bytes) -> tuple:
+        self._count('calendar')
+        if parts == ['freeBusy']:
+            return self._free_busy(json.loads(body))
+        calendar_id, resource = parts[1], parts[2:]
+        calendar = self.calendars.setdefault(calendar_id, {})
+        with self._lock:
+            if resource == ['events'] and method == 'GET':
+                return self._list_events(calendar, query)
+            if resource == ['events'] and method == 'POST':
+                event = json.loads(body)
+                if event.get('id') in calendar:
+                    return _error(409, "The requested identifier already exists.")
+                if query.get('conferenceDataVersion') == '1' and 'createRequest' in event.get('conferenceData', {}):
+                    event['conferenceData'] = self._create_conference(event['conferenceData']['createRequest'])
+                    event['hangoutLink'] = event['conferenceData']['entryPoints'][0]['uri']
+                return 200, {}, self._store_event(calendar, event)
+
+            event = calendar.get(resource[1])
+            if event is None:
+                return _error(404, "Not Found")
+            if headers.get('if-match') and headers['if-match'] != event['etag']:
+                return _error(412, "Precondition Failed")
+            if method == 'GET':
+                if headers.get('if-none-match') == event['etag']:
+                    return 304, {}, None
+                return 200, {}, event
+            if method == 'DELETE':
+                del calendar[event['id']]
+                return 204, {}, None
+            if method == 'PATCH':
+                return 200, {}, self._store_event(calendar, {**event, **json.loads(body)}, event['id'])
+            if method == 'PUT':
+                return 200, {}, self._store_event(calendar, json.loads(body), event['id'])
+        return _error(405, "Method not allowed")
+
+    def _create_conference(self, create_request: dict) -> dict:
+        code = '-'.join(''.join(self._random.choice('abcdefghijkmnopqrstuvwxyz') for _ in range(n)) for n in (3, 4, 3))
+        return {
+            'createRequest': {**create_request, 'status': {'statusCode': 'success'}},
+            'conferenceSolution': {'key': {'type': 'hangoutsMeet'}, 'name': 'Google Meet'},
+            'conferenceId': code,
+            'entryPoints': [{'entryPointType': 'video', 'uri': f"https://meet.google.com/{code}", 'label': f"meet.google.com/{code}"}],
+        }
+
+    def _list_events(self, calendar: dict, query: dict) -> tuple:
+        events = sorted(calendar.values(), key=lambda event: event['start'].get('dateTime', ''))
+        if query.get('timeMin'):
+            time_min = query['timeMin'][:19]
+            events = [event for event in events if event['end'].get('dateTime', '')[:19] >= time_min]
+        if query.get('timeMax'):
+            time_max = query['timeMax'][:19]
+            events = [event for event in events if event['start'].get('dateTime', '')[:19] < time_max]
+        offset = int(query.get('pageToken') or 0)
+        size = int(query.get('maxResults') or 250)
+        page = {'kind': 'calendar#events', 'items': events[offset:offset + size]}
+        if offset + size < len(events):
+            page['nextPageToken'] = str(offset + size)
+        else:
+            page['nextSyncToken'] = f"sync{next(self._ids)}"
+        return 200, {}, page
+
+    def _free_busy(self, request: dict) -> tuple:
+        time_min, time_max = request['timeMin'][:19], request['timeMax'][:19]
+        calendars = {}
+        with self._lock:
+            for item in request.get('items', []):
+                calendar = self.calendars.get(item['id'])
+                if calendar is None:
+                    calendars[item['id']] = {'errors': [{'domain': 'global', 'reason': 'notFound'}], 'busy': []}
+                    continue
+                calendars[item['id']] = {'busy': [
+                    {'start': event['start']['dateTime'], 'end': event['end']['dateTime']}
+                    for event in calendar.values()
+                    if event['start']['dateTime'][:19] < time_max and event['end']['dateTime'][:19] > time_min
+                ]}
+        return 200, {}, {'kind': 'calendar#freeBusy', 'timeMin': request['timeMin'], 'timeMax': request['timeMax'], 'calendars': calendars}
+
+    # -- gmail --------------------------------------------------------------
+
+    def _make_message(self, message_id: str, index: int, body_chars: int) -> dict:
+        words = ' '.join(self._random.choice(_WORDS) for _ in range(body_chars // 6))[:body_chars]
+        headers = [
+            {'name': 'From', 'value': f'sender{index % 17}@example.com'},
+            {'name': 'To', 'value': 'bench@example.com'},
+            {'name': 'Subject', 'value': f"{self._random.choice(_WORDS).title()} #{index}"},
+            {'name': 'Date', 'value': email.utils.format_datetime(self.base_time - timedelta(minutes=index))},
+            {'name': 'Message-ID', 'value': f'<{message_id}@example.com>'},
+            {'name': 'Received', 'value': 'from mx.example.com by mx.google.com; ' * 4},
+        ]
+        parts = [
+            {'partId': '0', 'mimeType': 'text/plain', 'filename': '', 'headers': [{'name': 'Content-Type', 'value': 'text/plain; charset="UTF-8"'}],
+             'body': {'size': len(words), 'data': _b64(words)}},
+            {'partId': '1', 'mimeType': 'text/html', 'filename': '', 'headers': [{'name': 'Content-Type', 'value': 'text/html; charset="UTF-8"'}],
+             'body': {'size': len(words) + 30, 'data': _b64(f'<html><body><p>{words}</p></body></html>')}},
+        ]
+        if index % 5 == 0:
+            parts.append({'partId': '2', 'mimeType': 'application/pdf', 'filename': f'report{index}.pdf',
+                          'headers': [], 'body': {'size': 120000, 'attachmentId': f'att{index}'}})
+        return {
+            'id': message_id, 'threadId': message_id, 'labelIds': ['INBOX', 'UNREAD'],
+            'snippet': words[:100], 'historyId': str(1000 + index), 'internalDate': '0', 'sizeEstimate': 2 * len(words),
+            'payload': {'partId': '', 'mimeType': 'multipart/alternative', 'filename': '', 'headers': headers,
+                        'body': {'size': 0}, 'parts': parts},
+        }
+
+    def _gmail(self, method: str, parts: list, query: dict, body: bytes) -> tuple:
+        self._count('gmail')
+        if parts[0] == 'upload':
+            return self._send(query, body)
+        resource = parts[4:]  # after gmail/v1/users/me
+        if resource == ['profile']:
+            return 200, {}, {'emailAddress': 'bench@example.com', 'messagesTotal': len(self.messages), 'historyId': str(self.history_id)}
+        if resource == ['history']:
+            return self._list_history(query)
+        if resource == ['messages', 'batchModify'] and method == 'POST':
+            return self._batch_modify(json.loads(body))
+        if resource == ['messages'] and method == 'GET' and query.get('q', '').startswith('rfc822msgid:'):
+            stub = self._sent_by_message_id.get(query['q'].split(':', 1)[1])
+            return 200, {}, {'messages': [stub], 'resultSizeEstimate': 1} if stub else {'resultSizeEstimate': 0}
+        if resource == ['messages'] and method == 'GET':
+            ids = sorted(self.messages)
+            offset = int(query.get('pageToken') or 0)
+            size = int(query.get('maxResults') or 100)
+            page = {'messages': [{'id': message_id, 'threadId': message_id} for message_id in ids[offset:offset + size]],
+                    'resultSizeEstimate': len(ids)}
+            if offset + size < len(ids):
+                page['nextPageToken'] = str(offset + size)
+            return 200, {}, page
+        if resource[0] == 'messages' and method == 'GET':
+            message = self.messages.get(resource[1])
+            if message is None:
+                return _error(404, "Requested entity was not found.")
+            return 200, {}, self._format_message(message, query.get('format', 'full'))
+        return _error(404, "Not Found")
+
+    @staticmethod
+    def _format_message(message: dict, format: str) -> dict:
+        if format == 'minimal':
+            return {key: message[key] for key in ('id', 'threadId', 'labelIds', 'snippet', 'historyId', 'sizeEstimate')}
+        if format == 'metadata':
+            payload = {key: value for key, value in message['payload'].items() if key != 'parts'}
+            return {**message, 'payload': payload}
+        return message
+
+    def _send(self, query: dict, body: bytes) -> tuple:
+        if query.get('uploadType') == 'resumable':
+            session = uuid.uuid4().hex
+            with self._lock:
+                self._uploads[session] = bytearray()
+            return 200, {'Location': f"{self.url}/upload-session/{session}"}, b''
+        return 200, {}, self._sent_message(body)
+
+    def _resumable_chunk(self, session: str, headers: dict, body: bytes) -> tuple:
+        with self._lock:
+            upload = self._uploads[session]
+            upload.extend(body)
+        # Content-Range: bytes <first>-<last>/<total>
+        last, total = headers['content-range'].split(' ', 1)[1].split('-')[1].split('/')
+        if total != '*' and int(last) + 1 >= int(total):
+            return 200, {}, self._sent_message(bytes(upload))
+        return 308, {'Range': f"bytes=0-{last}"}, b''
+
+    def _sent_message(self, raw: bytes) -> dict:
+        message_id = f"sent{next(self._ids):012x}"
+        stub = {'id': message_id, 'threadId': message_id, 'labelIds': ['SENT']}
+        header = email.parser.BytesParser().parsebytes(raw, headersonly=True).get('Message-ID')
+        with self._lock:
+            self.sent.append(len(raw))
+            self.last_sent = raw
+            if header:
+                self._sent_by_message_id[header] = stub
+            self._add_history({'messagesAdded': [{'message': stub}]})
+        return stub
+
+    def _batch_modify(self, request: dict) -> tuple:
+        if len(request['ids']) > 1000:
+            return _error(400, "Too many ids; the limit is 1000.")
+        add, remove = request.get('addLabelIds', []), request.get('removeLabelIds', [])
+        with self._lock:
+            for message_id in request['ids']:
+                message = self.messages.get(message_id)
+                if message is None:
+                    continue
+                labels = [label for label in message['labelIds'] if label not in remove]
+                message['labelIds'] = labels + [label for label in add if label not in labels]
+                stub = {key: message[key] for key in ('id', 'threadId', 'labelIds')}
+                if add:
+                    self._add_history({'labelsAdded': [{'message': stub, 'labelIds': add}]})
+                if remove:
+                    self._add_history({'labelsRemoved': [{'message': stub, 'labelIds': remove}]})
+        return 204, {}, b''
+
+    def _add_history(self, record: dict):
+        # Called with self._lock held.
+        self.history_id += 1
+        self._history.append((self.history_id, {'id': str(self.history_id), **record}))
+
+    def _list_history(self, query: dict) -> tuple:
+        with self._lock:
+            if int(query['startHistoryId']) < self._history_floor:
+                return _error(404, "Requested entity was not found.")
+            records = [record for history_id, record in self._history if history_id > int(query['startHistoryId'])]
+            current = str(self.history_id)
+        if query.get('labelId'):
+            label = query['labelId']
+            records = [
+                record for record in records
+                if 'messagesDeleted' in record
+                or any(label in change['message'].get('labelIds', []) for changes in record.values() if isinstance(changes, list) for change in changes)
+            ]
+        offset = int(query.get('pageToken') or 0)
+        size = int(query.get('maxResults') or 100)
+        page = {'history': records[offset:offset + size], 'historyId': current}
+        if offset + size < len(records):
+            page['nextPageToken'] = str(offset + size)
+        return 200, {}, page
+
+    # -- meet ---------------------------------------------------------------
+
+    def _meet(self, method: str, parts: list, body: bytes) -> tuple:
+        self._count('meet')
+        with self._lock:
+            if not parts and method == 'POST':
+                code = '-'.join(''.join(self._random.choice('abcdefghijkmnopqrstuvwxyz') for _ in range(n)) for n in (3, 4, 3))
+                space = {'name': f"spaces/{uuid.uuid4().hex[:12]}", 'meetingUri': f"https://meet.google.com/{code}",
+                         'meetingCode': code, 'config': {'accessType': 'TRUSTED', 'entryPointAccess': 'ALL'}}
+                self.spaces[space['name']] = space
+                return 200, {}, space
+            space = self.spaces.get(f"spaces/{parts[0]}") if parts else None
+            if space is None:
+                return _error(404, "Space not found")
+            return 200, {}, space
+
+    # -- helpers for scenarios ----------------------------------------------
+
+    def receive_message(self, body_chars: int = 500) -> str:
+        """Simulates a new message arriving in the inbox and returns its id."""
+        with self._lock:
+            message_id = f"in{next(self._ids):014x}"
+            message = self._make_message(message_id, len(self.messages), body_chars)
+            self.messages[message_id] = message
+            stub = {key: message[key] for key in ('id', 'threadId', 'labelIds')}
+            self._add_history({'messagesAdded': [{'message': stub}]})
+        return message_id
+
+    def delete_message(self, message_id: str):
+        """Simulates a message being deleted for good, e.g. from another client."""
+        with self._lock:
+            message = self.messages.pop(message_id)
+            stub = {key: message[key] for key in ('id', 'threadId', 'labelIds')}
+            self._add_history({'messagesDeleted': [{'message': stub}]})
+
+    def expire_history(self):
+        """Forgets the mailbox history, so older historyIds get a 404 like on Gmail."""
+        with self._lock:
+            self._history.clear()
+            self._history_floor = self.history_id
+
+    def random_event_id(self, calendar_id: str = 'primary') -> str:
+        with self._lock:
+            return self._random.choice(list(self.calendars[calendar_id]))
+
+    def random_message_id(self) -> str:
+        with self._lock:
+            return self._random.choice(list(self.messages))
+
+    def any_space_name(self) -> str:
+        with self._lock:
+            return next(iter(self.spaces), None)
+
+
+def install_fake_services(fake: FakeGoogle, services=('calendar', 'gmail', 'meet')):
+    """
+    Puts Calendar, Gmail and Meet clients pointed at the fake into the
+    shared service pool. They use the same thread-safe transport as the real
+    clients, with a static access token.
+    """
+    from google.oauth2.credentials import Credentials
+
+    from google_auth.services.service_pool import build_thread_safe_service, service_pool
+
+    creds = Credentials(token='fake-token')
+    if 'calendar' in services:
+        service_pool.install('calendar', build_thread_safe_service('calendar', 'v3', creds, root_url=f"{fake.url}/"), creds)
+    if 'gmail' in services:
+        service_pool.install('gmail', build_thread_safe_service('gmail', 'v1', creds, root_url=f"{fake.url}/"), creds)
+    if 'meet' in services:
+        from google.apps import meet_v2
+        from google.apps.meet_v2.services.spaces_service.transports.rest import SpacesServiceRestTransport
+
+        transport = SpacesServiceRestTransport(host=fake.url.split('://', 1)[1], credentials=creds, url_scheme='http')
+        service_pool.install('meet', meet_v2.SpacesServiceClient(transport=transport), creds)
@@ -0,0 +1,73 @@
+# google_auth/services/batching.py
+
+import time
+
+from googleapiclient.errors import HttpError
+
+from google_auth.services.request_executor import api_for, backoff_delay, error_status, governor, retry_delay
+
+# Maximum number of sub-requests Google accepts in one batch request.
+CALENDAR_BATCH_LIMIT = 50
+GMAIL_BATCH_LIMIT = 100
+
+
+def http_error_details(error: Exception) -> dict:
+    """Turns an exception from a (sub-)request into a JSON-friendly dict."""
+    if isinstance(error, HttpError):
+        return {"status": error.resp.status, "message": error.reason or str(error)}
+    return {"status": None, "message": str(error)}
+
+
+def is_retryable(error: Exception, request) -> bool:
+    # A lost batch response says nothing about which sub-requests ran, so
+    # connection errors are never retried. Neither are 5xx for inserts and
+    # other POSTs, as in request_executor.execute().
+    if error_status(error) is None:
+        return False
+    return retry_delay(error, 0, idempotent=getattr(request, 'method', 'GET') != 'POST') is not None
+
+
+def execute_batch(service, requests: list, chunk_size: int, max_retries: int = 3, backoff: float = 1.0) -> list[tuple]:
+    """
+    Executes HttpRequest objects through the service's batch endpoint.
+
+    The requests are split into batches of at most `chunk_size`. Sub-requests
+    that fail with a retryable status (429, or 5xx unless they are POSTs) are
+    retried on their own, with exponential backoff. Nothing else in the batch is sent again. Every
+    sub-request counts against the API's rate limit in request_executor.py.
+
+    Returns a list of (response, error) tuples in the same order as `requests`.
+    Exactly one of the two is None for every entry.
+    """
+    results = [(None, None)] * len(requests)
+    api = api_for(requests[0]) if requests else None
+    pending = list(range(len(requests)))
+
+    for attempt in range(max_retries + 1):
+        failed = []
+
+        def callback(request_id, response, exception):
+            index = int(request_id)
+            results[index] = (response, exception)
+            if exception is not None and is_retryable(exception, requests[index]):
+                failed.append(index)
+
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            batch = service.new_batch_http_request(callback=callback)
+            for index in chunk:
+                batch.add(requests[index], request_id=str(index))
+            try:
+                governor.call(batch.execute, api, max_retries=0, tokens=len(chunk))
+            except Exception as e:
+                # The batch request itself failed, so none of its sub-requests ran.
+                for index in chunk:
+                    results[index] = (None, e)
+                failed.extend(index for index in chunk if is_retryable(e, requests[index]))
+
+        if not failed or attempt == max_retries:
+            break
+        time.sleep(backoff_delay(attempt, backoff))
+        pending = sorted(failed)
+
+    return results
@@ -0,0 +1,100 @@
+# google_auth/services/blocking.py
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from google_auth.services.instrumentation import instrument_tool, mark_started, mark_submitted
+from google_auth.services.metrics import register_stats
+
+# The googleapiclient (httplib2) and Meet (gRPC) clients are blocking. Tool
+# handlers hand their work to this bounded pool so that one slow Google call
+# doesn't hold up every other request on the MCP server's event loop.
+MAX_WORKERS = int(os.environ.get('MCP_TOOL_WORKERS', '16'))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='google-api')
+
+# Tools that fan out to several independent Google calls run them on a
+# separate pool: a tool already holds a worker of the pool above, and waiting
+# on that same pool could deadlock it.
+FANOUT_WORKERS = int(os.environ.get('MCP_FANOUT_WORKERS', '8'))
+
+_fanout_executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='google-api-fanout')
+
+_counters = {"queued": 0, "running": 0, "max_queued": 0, "completed": 0}
+_counters_lock = threading.Lock()
+
+
+def _update(**deltas):
+    with _counters_lock:
+        for name, delta in deltas.items():
+            _counters[name] += delta
+        _counters["max_queued"] = max(_counters["max_queued"], _counters["queued"])
+
+
+def _run_counted(fn, *args, **kwargs):
+    _update(queued=-1, running=1)
+    mark_started()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _update(running=-1, completed=1)
+
+
+def worker_pool_stats() -> dict:
+    """Returns how many tool calls are waiting for, and running on, the worker pool."""
+    with _counters_lock:
+        stats = dict(_counters)
+    stats["max_workers"] = MAX_WORKERS
+    return stats
+
+
+register_stats('worker_pool', worker_pool_stats)
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Runs a blocking function on the shared worker pool and awaits its result."""
+    loop = asyncio.get_running_loop()
+    # Carry context variables over to the worker thread.
+    context = contextvars.copy_context()
+    _update(queued=1)
+    mark_submitted()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, _run_counted, fn, *args, **kwargs))
+
+
+def _capture(fn):
+    try:
+        return fn(), None
+    except Exception as e:
+        return None, e
+
+
+def run_parallel(calls: list) -> list[tuple]:
+    """
+    Runs blocking callables concurrently, from inside a tool, and waits for
+    all of them. Returns a list of (result, error) tuples in the order of
+    `calls`; exactly one of the two is None for every entry. Google calls
+    made this way still go through the rate limits of request_executor.py.
+    """
+    if len(calls) <= 1:
+        return [_capture(fn) for fn in calls]
+    # Each call gets a copy of the caller's context, so its upstream calls count towards the tool call.
+    futures = [_fanout_executor.submit(contextvars.copy_context().run, _capture, fn) for fn in calls]
+    return [future.result() for future in futures]
+
+
+def offload(fn):
+    """
+    Turns a blocking tool function into an async one that runs on the worker
+    pool. The wrapper keeps the signature and docstring of `fn`, so FastMCP
+    derives the same tool schema from it. Every call is recorded by
+    instrumentation.py.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(fn, *args, **kwargs)
+
+    return instrument_tool(wrapper)
@@ -0,0 +1,37 @@
+# google_auth/services/calendar_sync.py
+
+from googleapiclient.errors import HttpError
+
+from google_auth.services.pagination import iter_pages
+
+# The largest page the Calendar API returns for events().list.
+MAX_PAGE_SIZE = 2500
+
+
+def fetch_event_changes(service, calendar_id: str, sync_token: str = None) -> tuple[list, str, bool]:
+    """
+    Fetches the events of a calendar that changed since `sync_token`, or all
+    events when no token is given. Cancelled events are included with
+    status 'cancelled', so callers can drop them.
+
+    If Google has expired the sync token (410 Gone), this falls back to a
+    full sync.
+
+    Returns a tuple of (events, next_sync_token, full_sync).
+    """
+    params = {'calendarId': calendar_id, 'singleEvents': True, 'maxResults': MAX_PAGE_SIZE}
+    if sync_token:
+        params['syncToken'] = sync_token
+
+    events, next_sync_token = [], None
+    try:
+        for page in iter_pages(service.events().list, **params):
+            events.extend(page.get('items', []))
+            # Only the last page carries the token for the next sync.
+            next_sync_token = page.get('nextSyncToken', next_sync_token)
+    except HttpError as e:
+        if e.resp.status == 410 and sync_token:
+            return fetch_event_changes(service, calendar_id)
+        raise
+
+    return events, next_sync_token, sync_token is None
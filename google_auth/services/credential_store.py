@@ -0,0 +1,328 @@
+# google_auth/services/credential_store.py
+
+import contextlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+
+from google_auth.services.instrumentation import add_auth_time
+from google_auth.services.metrics import register_stats
+
+# Where tokens are persisted: 'file' (default), 'sqlite' or 'env'.
+TOKEN_BACKEND = os.environ.get('GOOGLE_TOKEN_BACKEND', 'file')
+TOKEN_DB = os.environ.get('GOOGLE_TOKEN_DB', 'credentials/tokens.sqlite3')
+
+# Refresh tokens this long before they expire, so tool calls never pay for
+# an inline refresh.
+REFRESH_MARGIN = timedelta(minutes=5)
+REFRESH_CHECK_INTERVAL = 60  # seconds
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class FileTokenBackend:
+    """
+    Stores a token as a JSON file. Writes are atomic: the token is written to a
+    temporary file and renamed into place. Refreshes are serialized across
+    processes with an flock on a sibling .lock file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> str:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            return f.read()
+
+    def save(self, token_json: str):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(token_json)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    @contextlib.contextmanager
+    def lock(self):
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SQLiteTokenBackend:
+    """
+    Stores tokens in a shared SQLite database, one row per token. The lock is
+    a BEGIN IMMEDIATE transaction, so replicas sharing the database refresh
+    one at a time.
+    """
+
+    def __init__(self, db_path: str, key: str):
+        self.db_path = db_path
+        self.key = key
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS tokens (key TEXT PRIMARY KEY, token TEXT NOT NULL, updated_at REAL NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def load(self) -> str:
+        row = self._connect().execute("SELECT token FROM tokens WHERE key = ?", (self.key,)).fetchone()
+        return row[0] if row else None
+
+    def save(self, token_json: str):
+        self._connect().execute(
+            "INSERT INTO tokens (key, token, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET token = excluded.token, updated_at = excluded.updated_at",
+            (self.key, token_json, time.time()),
+        )
+
+    @contextlib.contextmanager
+    def lock(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+
+class EnvTokenBackend:
+    """
+    Reads a token from an environment variable, e.g. one injected from a secret
+    manager. Refreshed tokens are kept in memory only.
+    """
+
+    def __init__(self, variable: str):
+        self.variable = variable
+
+    def load(self) -> str:
+        return os.environ.get(self.variable) or os.environ.get('GOOGLE_TOKEN_JSON')
+
+    def save(self, token_json: str):
+        pass
+
+    @contextlib.contextmanager
+    def lock(self):
+        yield
+
+
+def backend_for(token_file: str):
+    """Returns the token backend selected by GOOGLE_TOKEN_BACKEND for a token file."""
+    key = os.path.splitext(os.path.basename(token_file))[0]
+    if TOKEN_BACKEND == 'sqlite':
+        return SQLiteTokenBackend(TOKEN_DB, key)
+    if TOKEN_BACKEND == 'env':
+        # credentials/token_gmail.json -> GOOGLE_TOKEN_JSON_TOKEN_GMAIL
+        return EnvTokenBackend(f"GOOGLE_TOKEN_JSON_{key.upper()}")
+    return FileTokenBackend(token_file)
+
+
+@dataclass
+class _ManagedToken:
+    scopes: list[str]
+    label: str
+    backend: object
+    creds: object = None
+    needs_login: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class CredentialManager:
+    """
+    Holds OAuth credentials in memory, keyed by token file.
+
+    Refreshes are single-flight: one thread per process holds the token's
+    lock, and one process per shared backend holds the backend lock. Before
+    refreshing, the manager re-reads the backend, so if another replica has
+    already refreshed, its token is adopted instead of refreshing again. A
+    daemon thread refreshes tokens that are about to expire.
+
+    Refreshes happen in place on the same Credentials object, so clients
+    built from it keep working without being rebuilt.
+    """
+
+    def __init__(self, refresh_margin: timedelta = REFRESH_MARGIN, check_interval: float = REFRESH_CHECK_INTERVAL):
+        self._refresh_margin = refresh_margin
+        self._check_interval = check_interval
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._counters = {"loads": 0, "refreshes": 0, "refresh_failures": 0, "adopted": 0, "logins": 0}
+
+    def get(self, scopes: list[str], token_file: str, label: str = "Google"):
+        """Returns valid credentials for the token file, or None if they can't be obtained."""
+        with self._lock:
+            token = self._tokens.get(token_file)
+            if token is None:
+                token = self._tokens[token_file] = _ManagedToken(scopes, label, backend_for(token_file))
+
+        started = time.perf_counter()
+        with token.lock:
+            if token.creds is None or not token.creds.valid:
+                self._load_or_refresh(token)
+            creds = token.creds if token.creds is not None and token.creds.valid else None
+        add_auth_time(time.perf_counter() - started)
+
+        self._ensure_refresher()
+        return creds
+
+    def refresh_expiring(self):
+        """Refreshes every managed token that expires within the refresh margin."""
+        for token in list(self._tokens.values()):
+            with token.lock:
+                # A token that needs a login waits for the next tool call; the
+                # refresher never starts the browser flow itself.
+                if token.creds is not None and not token.needs_login and self._expiring(token.creds):
+                    self._load_or_refresh(token, interactive=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        counters["tokens"] = len(self._tokens)
+        counters["backend"] = TOKEN_BACKEND
+        return counters
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _expiring(self, creds) -> bool:
+        if creds.expiry is None:
+            return False
+        return creds.expiry - self._refresh_margin <= datetime.now(UTC).replace(tzinfo=None)
+
+    def _load_or_refresh(self, token: _ManagedToken, interactive: bool = True):
+        """
+        Brings token.creds up to date. Called with token.lock held. Only an
+        interactive caller starts the browser login, and it does so without
+        holding the backend lock, which other replicas may be waiting on.
+        """
+        with token.backend.lock():
+            if not self._update_locked(token) or not interactive:
+                return
+
+        from google_auth.services.credentials import run_browser_flow
+        creds = run_browser_flow(token.scopes, token.label)
+        if creds is None:
+            return
+        with token.backend.lock():
+            token.creds = creds
+            token.needs_login = False
+            token.backend.save(creds.to_json())
+        self._count("logins")
+
+    def _update_locked(self, token: _ManagedToken) -> bool:
+        """Adopts or refreshes the token. Called with both locks held; returns True if only a login can help."""
+        from google.oauth2.credentials import Credentials
+        from google.auth.exceptions import RefreshError
+        from google.auth.transport.requests import Request
+
+        stored = None
+        try:
+            stored_json = token.backend.load()
+            if stored_json:
+                stored = Credentials.from_authorized_user_info(json.loads(stored_json), token.scopes)
+                self._count("loads")
+        except Exception as e:
+            print(f"Error loading {token.label} credentials: {e}", file=sys.stderr)
+
+        # Another process may already have refreshed the stored token, or
+        # logged in again and stored a new refresh token.
+        if (stored is not None and token.creds is not None and stored.refresh_token
+                and stored.refresh_token != token.creds.refresh_token):
+            self._adopt(token, stored)
+            token.needs_login = False
+            self._count("adopted")
+        elif stored is not None and stored.valid and not self._expiring(stored):
+            self._adopt(token, stored)
+            token.needs_login = False
+            self._count("adopted")
+        if token.creds is not None and token.creds.valid and not self._expiring(token.creds):
+            return False
+
+        creds = token.creds or stored
+        if creds is None or not creds.refresh_token or token.needs_login:
+            return True
+        print(f"{token.label} credentials expiring. Refreshing token...", file=sys.stderr)
+        try:
+            creds.refresh(Request())
+        except RefreshError as e:
+            # The refresh token was revoked or expired; only a new login helps.
+            print(f"Error refreshing {token.label} token: {e}. Please re-authenticate.", file=sys.stderr)
+            self._count("refresh_failures")
+            token.needs_login = True
+            return False
+        except Exception as e:
+            # Probably transient; keep the current token and try again later.
+            print(f"Error refreshing {token.label} token: {e}", file=sys.stderr)
+            self._count("refresh_failures")
+            return False
+        token.creds = creds
+        token.backend.save(creds.to_json())
+        self._count("refreshes")
+        return False
+
+    @staticmethod
+    def _adopt(token: _ManagedToken, stored):
+        if token.creds is None:
+            token.creds = stored
+        else:
+            # Update in place so clients holding the old object see the new token.
+            token.creds.token = stored.token
+            token.creds.expiry = stored.expiry
+            # After a new login elsewhere, the old refresh token is revoked.
+            # Credentials has no setter for it.
+            token.creds._refresh_token = stored.refresh_token
+
+    def _ensure_refresher(self):
+        with self._lock:
+            if self._refresher is not None and self._refresher.is_alive():
+                return
+            self._refresher = threading.Thread(
+                target=self._refresh_loop, name="credential-refresher", daemon=True
+            )
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            time.sleep(self._check_interval)
+            try:
+                self.refresh_expiring()
+            except Exception as e:
+                print(f"Error in background credential refresh: {e}", file=sys.stderr)
+
+
+credential_manager = CredentialManager()
+register_stats('credentials', credential_manager.stats)
@@ -0,0 +1,51 @@
+# google_auth/services/credentials.py
+
+import os.path
+import sys
+
+CREDENTIALS_FILE = 'credentials/credentials.json'
+
+def load_credentials(scopes: list[str], token_file: str, label: str = "Google"):
+    """
+    Handles the entire Google OAuth 2.0 flow for the given scopes and returns
+    the credentials, using `token_file` to remember them between runs.
+
+    This function will:
+    1. Return the token already held in memory if it is still valid.
+    2. Otherwise load the stored token, refreshing it if it has expired.
+    3. If there is no usable token, trigger the one-time browser login flow
+       to create it.
+
+    Tokens are managed by `credential_store.credential_manager`, which keeps
+    them in memory, refreshes them before they expire and persists them
+    atomically to the configured backend.
+
+    Returns:
+        Authorized Credentials or None on failure.
+    """
+    from google_auth.services.credential_store import credential_manager
+    return credential_manager.get(scopes, token_file, label)
+
+
+def run_browser_flow(scopes: list[str], label: str = "Google"):
+    """
+    Runs the one-time OAuth browser login flow and returns the new credentials,
+    or None if the client secrets file is missing.
+    """
+    print(f"No valid {label} token found. Starting authentication flow...", file=sys.stderr)
+    if not os.path.exists(CREDENTIALS_FILE):
+        print(f"ERROR: The credentials file was not found at '{CREDENTIALS_FILE}'", file=sys.stderr)
+        print("Please download it from the Google Cloud Console and place it there.", file=sys.stderr)
+        return None
+
+    # The OAuth browser flow is only needed once, so import it only here.
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
+    # This line will start the local server and open the user's browser.
+    flow = InstalledAppFlow.from_client_secrets_file(
+        CREDENTIALS_FILE, scopes
+    )
+    flow.redirect_uri = 'http://localhost:8080/'
+    creds = flow.run_local_server(port=8080, authorization_prompt_message="")
+    print(f"Authentication successful. Saving {label} credentials.", file=sys.stderr)
+    return creds
@@ -0,0 +1,93 @@
+# google_auth/services/discovery.py
+
+import argparse
+import functools
+import json
+import os
+import sys
+import urllib.request
+
+# Discovery documents are bundled with the project so that building a
+# Calendar or Gmail client never needs a round trip to the discovery endpoint.
+BUNDLED_DISCOVERY_DIR = os.path.join(os.path.dirname(__file__), 'discovery_documents')
+DISCOVERY_DIR = os.environ.get('GOOGLE_DISCOVERY_DIR', BUNDLED_DISCOVERY_DIR)
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest'
+
+# The APIs whose discovery documents are bundled in DISCOVERY_DIR.
+BUNDLED_APIS = [('calendar', 'v3'), ('gmail', 'v1')]
+
+
+def _document_path(api_name: str, api_version: str, directory: str = None) -> str:
+    return os.path.join(directory or DISCOVERY_DIR, f"{api_name}.{api_version}.json")
+
+
+@functools.lru_cache(maxsize=None)
+def _document_text(api_name: str, api_version: str) -> str:
+    path = _document_path(api_name, api_version)
+    if os.path.exists(path):
+        with open(path) as f:
+            return f.read()
+
+    # Fall back to the copy that ships with google-api-python-client.
+    from googleapiclient.discovery_cache import get_static_doc
+    content = get_static_doc(api_name, api_version)
+    if content is None:
+        raise FileNotFoundError(f"No discovery document found for {api_name} {api_version}")
+    return content
+
+
+def load_discovery_document(api_name: str, api_version: str) -> dict:
+    """
+    Returns a freshly parsed discovery document for an API. The file is read
+    once per process; a new dict is returned each time because googleapiclient
+    fixes up method descriptions in place while building a Resource.
+    """
+    return json.loads(_document_text(api_name, api_version))
+
+
+def preload_discovery_documents(*apis: tuple[str, str]):
+    """Reads discovery documents ahead of the first tool call."""
+    for api_name, api_version in apis or BUNDLED_APIS:
+        _document_text(api_name, api_version)
+
+
+def update_discovery_documents(directory: str = BUNDLED_DISCOVERY_DIR) -> list[str]:
+    """
+    Downloads the current discovery documents and replaces the local copies
+    whose `revision` is older. Returns a line per API describing what happened.
+    """
+    report = []
+    for api_name, api_version in BUNDLED_APIS:
+        path = _document_path(api_name, api_version, directory)
+        local_revision = None
+        if os.path.exists(path):
+            with open(path) as f:
+                local_revision = json.load(f).get('revision')
+
+        url = DISCOVERY_URL.format(api=api_name, version=api_version)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            content = response.read().decode()
+        remote_revision = json.loads(content).get('revision')
+
+        if local_revision is not None and remote_revision <= local_revision:
+            report.append(f"{api_name} {api_version}: up to date (revision {local_revision})")
+            continue
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+        report.append(f"{api_name} {api_version}: updated {local_revision} -> {remote_revision}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the bundled Google discovery documents.")
+    parser.add_argument('--dir', default=BUNDLED_DISCOVERY_DIR, help="Directory holding the discovery documents.")
+    args = parser.parse_args()
+    try:
+        for line in update_discovery_documents(args.dir):
+            print(line)
+    except Exception as e:
+        print(f"Could not update discovery documents: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,235 @@
+# google_auth/services/event_store.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, UTC
+
+from google_auth.services.metrics import register_stats
+
+# The local event store is opt-in: set CALENDAR_EVENT_CACHE=1 to enable it.
+EVENT_CACHE_ENABLED = os.environ.get('CALENDAR_EVENT_CACHE', '0') == '1'
+# ':memory:' keeps the store in process; a file path makes it survive restarts.
+EVENT_CACHE_PATH = os.environ.get('CALENDAR_EVENT_CACHE_PATH', ':memory:')
+# How old (in seconds) a calendar's last sync may be before reads trigger a delta sync.
+EVENT_CACHE_MAX_STALENESS = float(os.environ.get('CALENDAR_EVENT_CACHE_MAX_STALENESS', '60'))
+EVENT_CACHE_MAX_BYTES = int(os.environ.get('CALENDAR_EVENT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    calendar_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start_ts REAL,
+    end_ts REAL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (calendar_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS events_by_start ON events (calendar_id, start_ts);
+CREATE INDEX IF NOT EXISTS events_by_end ON events (calendar_id, end_ts);
+CREATE INDEX IF NOT EXISTS events_by_access ON events (last_access);
+CREATE TABLE IF NOT EXISTS calendars (
+    calendar_id TEXT PRIMARY KEY,
+    sync_token TEXT,
+    synced_at REAL,
+    complete INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def to_timestamp(value) -> float:
+    """
+    Converts an ISO 8601 string or an event 'start'/'end' dict to a UTC epoch timestamp.
+    All-day dates are treated as midnight UTC.
+    """
+    if isinstance(value, dict):
+        value = value.get('dateTime') or value.get('date')
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.timestamp()
+
+
+class EventStore:
+    """
+    A local copy of calendar events with indexes on start and end time.
+
+    Calendars are filled and kept current from syncToken deltas (see
+    calendar_sync.py), and the calendar tools write their own changes
+    through. Once the store holds more than `max_bytes` of event JSON, the
+    least recently used calendars are evicted whole, so every calendar in
+    the store stays complete and keeps its delta sync. The calendar being
+    synced or written is never evicted, so one calendar larger than the
+    budget is kept alone rather than fully resynced on every read.
+    """
+
+    def __init__(self, path: str = EVENT_CACHE_PATH, max_bytes: int = EVENT_CACHE_MAX_BYTES, max_staleness: float = EVENT_CACHE_MAX_STALENESS):
+        self.max_bytes = max_bytes
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM events").fetchone()[0]
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "syncs": 0, "full_syncs": 0}
+
+    # --- Sync state ---
+
+    def sync_token(self, calendar_id: str) -> str:
+        """Returns the token for the next delta sync, or None if the calendar needs a full sync."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sync_token FROM calendars WHERE calendar_id = ? AND complete = 1", (calendar_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_stale(self, calendar_id: str):
+        """Forces a delta sync before the calendar is read from the store again."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE calendars SET synced_at = 0 WHERE calendar_id = ?", (calendar_id,))
+
+    def is_fresh(self, calendar_id: str) -> bool:
+        """True if the calendar is fully cached and was synced within the staleness bound."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at, complete FROM calendars WHERE calendar_id = ?", (calendar_id,)
+            ).fetchone()
+        return bool(row and row[1] and time.time() - row[0] <= self.max_staleness)
+
+    def apply_sync(self, calendar_id: str, events: list, sync_token: str, full_sync: bool):
+        """Applies the result of calendar_sync.fetch_event_changes to the store."""
+        now = time.time()
+        with self._lock, self._conn:
+            if full_sync:
+                self._bytes -= self._conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM events WHERE calendar_id = ?", (calendar_id,)
+                ).fetchone()[0]
+                self._conn.execute("DELETE FROM events WHERE calendar_id = ?", (calendar_id,))
+            for event in events:
+                if event.get('status') == 'cancelled':
+                    self._delete_locked(calendar_id, event['id'])
+                else:
+                    self._put_locked(calendar_id, event, now)
+            # A delta sync completes nothing: the calendar may have been evicted while it ran.
+            self._conn.execute(
+                "INSERT INTO calendars (calendar_id, sync_token, synced_at, complete) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (calendar_id) DO UPDATE SET sync_token = excluded.sync_token, synced_at = excluded.synced_at, "
+                "complete = MAX(calendars.complete, excluded.complete)",
+                (calendar_id, sync_token, now, int(full_sync)),
+            )
+            self._counters["syncs"] += 1
+            self._counters["full_syncs"] += int(full_sync)
+            self._evict_locked(keep=calendar_id)
+
+    # --- Reads ---
+
+    def get(self, calendar_id: str, event_id: str) -> dict:
+        """Returns the cached event, or None on a miss."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT data FROM events WHERE calendar_id = ? AND event_id = ?", (calendar_id, event_id)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["hits"] += 1
+            self._conn.execute(
+                "UPDATE events SET last_access = ? WHERE calendar_id = ? AND event_id = ?",
+                (time.time(), calendar_id, event_id),
+            )
+        return json.loads(row[0])
+
+    def query(self, calendar_id: str, time_min: float, time_max: float = None, max_results: int = None) -> list:
+        """
+        Returns the events of a calendar that overlap [time_min, time_max), ordered by
+        start time. Only meaningful if is_fresh(calendar_id) is True.
+        """
+        sql = "SELECT event_id, data FROM events WHERE calendar_id = ? AND end_ts > ?"
+        params = [calendar_id, time_min]
+        if time_max is not None:
+            sql += " AND start_ts < ?"
+            params.append(time_max)
+        sql += " ORDER BY start_ts"
+        if max_results:
+            sql += " LIMIT ?"
+            params.append(max_results)
+
+        with self._lock, self._conn:
+            rows = self._conn.execute(sql, params).fetchall()
+            self._counters["hits"] += 1
+            self._conn.executemany(
+                "UPDATE events SET last_access = ? WHERE calendar_id = ? AND event_id = ?",
+                [(time.time(), calendar_id, event_id) for event_id, _ in rows],
+            )
+        return [json.loads(data) for _, data in rows]
+
+    def record_miss(self):
+        with self._lock:
+            self._counters["misses"] += 1
+
+    # --- Write-through ---
+
+    def put(self, calendar_id: str, event: dict):
+        with self._lock, self._conn:
+            self._put_locked(calendar_id, event, time.time())
+            self._evict_locked(keep=calendar_id)
+
+    def delete(self, calendar_id: str, event_id: str):
+        with self._lock, self._conn:
+            self._delete_locked(calendar_id, event_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = self._conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            counters["bytes"] = self._bytes
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        counters["max_bytes"] = self.max_bytes
+        return counters
+
+    def _put_locked(self, calendar_id: str, event: dict, now: float):
+        data = json.dumps(event)
+        self._delete_locked(calendar_id, event['id'])
+        self._conn.execute(
+            "INSERT INTO events (calendar_id, event_id, start_ts, end_ts, size, last_access, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (calendar_id, event['id'], to_timestamp(event.get('start')), to_timestamp(event.get('end')), len(data), now, data),
+        )
+        self._bytes += len(data)
+
+    def _delete_locked(self, calendar_id: str, event_id: str):
+        row = self._conn.execute(
+            "DELETE FROM events WHERE calendar_id = ? AND event_id = ? RETURNING size", (calendar_id, event_id)
+        ).fetchone()
+        if row:
+            self._bytes -= row[0]
+
+    def _evict_locked(self, keep: str = None):
+        if self._bytes <= self.max_bytes:
+            return
+        # Evict down to 90% of the budget so we don't evict on every write.
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            "SELECT calendar_id, SUM(size), COUNT(*) FROM events GROUP BY calendar_id ORDER BY MAX(last_access)"
+        ).fetchall()
+        evicted = []
+        for calendar_id, size, count in rows:
+            if self._bytes <= target:
+                break
+            if calendar_id == keep:
+                continue
+            evicted.append((calendar_id,))
+            self._bytes -= size
+            self._counters["evictions"] += count
+        self._conn.executemany("DELETE FROM events WHERE calendar_id = ?", evicted)
+        # Without its sync token, the calendar gets a full sync when it is read again.
+        self._conn.executemany("DELETE FROM calendars WHERE calendar_id = ?", evicted)
+
+
+event_store = EventStore() if EVENT_CACHE_ENABLED else None
+if event_store is not None:
+    register_stats('calendar_event_store', event_store.stats)
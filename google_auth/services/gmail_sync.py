@@ -0,0 +1,70 @@
+# google_auth/services/gmail_sync.py
+
+from googleapiclient.errors import HttpError
+
+from google_auth.services.pagination import iter_pages
+
+# The largest page users().history().list returns.
+MAX_HISTORY_PAGE_SIZE = 500
+HISTORY_TYPES = ['messageAdded', 'messageDeleted', 'labelAdded', 'labelRemoved']
+
+
+class HistoryExpired(Exception):
+    """The stored historyId is too old (or invalid) for users().history().list; a full sync is needed."""
+
+
+def fetch_mailbox_changes(service, start_history_id: str, label_id: str = None) -> dict:
+    """
+    Lists what changed in the mailbox since `start_history_id`, following
+    every page of users().history().list. A message that was added and then
+    deleted within the window is only reported as deleted. Relabeled messages
+    are reported with their latest labels.
+
+    Returns {"added": [messages], "deleted": [ids], "relabeled": [messages],
+    "history_id": the mailbox's current historyId}, where messages are
+    {"id", "threadId", "labelIds"} stubs.
+    Raises HistoryExpired if Google no longer has history that far back (404).
+    """
+    params = {
+        'userId': 'me',
+        'startHistoryId': start_history_id,
+        'historyTypes': HISTORY_TYPES,
+        'maxResults': MAX_HISTORY_PAGE_SIZE,
+    }
+    if label_id:
+        params['labelId'] = label_id
+
+    added, relabeled, deleted = {}, {}, set()
+    history_id = start_history_id
+    try:
+        for page in iter_pages(service.users().history().list, **params):
+            history_id = page.get('historyId', history_id)
+            # Records come oldest first, so later records overwrite earlier ones.
+            for record in page.get('history', []):
+                for change in record.get('messagesAdded', []):
+                    message = change['message']
+                    added[message['id']] = message
+                    deleted.discard(message['id'])
+                for key in ('labelsAdded', 'labelsRemoved'):
+                    for change in record.get(key, []):
+                        message = change['message']
+                        if message['id'] in added:
+                            added[message['id']] = message
+                        else:
+                            relabeled[message['id']] = message
+                for change in record.get('messagesDeleted', []):
+                    message_id = change['message']['id']
+                    added.pop(message_id, None)
+                    relabeled.pop(message_id, None)
+                    deleted.add(message_id)
+    except HttpError as e:
+        if e.resp.status == 404:
+            raise HistoryExpired(str(e)) from e
+        raise
+
+    return {
+        "added": list(added.values()),
+        "deleted": sorted(deleted),
+        "relabeled": list(relabeled.values()),
+        "history_id": history_id,
+    }
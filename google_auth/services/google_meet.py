@@ -1,65 +1,45 @@
 # google_auth/services/google_meet.py
 
-import os
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from google.apps import meet_v2 
+import sys
+
+from google_auth.services.credentials import load_credentials
+from google_auth.services.service_pool import service_pool
 
 SCOPES = ['https://www.googleapis.com/auth/meetings.space.created']
 
-CREDENTIALS_FILE = 'credentials/credentials.json'
 TOKEN_FILE = 'credentials/token_meet.json'
 
-def get_meet_service():
+def get_meet_credentials():
     """
-    Handles the entire Google OAuth 2.0 flow and returns an authenticated
-    Google Meet API service object.
+    Returns the credentials for the Google Meet API, or None on failure.
+    Runs the one-time browser login flow if no token is saved yet; see credentials.py.
     """
-    creds = None
-
-    if os.path.exists(TOKEN_FILE):
-        try: 
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-        except Exception as e:
-            print(f"Error loading credentials from {TOKEN_FILE}: {e}")
-            if os.path.exists(TOKEN_FILE):
-                os.remove(TOKEN_FILE)
-            creds = None
-    
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("Meet credentials expired. Refreshing token...")
-            try: 
-                creds.refresh(Request())
-            except Exception as e:
-                print(f"Error refreshing Meet token: {e}")
-                if os.path.exists(TOKEN_FILE):
-                    os.remove(TOKEN_FILE)
-                print("Could not refresh token. Please re-authenticate.")
-                return None
-        else:
-            print("No valid Meet token found. Starting authentication flow...")
-            if not os.path.exists(CREDENTIALS_FILE):
-                print(f"ERROR: The credentials file was not found at '{CREDENTIALS_FILE}'")
-                return None
-            
-            flow = InstalledAppFlow.from_client_secrets_file(
-                CREDENTIALS_FILE, SCOPES
-            )
-            flow.redirect_uri = 'http://localhost:8080/'
-            creds = flow.run_local_server(port=8080, authorization_prompt_message="")
-        
-        print(f"Authentication successful. Saving Meet credentials to {TOKEN_FILE}")
-        with open(TOKEN_FILE, 'w') as token:
-            token.write(creds.to_json())
+    return load_credentials(SCOPES, TOKEN_FILE, "Meet")
 
+def build_meet_service(creds):
+    """
+    Builds a Google Meet SpacesServiceClient from credentials, or None on failure.
+    The client keeps one gRPC channel open and is safe to share between threads.
+    """
     try:
-        print("Google Meet service created successfully.")
+        from google.apps import meet_v2
 
         service = meet_v2.SpacesServiceClient(credentials=creds)
+        print("Google Meet service created successfully.", file=sys.stderr)
         return service
     except Exception as e:
-        print(f"An error occurred while building the service: {e}")
-        return None
\ No newline at end of file
+        print(f"An error occurred while building the service: {e}", file=sys.stderr)
+        return None
+
+def get_meet_service():
+    """
+    Returns the process-wide Google Meet client. The client is built once
+    and shared by every tool call; see service_pool.py.
+    """
+    return service_pool.get('meet')
+
+service_pool.register(
+    'meet',
+    load_credentials=get_meet_credentials,
+    build_service=build_meet_service,
+)
@@ -0,0 +1,322 @@
+# google_auth/services/instrumentation.py
+
+import contextlib
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+
+from google_auth.services import metrics
+from google_auth.services.metrics import register_stats
+
+# Set MCP_METRICS_PORT to serve the Prometheus text format on /metrics, and
+# MCP_OTEL_SPANS=1 to emit an OpenTelemetry span per tool call (needs
+# opentelemetry-api plus an SDK/exporter configured by the deployment).
+METRICS_PORT = os.environ.get('MCP_METRICS_PORT')
+OTEL_SPANS = os.environ.get('MCP_OTEL_SPANS', '0') == '1'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-call figures summed per tool, in the order they are exported.
+_SUMMED = (
+    'queue_seconds',
+    'auth_seconds',
+    'upstream_calls',
+    'upstream_seconds',
+    'bytes_sent',
+    'bytes_received',
+    'response_bytes',
+)
+
+
+class ToolCall:
+    """
+    The figures recorded for one tool call. Calls fanned out with
+    blocking.run_parallel() add to it from several threads at once, so the
+    upstream and auth figures are updated under its lock.
+    """
+    __slots__ = ('tool', 'started', 'submitted', 'failed', 'lock') + _SUMMED
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.submitted = None
+        self.failed = False
+        for name in _SUMMED:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in _SUMMED}
+
+
+_current = contextvars.ContextVar('mcp_tool_call', default=None)
+
+_tools = {}
+_lock = threading.Lock()
+
+
+def current_call() -> ToolCall:
+    """Returns the record of the tool call running in this context, or None."""
+    return _current.get()
+
+
+def mark_submitted():
+    """Notes that the current call was handed to the worker pool."""
+    call = _current.get()
+    if call is not None:
+        call.submitted = time.perf_counter()
+
+
+def mark_started():
+    """Notes that a worker picked up the current call, to measure time spent queued."""
+    call = _current.get()
+    if call is not None and call.submitted is not None:
+        call.queue_seconds += time.perf_counter() - call.submitted
+
+
+def add_auth_time(seconds: float):
+    call = _current.get()
+    if call is not None:
+        with call.lock:
+            call.auth_seconds += seconds
+
+
+def add_upstream_call(seconds: float, bytes_sent: int = 0, bytes_received: int = 0):
+    call = _current.get()
+    if call is not None:
+        with call.lock:
+            call.upstream_calls += 1
+            call.upstream_seconds += seconds
+            call.bytes_sent += bytes_sent
+            call.bytes_received += bytes_received
+
+
+def _record(call: ToolCall, wall: float):
+    with _lock:
+        stats = _tools.get(call.tool)
+        if stats is None:
+            stats = _tools[call.tool] = dict.fromkeys(('calls', 'errors', 'wall_seconds') + _SUMMED, 0)
+            stats['buckets'] = [0] * len(DURATION_BUCKETS)
+        stats['calls'] += 1
+        stats['errors'] += call.failed
+        stats['wall_seconds'] += wall
+        for name in _SUMMED:
+            stats[name] += getattr(call, name)
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if wall <= bound:
+                stats['buckets'][index] += 1
+                break
+
+
+@contextlib.contextmanager
+def tool_call(tool: str):
+    """
+    Records one tool call. The body should call set_response() on the yielded
+    record with the tool's result. Hooks in the credential manager, the HTTP
+    transport and the request executor add to the record through the
+    context variable, which run_blocking() carries over to the worker thread.
+    """
+    call = ToolCall(tool)
+    with contextlib.ExitStack() as stack:
+        span = _start_span(tool, stack) if OTEL_SPANS else None
+        token = _current.set(call)
+        try:
+            yield call
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            _current.reset(token)
+            wall = time.perf_counter() - call.started
+            _record(call, wall)
+            if span is not None:
+                _end_span(span, call, wall)
+
+
+def set_response(call: ToolCall, result):
+    """Stores the response size. Tools return errors as JSON strings, so those count as failed calls."""
+    if isinstance(result, str):
+        # json.dumps escapes non-ASCII by default, so characters are bytes.
+        call.response_bytes = len(result)
+        call.failed = result.startswith('{"error"')
+
+
+def instrument_tool(fn):
+    """Wraps an async tool function so that every call is recorded under the function's name."""
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with tool_call(fn.__name__) as call:
+            result = await fn(*args, **kwargs)
+            set_response(call, result)
+            return result
+
+    return wrapper
+
+
+@functools.cache
+def _instrumented_http_class():
+    import httplib2
+
+    class InstrumentedHttp(httplib2.Http):
+        """An httplib2.Http that adds every request's latency and size to the current tool call."""
+
+        def request(self, uri, method="GET", body=None, headers=None, *args, **kwargs):
+            if _current.get() is None:
+                return super().request(uri, method, body, headers, *args, **kwargs)
+            started = time.perf_counter()
+            content = b''
+            try:
+                response, content = super().request(uri, method, body, headers, *args, **kwargs)
+                return response, content
+            finally:
+                sent = len(body) if isinstance(body, (bytes, str)) else 0
+                add_upstream_call(time.perf_counter() - started, sent, len(content or b''))
+
+    return InstrumentedHttp
+
+
+def instrumented_http():
+    """Returns a new httplib2.Http that reports to the current tool call."""
+    return _instrumented_http_class()()
+
+
+def tool_stats() -> dict:
+    """Returns per-tool totals and averages for get_server_metrics."""
+    with _lock:
+        tools = {tool: dict(stats) for tool, stats in _tools.items()}
+    report = {}
+    for tool, stats in tools.items():
+        calls = stats['calls']
+        report[tool] = {
+            'calls': calls,
+            'errors': stats['errors'],
+            'avg_wall_ms': round(1000 * stats['wall_seconds'] / calls, 2),
+            'avg_queue_ms': round(1000 * stats['queue_seconds'] / calls, 2),
+            'avg_auth_ms': round(1000 * stats['auth_seconds'] / calls, 2),
+            'avg_upstream_ms': round(1000 * stats['upstream_seconds'] / calls, 2),
+            'upstream_calls': stats['upstream_calls'],
+            'bytes_sent': stats['bytes_sent'],
+            'bytes_received': stats['bytes_received'],
+            'avg_response_bytes': round(stats['response_bytes'] / calls),
+        }
+    return report
+
+
+register_stats('tools', tool_stats)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _flatten(prefix: str, value, out: list):
+    if isinstance(value, bool):
+        out.append((prefix, int(value)))
+    elif isinstance(value, (int, float)):
+        out.append((prefix, value))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            name = ''.join(c if c.isalnum() else '_' for c in str(key))
+            _flatten(f"{prefix}_{name}", item, out)
+
+
+def prometheus_text() -> str:
+    """Renders the per-tool metrics, plus every numeric component stat, in the Prometheus text format."""
+    with _lock:
+        tools = {tool: dict(stats, buckets=list(stats['buckets'])) for tool, stats in _tools.items()}
+
+    lines = []
+
+    def counter(name: str, help_text: str, key: str):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for tool, stats in tools.items():
+            lines.append(f'{name}{{tool="{_escape(tool)}"}} {stats[key]}')
+
+    counter('mcp_tool_calls_total', 'Tool calls.', 'calls')
+    counter('mcp_tool_errors_total', 'Tool calls that raised or returned an error.', 'errors')
+    counter('mcp_tool_queue_seconds_total', 'Time tool calls waited for a worker thread.', 'queue_seconds')
+    counter('mcp_tool_auth_seconds_total', 'Time spent loading and refreshing credentials.', 'auth_seconds')
+    counter('mcp_tool_upstream_calls_total', 'HTTP and gRPC calls to Google APIs.', 'upstream_calls')
+    counter('mcp_tool_upstream_seconds_total', 'Time spent in HTTP and gRPC calls to Google APIs.', 'upstream_seconds')
+    counter('mcp_tool_upstream_bytes_sent_total', 'Request body bytes sent to Google APIs.', 'bytes_sent')
+    counter('mcp_tool_upstream_bytes_received_total', 'Response body bytes received from Google APIs.', 'bytes_received')
+    counter('mcp_tool_response_bytes_total', 'Bytes of tool results returned to the client.', 'response_bytes')
+
+    lines.append("# HELP mcp_tool_duration_seconds Wall time of tool calls.")
+    lines.append("# TYPE mcp_tool_duration_seconds histogram")
+    for tool, stats in tools.items():
+        label = _escape(tool)
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+            cumulative += count
+            lines.append(f'mcp_tool_duration_seconds_bucket{{tool="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'mcp_tool_duration_seconds_bucket{{tool="{label}",le="+Inf"}} {stats["calls"]}')
+        lines.append(f'mcp_tool_duration_seconds_sum{{tool="{label}"}} {stats["wall_seconds"]}')
+        lines.append(f'mcp_tool_duration_seconds_count{{tool="{label}"}} {stats["calls"]}')
+
+    # Component counters (service pool, executor, caches, ...) as untyped gauges.
+    gauges = []
+    for component, stats in metrics.collect().items():
+        if component != 'tools':
+            _flatten(f"mcp_{component}", stats, gauges)
+    for name, value in gauges:
+        lines.append(f"{name} {value}")
+
+    return '\n'.join(lines) + '\n'
+
+
+def start_metrics_server(port: int):
+    """Serves prometheus_text() on http://0.0.0.0:<port>/metrics from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = prometheus_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # stdout carries the MCP stdio protocol; keep access logs off it.
+            pass
+
+    server = ThreadingHTTPServer(('0.0.0.0', port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    print(f"Serving Prometheus metrics on port {port}", file=sys.stderr)
+    return server
+
+
+def serve_metrics_from_env():
+    """Starts the metrics endpoint if MCP_METRICS_PORT is set."""
+    if METRICS_PORT:
+        start_metrics_server(int(METRICS_PORT))
+
+
+def _start_span(tool: str, stack: contextlib.ExitStack):
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    span = trace.get_tracer('google-workspace-mcp').start_span(f"tool {tool}", attributes={'mcp.tool.name': tool})
+    # Make the span current, so spans created by instrumented client libraries nest under it.
+    stack.enter_context(trace.use_span(span, end_on_exit=False))
+    return span
+
+
+def _end_span(span, call: ToolCall, wall: float):
+    for name, value in call.as_dict().items():
+        span.set_attribute(f"mcp.tool.{name}", value)
+    span.set_attribute('mcp.tool.wall_seconds', wall)
+    if call.failed:
+        from opentelemetry.trace import Status, StatusCode
+        span.set_status(Status(StatusCode.ERROR))
+    span.end()
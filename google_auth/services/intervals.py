@@ -0,0 +1,81 @@
+# google_auth/services/intervals.py
+
+from datetime import datetime, timedelta, UTC
+from zoneinfo import ZoneInfo
+
+
+def merge_intervals(intervals) -> list[tuple[float, float]]:
+    """
+    Merges overlapping or touching (start, end) intervals with a single sweep
+    over the intervals sorted by start. O(n log n) for n intervals, regardless
+    of how many calendars they came from.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def free_gaps(merged_busy: list[tuple[float, float]], window_start: float, window_end: float):
+    """Yields the (start, end) gaps between merged busy intervals inside the window."""
+    cursor = window_start
+    for start, end in merged_busy:
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            yield cursor, start
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        yield cursor, window_end
+
+
+def _in_working_hours(start: float, end: float, tz: ZoneInfo, hours: tuple[int, int]) -> bool:
+    local_start = datetime.fromtimestamp(start, tz)
+    local_end = datetime.fromtimestamp(end, tz)
+    midnight = local_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    # Wall-clock arithmetic, so an end hour of 24 is the following midnight.
+    day_start = midnight + timedelta(hours=hours[0])
+    day_end = midnight + timedelta(hours=hours[1])
+    return local_start.weekday() < 5 and day_start <= local_start and local_end <= day_end
+
+
+def find_free_slots(busy, window_start: float, window_end: float, duration: float, step: float = None,
+                    max_slots: int = 10, working_hours: tuple[int, int] = None, timezone: str = 'UTC') -> list[tuple[float, float]]:
+    """
+    Finds up to `max_slots` free slots of `duration` seconds in the window,
+    given busy (start, end) intervals from any number of calendars. All
+    times are epoch seconds.
+
+    Candidates start at the beginning of every gap and then every `step`
+    seconds (defaults to `duration`). Slots that fall on a weekday within
+    `working_hours` (a (start_hour, end_hour) pair in `timezone`) rank first.
+    Within each group, earlier slots rank first. Raises ValueError unless
+    `duration` and `step` are positive.
+    """
+    step = duration if step is None else step
+    if duration <= 0 or step <= 0:
+        raise ValueError("The slot duration and step must be positive.")
+    tz = ZoneInfo(timezone) if working_hours else UTC
+    preferred, others = [], []
+
+    for gap_start, gap_end in free_gaps(merge_intervals(busy), window_start, window_end):
+        slot_start = gap_start
+        while slot_start + duration <= gap_end:
+            slot = (slot_start, slot_start + duration)
+            if working_hours is None or _in_working_hours(*slot, tz, working_hours):
+                preferred.append(slot)
+                # Slots are generated in time order, so the first max_slots
+                # preferred slots are the best possible answer.
+                if len(preferred) >= max_slots:
+                    return preferred
+            elif len(others) < max_slots:
+                others.append(slot)
+            slot_start += step
+
+    return (preferred + others)[:max_slots]
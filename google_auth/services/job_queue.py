@@ -0,0 +1,317 @@
+# google_auth/services/job_queue.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable
+
+from google_auth.services.metrics import register_stats
+from google_auth.services.request_executor import backoff_delay, error_status, retry_delay
+
+# Mutations queued by tools called with async_mode=True. The database is a
+# write-ahead log: a job is committed before the tool returns, so it
+# survives failures of the Google call and restarts of the server.
+JOB_QUEUE_PATH = os.environ.get('MCP_JOB_QUEUE_PATH', 'credentials/jobs.sqlite3')
+JOB_WORKERS = int(os.environ.get('MCP_JOB_WORKERS', '4'))
+JOB_MAX_ATTEMPTS = int(os.environ.get('MCP_JOB_MAX_ATTEMPTS', '8'))
+# How many jobs per API run at once, on top of the request rate limits.
+# Override with e.g. MCP_JOB_CONCURRENCY_GMAIL=4.
+DEFAULT_CONCURRENCY = {'calendar': 4, 'gmail': 2}
+# A running job whose lease runs out (its process died) is picked up again.
+# Live workers renew their leases every third of this.
+JOB_LEASE_SECONDS = 60.0
+# Finished jobs are kept this long, for job_status and for deduplication.
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+# How often idle workers look for jobs enqueued by other processes or due for a retry.
+POLL_INTERVAL = 2.0
+RETRY_BACKOFF_BASE = 2.0  # seconds
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    api TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_after REAL NOT NULL,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+"""
+
+_COLUMNS = "id, idempotency_key, kind, status, attempts, created_at, updated_at, result, error"
+
+
+class PermanentJobError(Exception):
+    """Raised by a job handler for failures that retrying won't fix, e.g. invalid arguments."""
+
+
+@dataclass
+class Job:
+    """What a handler gets to know about the job it runs."""
+    id: str
+    idempotency_key: str
+    attempt: int  # 1 for the first run
+
+    @property
+    def retried(self) -> bool:
+        """True if an earlier attempt may already have reached Google."""
+        return self.attempt > 1
+
+
+@dataclass
+class _Handler:
+    api: str
+    run: Callable
+
+
+def _concurrency_for(api: str) -> int:
+    return int(os.environ.get(f'MCP_JOB_CONCURRENCY_{api.upper()}', DEFAULT_CONCURRENCY.get(api, 2)))
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, PermanentJobError):
+        return False
+    if error_status(error) is not None:
+        return retry_delay(error, 0) is not None
+    # Anything else is most likely Google being unreachable.
+    return not isinstance(error, (ValueError, TypeError, KeyError, FileNotFoundError, PermissionError))
+
+
+def default_idempotency_key(kind: str, payload: dict) -> str:
+    """Derives a key from the job's content, so enqueueing the same mutation twice runs it once."""
+    return hashlib.sha256(f"{kind}\n{json.dumps(payload, sort_keys=True)}".encode()).hexdigest()
+
+
+class JobQueue:
+    """
+    A durable queue of Google API mutations in SQLite (WAL mode), drained by
+    a pool of worker threads.
+
+    Handlers are registered per job kind by the tool modules. A worker only
+    claims kinds it has a handler for, so servers can share one database.
+    Claims are leases: jobs of a process that died are picked up again
+    once their lease runs out. A failed job is retried with exponential
+    backoff unless its error is permanent. A handler can therefore run more
+    than once for the same job and must make its mutation idempotent, e.g.
+    by deriving an ID from Job.idempotency_key.
+    """
+
+    def __init__(self, path: str = JOB_QUEUE_PATH, workers: int = JOB_WORKERS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._handlers = {}
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+        self._wake = threading.Condition()
+        self._running = {}  # job id -> api
+        self._started = False
+        self._counters = {"enqueued": 0, "deduplicated": 0, "succeeded": 0, "failed": 0, "retries": 0}
+
+    def register(self, kind: str, api: str, handler):
+        """Registers `handler(payload, job)`, which performs a job of this kind and returns a JSON-serializable result."""
+        self._handlers[kind] = _Handler(api, handler)
+
+    # --- Producer side ---
+
+    def enqueue(self, kind: str, payload: dict, idempotency_key: str = None) -> tuple[dict, bool]:
+        """
+        Durably records a job and returns (job, created). If a job with the
+        same idempotency key exists, that job is returned with created=False.
+        """
+        key = idempotency_key or default_idempotency_key(kind, payload)
+        now = time.time()
+        cursor = self._connect().execute(
+            "INSERT INTO jobs (id, idempotency_key, kind, api, payload, status, run_after, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, 'pending', ?, ?, ?) ON CONFLICT (idempotency_key) DO NOTHING",
+            (uuid.uuid4().hex, key, kind, self._handlers[kind].api, json.dumps(payload), now, now, now),
+        )
+        created = cursor.rowcount == 1
+        with self._wake:
+            self._counters["enqueued" if created else "deduplicated"] += 1
+            self._wake.notify()
+        self.start()
+        row = self._connect().execute(f"SELECT {_COLUMNS} FROM jobs WHERE idempotency_key = ?", (key,)).fetchone()
+        return self._to_dict(row), created
+
+    def get(self, job_id: str) -> dict:
+        """Returns the job with this ID or idempotency key, or None."""
+        row = self._connect().execute(
+            f"SELECT {_COLUMNS} FROM jobs WHERE id = ? OR idempotency_key = ?", (job_id, job_id)
+        ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def stats(self) -> dict:
+        with self._wake:
+            stats = dict(self._counters)
+            running = list(self._running.values())
+        if os.path.exists(self.path):
+            stats["by_status"] = dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        stats["running_by_api"] = {api: running.count(api) for api in set(running)}
+        stats["workers"] = self.workers if self._started else 0
+        return stats
+
+    @staticmethod
+    def _to_dict(row) -> dict:
+        job_id, key, kind, status, attempts, created_at, updated_at, result, error = row
+        job = {"job_id": job_id, "idempotency_key": key, "kind": kind, "status": status, "attempts": attempts,
+               "created_at": created_at, "updated_at": updated_at}
+        if result is not None:
+            job["result"] = json.loads(result)
+        if error is not None:
+            job["error"] = error
+        return job
+
+    # --- Worker side ---
+
+    def start(self):
+        """Starts the workers, which also pick up jobs left over from a previous run."""
+        with self._schema_lock:
+            if self._started or not self._handlers:
+                return
+            self._started = True
+        self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (time.time() - JOB_RETENTION_SECONDS,)
+        )
+        for index in range(self.workers):
+            threading.Thread(target=self._work, name=f'job-worker-{index}', daemon=True).start()
+        threading.Thread(target=self._renew_leases, name='job-leases', daemon=True).start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            # A job must be on disk before the tool reports it as queued.
+            conn.execute("PRAGMA synchronous=FULL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._schema_ready = True
+            self._local.conn = conn
+        return conn
+
+    def _claim(self):
+        # Called with self._wake held, so the per-API counts can't change meanwhile.
+        running = list(self._running.values())
+        kinds = [kind for kind, handler in self._handlers.items() if running.count(handler.api) < _concurrency_for(handler.api)]
+        if not kinds:
+            return None
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # A job running here is never claimed again, even if its lease ran out.
+            row = conn.execute(
+                f"SELECT id, idempotency_key, kind, payload, attempts FROM jobs WHERE kind IN ({','.join('?' * len(kinds))}) "
+                "AND ((status = 'pending' AND run_after <= ?) OR (status = 'running' AND lease_until < ? "
+                f"AND id NOT IN ({','.join('?' * len(self._running))}))) "
+                "ORDER BY run_after LIMIT 1",
+                (*kinds, now, now, *self._running),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + JOB_LEASE_SECONDS, now, row[0]),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        self._running[row[0]] = self._handlers[row[2]].api
+        return row
+
+    def _work(self):
+        while True:
+            with self._wake:
+                try:
+                    row = self._claim()
+                except sqlite3.Error as e:
+                    print(f"Could not claim a job: {e}", file=sys.stderr)
+                    row = None
+                if row is None:
+                    self._wake.wait(POLL_INTERVAL)
+                    continue
+            job_id, key, kind, payload, attempts = row
+            try:
+                self._run(job_id, key, kind, payload, attempts)
+            except Exception as e:
+                # Recording the outcome failed (e.g. the database stayed locked).
+                # The job's lease runs out and it is run again.
+                print(f"Job {job_id} ({kind}): could not record the outcome: {e}", file=sys.stderr)
+            finally:
+                with self._wake:
+                    self._running.pop(job_id, None)
+                    self._wake.notify()
+
+    def _run(self, job_id: str, key: str, kind: str, payload: str, attempts: int):
+        try:
+            result = json.dumps(self._handlers[kind].run(json.loads(payload), Job(job_id, key, attempts + 1)))
+        except Exception as e:
+            if attempts + 1 < self.max_attempts and is_retryable(e):
+                self._finish(job_id, "pending", error=str(e), run_after=time.time() + backoff_delay(attempts, RETRY_BACKOFF_BASE))
+            else:
+                print(f"Job {job_id} ({kind}) failed: {e}", file=sys.stderr)
+                self._finish(job_id, "failed", error=str(e))
+            return
+        self._finish(job_id, "succeeded", result=result)
+
+    def _finish(self, job_id: str, status: str, result: str = None, error: str = None, run_after: float = None):
+        now = time.time()
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, run_after = COALESCE(?, run_after), lease_until = NULL, updated_at = ? WHERE id = ?",
+            (status, result, error, run_after, now, job_id),
+        )
+        with self._wake:
+            self._counters["retries" if status == "pending" else status] += 1
+
+    def _renew_leases(self):
+        while True:
+            time.sleep(JOB_LEASE_SECONDS / 3)
+            with self._wake:
+                job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                self._connect().execute(
+                    f"UPDATE jobs SET lease_until = ? WHERE status = 'running' AND id IN ({','.join('?' * len(job_ids))})",
+                    (time.time() + JOB_LEASE_SECONDS, *job_ids),
+                )
+            except sqlite3.Error as e:
+                # The next renewal comes well before the leases run out.
+                print(f"Could not renew job leases: {e}", file=sys.stderr)
+
+
+job_queue = JobQueue()
+register_stats('job_queue', job_queue.stats)
+
+
+def job_status(job_id: str) -> str:
+    """
+    Returns the status of a job queued by a tool called with async_mode=True, by job_id or idempotency_key:
+    'pending' (waiting, or waiting to be retried), 'running', 'succeeded' (with the tool's "result")
+    or 'failed' (with the last "error"). "attempts" counts the runs so far.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return json.dumps({"error": f"No job with ID {job_id}."})
+    return json.dumps(job)
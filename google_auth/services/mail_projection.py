@@ -0,0 +1,126 @@
+# google_auth/services/mail_projection.py
+
+import base64
+import re
+from html.parser import HTMLParser
+
+DEFAULT_HEADERS = ('From', 'To', 'Cc', 'Subject', 'Date')
+DEFAULT_MAX_BODY_CHARS = 4000
+
+_BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'table'}
+_SKIPPED_TAGS = {'script', 'style', 'head', 'title'}
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the visible text of an HTML document, one line per block element."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.chunks = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.chunks.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in _BLOCK_TAGS:
+            self.chunks.append('\n')
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.chunks.append(data)
+
+
+def strip_html(html: str) -> str:
+    """Converts an HTML body to plain text, dropping scripts, styles and markup."""
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    text = ''.join(parser.chunks)
+    text = re.sub(r'[ \t\r\f\v]+', ' ', text)
+    return re.sub(r'\s*\n\s*', '\n', text).strip()
+
+
+def _decode_body(part: dict) -> str:
+    data = part.get('body', {}).get('data')
+    if not data:
+        return ''
+    raw = base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+    charset = 'utf-8'
+    for header in part.get('headers', []):
+        if header['name'].lower() == 'content-type':
+            match = re.search(r'charset="?([\w.-]+)"?', header['value'], re.IGNORECASE)
+            if match:
+                charset = match.group(1)
+    try:
+        return raw.decode(charset, errors='replace')
+    except LookupError:
+        return raw.decode('utf-8', errors='replace')
+
+
+def project_message(message: dict, headers=DEFAULT_HEADERS, max_body_chars: int = DEFAULT_MAX_BODY_CHARS) -> dict:
+    """
+    Reduces a format="full" Gmail message to what an agent needs to read it.
+
+    The MIME tree is walked once. Only the first text/plain part is decoded;
+    if there is none, the first text/html part is decoded and stripped to
+    text. Attachments are listed as metadata stubs, whose attachment_id can
+    be used to fetch the data. Only the requested headers are kept, and the
+    body is cut to `max_body_chars` characters.
+    """
+    wanted_headers = {name.lower() for name in headers}
+    payload = message.get('payload', {})
+    kept_headers = {
+        header['name']: header['value']
+        for header in payload.get('headers', [])
+        if header['name'].lower() in wanted_headers
+    }
+
+    plain_part, html_part, attachments = None, None, []
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        if part.get('parts'):
+            # Reversed so that parts are visited in document order.
+            stack.extend(reversed(part['parts']))
+            continue
+
+        mime_type = part.get('mimeType', '')
+        body = part.get('body', {})
+        if part.get('filename') or body.get('attachmentId'):
+            attachments.append({
+                "filename": part.get('filename'),
+                "mime_type": mime_type,
+                "size": body.get('size', 0),
+                "attachment_id": body.get('attachmentId'),
+            })
+        elif mime_type == 'text/plain' and plain_part is None:
+            plain_part = part
+        elif mime_type == 'text/html' and html_part is None:
+            html_part = part
+
+    if plain_part is not None:
+        body_text = _decode_body(plain_part)
+    elif html_part is not None:
+        body_text = strip_html(_decode_body(html_part))
+    else:
+        body_text = ''
+
+    projected = {
+        "id": message.get('id'),
+        "thread_id": message.get('threadId'),
+        "label_ids": message.get('labelIds', []),
+        "snippet": message.get('snippet'),
+        "headers": kept_headers,
+        "body": body_text[:max_body_chars] if max_body_chars else body_text,
+        "attachments": attachments,
+    }
+    if max_body_chars and len(body_text) > max_body_chars:
+        projected["body_truncated"] = True
+        projected["body_length"] = len(body_text)
+    return projected
@@ -0,0 +1,171 @@
+# google_auth/services/meet_space_pool.py
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from google_auth.services.google_meet import get_meet_service
+from google_auth.services.metrics import register_stats
+from google_auth.services.request_executor import call
+
+# How many unused Meet spaces to keep ready. 0 disables the pool and
+# create_meet_space creates every space on demand.
+MEET_SPACE_POOL_SIZE = int(os.environ.get('MEET_SPACE_POOL_SIZE', '0'))
+# Once fewer spaces than this are left, a background thread tops the pool up to MEET_SPACE_POOL_SIZE.
+MEET_SPACE_POOL_LOW_WATER = int(os.environ.get('MEET_SPACE_POOL_LOW_WATER', str(max(1, MEET_SPACE_POOL_SIZE // 2))))
+# Unused spaces survive restarts here, so they are handed out instead of being leaked.
+# Only the process that starts the pool (the Meet or the unified server) uses it,
+# and every such process needs its own file.
+MEET_SPACE_POOL_FILE = os.environ.get('MEET_SPACE_POOL_FILE', 'credentials/meet_space_pool.json')
+# Spaces older than this are dropped rather than handed out.
+MAX_SPACE_AGE = 30 * 24 * 3600  # seconds
+
+
+def create_space(service) -> dict:
+    """Creates a Meet space and returns it as {"name", "meeting_uri", "created_at", "json"}."""
+    from google.apps import meet_v2
+
+    response = call(lambda: service.create_space(request=meet_v2.CreateSpaceRequest()), 'meet', idempotent=False)
+    return {
+        "name": response.name,
+        "meeting_uri": response.meeting_uri,
+        "created_at": time.time(),
+        "json": meet_v2.Space.to_json(response),
+    }
+
+
+class MeetSpacePool:
+    """
+    A pool of created but unused Meet spaces. take() hands one out without
+    a Google call. A background thread refills the pool, through the shared
+    Meet client, whenever it falls below the low-water mark.
+
+    The pool is saved to a JSON file after every change, before a space is
+    handed out, so a restart neither loses spaces nor hands one out twice.
+    The file belongs to one process: until start() is called, take() returns
+    None, so e.g. the standalone Calendar server never touches the file of
+    a Meet server running next to it.
+    """
+
+    def __init__(self, size: int = MEET_SPACE_POOL_SIZE, low_water: int = MEET_SPACE_POOL_LOW_WATER, path: str = MEET_SPACE_POOL_FILE):
+        self.size = size
+        self.low_water = min(low_water, size)
+        self._path = path
+        self._spaces = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._refiller = None
+        self._started = False
+        self._counters = {"handed_out": 0, "released": 0, "misses": 0, "created": 0, "expired": 0, "refill_failures": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0 and self._started
+
+    def start(self):
+        """Takes over the pool file: loads the saved pool and, if it was in use before, tops it up in the background."""
+        self._started = True
+        if not self.enabled:
+            return
+        with self._lock:
+            existed = os.path.exists(self._path)
+            self._load()
+        # Without a saved pool there may be no Meet token yet; wait for the first take().
+        if existed:
+            self._request_refill()
+
+    def take(self) -> dict:
+        """Hands out an unused space, or returns None if the pool is empty, disabled or not started."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            spaces = self._load()
+            space = spaces.popleft() if spaces else None
+            if space is not None:
+                self._save()
+            self._counters["handed_out" if space else "misses"] += 1
+        self._request_refill()
+        return space
+
+    def release(self, space: dict):
+        """Puts back a space that was taken but not used, e.g. because booking the meeting failed."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._load().appendleft(space)
+            self._counters["released"] += 1
+            self._save()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["available"] = len(self._spaces) if self._spaces is not None else 0
+        counters["size"] = self.size
+        counters["low_water"] = self.low_water
+        return counters
+
+    def _request_refill(self):
+        with self._lock:
+            if len(self._load()) >= self.low_water:
+                return
+            if self._refiller is None:
+                self._refiller = threading.Thread(target=self._refill_loop, name='meet-space-pool', daemon=True)
+                self._refiller.start()
+        self._wake.set()
+
+    def _refill_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            while True:
+                with self._lock:
+                    if len(self._spaces) >= self.size:
+                        break
+                try:
+                    service = get_meet_service()
+                    if service is None:
+                        raise RuntimeError("Failed to authenticate with meet")
+                    space = create_space(service)
+                except Exception as e:
+                    # Try again on the next take() rather than in a tight loop.
+                    print(f"Could not top up the Meet space pool: {e}", file=sys.stderr)
+                    with self._lock:
+                        self._counters["refill_failures"] += 1
+                    break
+                with self._lock:
+                    self._spaces.append(space)
+                    self._counters["created"] += 1
+                    self._save()
+
+    def _load(self) -> deque:
+        # Called with self._lock held.
+        if self._spaces is None:
+            spaces = []
+            if os.path.exists(self._path):
+                try:
+                    with open(self._path) as f:
+                        spaces = json.load(f)
+                except Exception as e:
+                    print(f"Error loading the Meet space pool from {self._path}: {e}", file=sys.stderr)
+            cutoff = time.time() - MAX_SPACE_AGE
+            self._spaces = deque(space for space in spaces if space["created_at"] > cutoff)
+            self._counters["expired"] += len(spaces) - len(self._spaces)
+        return self._spaces
+
+    def _save(self):
+        # Called with self._lock held.
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a torn file.
+        tmp_path = self._path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(list(self._spaces), f)
+        os.replace(tmp_path, self._path)
+
+
+meet_space_pool = MeetSpacePool()
+register_stats('meet_space_pool', meet_space_pool.stats)
@@ -0,0 +1,28 @@
+# google_auth/services/metrics.py
+
+import threading
+
+# Components that keep counters (the service pool, caches, ...) register a
+# function returning a dict of their stats. collect() gathers all of them,
+# so a server has a single place to report from.
+_sources = {}
+_lock = threading.Lock()
+
+
+def register_stats(name: str, stats_fn):
+    """Registers a zero-argument function that returns a JSON-friendly dict of stats."""
+    with _lock:
+        _sources[name] = stats_fn
+
+
+def collect() -> dict:
+    """Returns the stats of every registered component, keyed by component name."""
+    with _lock:
+        sources = dict(_sources)
+    report = {}
+    for name, stats_fn in sources.items():
+        try:
+            report[name] = stats_fn()
+        except Exception as e:
+            report[name] = {"error": str(e)}
+    return report
@@ -0,0 +1,92 @@
+# google_auth/services/mime_stream.py
+
+import base64
+import mimetypes
+import os
+import uuid
+from email import policy
+from email.message import EmailMessage
+
+# Gmail rejects messages larger than 35 MB, including the base64 encoding of attachments.
+MAX_MESSAGE_BYTES = int(os.environ.get('GMAIL_MAX_MESSAGE_BYTES', str(35 * 1024 * 1024)))
+MAX_ATTACHMENT_BYTES = int(os.environ.get('GMAIL_MAX_ATTACHMENT_BYTES', str(25 * 1024 * 1024)))
+
+# base64 turns every 57 input bytes into one 76 character line, so reading in
+# multiples of 57 keeps lines intact and puts padding only at the very end.
+_READ_CHUNK = 57 * 1024
+
+
+def encoded_size(size: int) -> int:
+    """Size of `size` bytes after base64 encoding with CRLF line breaks every 76 characters."""
+    encoded = 4 * ((size + 2) // 3)
+    return encoded + 2 * ((encoded + 75) // 76)
+
+
+def check_attachments(paths: list[str]) -> str:
+    """
+    Checks that every attachment exists and fits the per-attachment and total
+    message limits, without reading any file. Returns an error message, or
+    None if everything fits.
+    """
+    total = 0
+    for path in paths:
+        if not os.path.exists(path):
+            return f"Attachment file not found: {path}"
+        size = os.path.getsize(path)
+        if size > MAX_ATTACHMENT_BYTES:
+            return f"Attachment {path} is {size} bytes; the limit is {MAX_ATTACHMENT_BYTES} bytes."
+        total += encoded_size(size)
+    if total > MAX_MESSAGE_BYTES:
+        return f"Attachments add up to {total} bytes once encoded; the message limit is {MAX_MESSAGE_BYTES} bytes."
+    return None
+
+
+def _write_base64(out, source):
+    while True:
+        chunk = source.read(_READ_CHUNK)
+        if not chunk:
+            return
+        out.write(base64.encodebytes(chunk).replace(b'\n', b'\r\n'))
+
+
+def _part_headers(content_type: str, filename: str = None, charset: str = None) -> bytes:
+    part = EmailMessage(policy=policy.SMTP)
+    part['Content-Type'] = content_type
+    if charset:
+        part.set_param('charset', charset)
+    if filename:
+        part.add_header('Content-Disposition', 'attachment', filename=filename)
+    part['Content-Transfer-Encoding'] = 'base64'
+    # A part without a payload serializes to just its headers and the blank line.
+    return part.as_bytes()
+
+
+def write_mime_message(out, headers: dict, body: str, attachments: list[str] = None):
+    """
+    Writes a multipart/mixed message with a plain-text body and file attachments to
+    the binary file object `out`. Attachments are read and base64-encoded in
+    small chunks, so memory use does not depend on the attachment sizes.
+    """
+    boundary = f"=============== {uuid.uuid4().hex} =="
+    for name, value in headers.items():
+        # Header objects take care of RFC 2047 encoding of non-ASCII names and subjects.
+        out.write(policy.SMTP.fold(name, policy.SMTP.header_factory(name, value)).encode('ascii'))
+    out.write(b'MIME-Version: 1.0\r\n')
+    out.write(f'Content-Type: multipart/mixed; boundary="{boundary}"\r\n\r\n'.encode())
+
+    delimiter = f'--{boundary}\r\n'.encode()
+    out.write(delimiter)
+    out.write(_part_headers('text/plain', charset='utf-8'))
+    out.write(base64.encodebytes(body.encode('utf-8')).replace(b'\n', b'\r\n'))
+
+    for file_path in attachments or []:
+        content_type, _ = mimetypes.guess_type(file_path)
+        if content_type is None:
+            content_type = 'application/octet-stream' # Default if type is unknown
+
+        out.write(delimiter)
+        out.write(_part_headers(content_type, filename=os.path.basename(file_path)))
+        with open(file_path, 'rb') as fp:
+            _write_base64(out, fp)
+
+    out.write(f'--{boundary}--\r\n'.encode())
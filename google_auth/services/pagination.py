@@ -0,0 +1,48 @@
+# google_auth/services/pagination.py
+
+import base64
+import json
+
+from google_auth.services.request_executor import execute
+
+
+def iter_pages(list_method, page_token: str = None, **params):
+    """
+    Lazily calls a googleapiclient list method, following nextPageToken.
+    Yields each response page; the next page is only requested once the
+    caller asks for it.
+    """
+    while True:
+        if page_token:
+            params['pageToken'] = page_token
+        response = execute(list_method(**params))
+        yield response
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def iter_items(list_method, item_key: str = 'items', **params):
+    """Lazily yields the items of every page returned by a list method."""
+    for page in iter_pages(list_method, **params):
+        yield from page.get(item_key, [])
+
+
+def encode_cursor(page_token: str, query: dict) -> str:
+    """
+    Packs a nextPageToken together with the query it was issued for, so the
+    next page is requested with the same query even if the caller doesn't
+    repeat it (e.g. a time_min that defaulted to now).
+    """
+    return base64.urlsafe_b64encode(json.dumps([page_token, query]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[str, dict]:
+    """Returns the (page_token, query) packed by encode_cursor. Raises ValueError for anything else."""
+    try:
+        page_token, query = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid page_token. Pass next_page_token from the previous page unchanged.")
+    if not isinstance(page_token, str) or not isinstance(query, dict):
+        raise ValueError("Invalid page_token. Pass next_page_token from the previous page unchanged.")
+    return page_token, query
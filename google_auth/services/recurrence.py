@@ -0,0 +1,341 @@
+# google_auth/services/recurrence.py
+
+import heapq
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, UTC
+from operator import itemgetter
+from zoneinfo import ZoneInfo
+
+from google_auth.services.event_store import to_timestamp
+
+WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+# The RRULE parts evaluated here. Series using any other part are expanded by Google instead.
+SUPPORTED_PARTS = {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL', 'BYDAY', 'BYMONTHDAY', 'BYMONTH', 'BYSETPOS', 'WKST'}
+
+# The fields of the instance tuples yielded by expand_events.
+INSTANCE_FIELDS = ('id', 'start', 'end', 'summary', 'recurring_event_id')
+
+_BYDAY = re.compile(r'^([+-]?\d+)?(MO|TU|WE|TH|FR|SA|SU)$')
+
+
+class UnsupportedRecurrence(ValueError):
+    """The recurrence uses something this module doesn't evaluate (e.g. BYHOUR or RDATE periods)."""
+
+
+@dataclass
+class Rule:
+    freq: str
+    interval: int = 1
+    count: int = None
+    until: object = None  # a date or an aware datetime
+    by_day: list = field(default_factory=list)  # (ordinal or None, weekday) pairs
+    by_month_day: list = field(default_factory=list)
+    by_month: list = field(default_factory=list)
+    by_set_pos: list = field(default_factory=list)
+    week_start: int = 0
+
+
+def _parse_value(value: str, tz):
+    """Parses an iCalendar DATE or DATE-TIME value; floating times are taken to be in `tz`."""
+    if len(value) == 8:
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    parsed = datetime.strptime(value.rstrip('Z'), '%Y%m%dT%H%M%S')
+    return parsed.replace(tzinfo=UTC if value.endswith('Z') else tz)
+
+
+def parse_rule(value: str, tz) -> Rule:
+    """Parses the value of an RRULE line, e.g. 'FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250101T000000Z'."""
+    parts = dict(part.split('=', 1) for part in value.split(';') if part)
+    unsupported = set(parts) - SUPPORTED_PARTS
+    if unsupported or parts.get('FREQ') not in FREQUENCIES:
+        raise UnsupportedRecurrence(f"RRULE:{value}")
+
+    rule = Rule(freq=parts['FREQ'], interval=int(parts.get('INTERVAL', 1)))
+    if 'COUNT' in parts:
+        rule.count = int(parts['COUNT'])
+    if 'UNTIL' in parts:
+        rule.until = _parse_value(parts['UNTIL'], tz)
+    for item in filter(None, parts.get('BYDAY', '').split(',')):
+        match = _BYDAY.match(item)
+        if match is None:
+            raise UnsupportedRecurrence(f"RRULE:{value}")
+        rule.by_day.append((int(match.group(1)) if match.group(1) else None, WEEKDAYS[match.group(2)]))
+    rule.by_month_day = [int(day) for day in filter(None, parts.get('BYMONTHDAY', '').split(','))]
+    rule.by_month = [int(month) for month in filter(None, parts.get('BYMONTH', '').split(','))]
+    rule.by_set_pos = [int(position) for position in filter(None, parts.get('BYSETPOS', '').split(','))]
+    rule.week_start = WEEKDAYS[parts.get('WKST', 'MO')]
+    return rule
+
+
+def _month_length(year: int, month: int) -> int:
+    # Avoids importing the calendar module, which adds to server startup.
+    return (date(year + month // 12, month % 12 + 1, 1) - date(year, month, 1)).days
+
+
+def _pick(items: list, ordinal: int):
+    # 1 is the first item and -1 the last; None if there aren't that many.
+    index = ordinal - 1 if ordinal > 0 else ordinal
+    return items[index] if -len(items) <= index < len(items) else None
+
+
+def _weekdays_in(first: date, days: int, by_day: list) -> set:
+    """Days of the `days`-long span starting at `first` that match BYDAY, with ordinals counted within the span."""
+    matched = set()
+    for ordinal, weekday in by_day:
+        offsets = range((weekday - first.weekday()) % 7, days, 7)
+        if ordinal is None:
+            matched.update(offsets)
+        else:
+            offset = _pick(offsets, ordinal)
+            if offset is not None:
+                matched.add(offset)
+    return {first + timedelta(days=offset) for offset in matched}
+
+
+def _month_days(year: int, month: int, rule: Rule, default_day: int) -> set:
+    length = _month_length(year, month)
+    days = None
+    if rule.by_month_day:
+        days = {date(year, month, day if day > 0 else length + day + 1) for day in rule.by_month_day if 0 < abs(day) <= length}
+    if rule.by_day:
+        weekdays = _weekdays_in(date(year, month, 1), length, rule.by_day)
+        days = weekdays if days is None else days & weekdays
+    if days is None:
+        days = {date(year, month, default_day)} if default_day <= length else set()
+    return days
+
+
+def _period_days(rule: Rule, first_day: date, period: int) -> tuple[date, set]:
+    """Returns the first day of the `period`-th period of the rule and the candidate days in it."""
+    step = period * rule.interval
+    if rule.freq == 'DAILY':
+        day = first_day + timedelta(days=step)
+        matches = not rule.by_day or day.weekday() in {weekday for _, weekday in rule.by_day}
+        if matches and rule.by_month_day:
+            length = _month_length(day.year, day.month)
+            matches = day.day in rule.by_month_day or day.day - length - 1 in rule.by_month_day
+        return day, {day} if matches else set()
+    if rule.freq == 'WEEKLY':
+        week = first_day - timedelta(days=(first_day.weekday() - rule.week_start) % 7) + timedelta(weeks=step)
+        weekdays = {weekday for _, weekday in rule.by_day} or {first_day.weekday()}
+        return week, {week + timedelta(days=(weekday - rule.week_start) % 7) for weekday in weekdays}
+    if rule.freq == 'MONTHLY':
+        year, month = divmod(first_day.year * 12 + first_day.month - 1 + step, 12)
+        return date(year, month + 1, 1), _month_days(year, month + 1, rule, first_day.day)
+    year = first_day.year + step
+    if rule.by_month:
+        days = set().union(*(_month_days(year, month, rule, first_day.day) for month in rule.by_month))
+    elif rule.by_month_day:
+        days = set().union(*(_month_days(year, month, rule, first_day.day) for month in range(1, 13)))
+    elif rule.by_day:
+        days = _weekdays_in(date(year, 1, 1), (date(year + 1, 1, 1) - date(year, 1, 1)).days, rule.by_day)
+    else:
+        days = _month_days(year, first_day.month, rule, first_day.day)
+    return date(year, 1, 1), days
+
+
+def _first_period(rule: Rule, first_day: date, day: date) -> int:
+    """The last period that starts on or before `day`, so expansion can skip straight to a window."""
+    if day <= first_day:
+        return 0
+    if rule.freq == 'DAILY':
+        periods = (day - first_day).days
+    elif rule.freq == 'WEEKLY':
+        periods = ((day - timedelta(days=(day.weekday() - rule.week_start) % 7))
+                   - (first_day - timedelta(days=(first_day.weekday() - rule.week_start) % 7))).days // 7
+    elif rule.freq == 'MONTHLY':
+        periods = (day.year - first_day.year) * 12 + day.month - first_day.month
+    else:
+        periods = day.year - first_day.year
+    return periods // rule.interval
+
+
+def rule_days(rule: Rule, first_day: date, start_period: int = 0, last_day: date = None):
+    """Lazily yields the days a rule produces, in order, from `start_period` until a period starts after `last_day`."""
+    period = start_period
+    while True:
+        period_start, days = _period_days(rule, first_day, period)
+        if last_day is not None and period_start > last_day:
+            return
+        if rule.by_month:
+            days = {day for day in days if day.month in rule.by_month}
+        ordered = sorted(days)
+        if rule.by_set_pos:
+            ordered = sorted(filter(None, (_pick(ordered, position) for position in rule.by_set_pos)))
+        yield from ordered
+        period += 1
+
+
+class Recurrence:
+    """
+    The RRULE, RDATE and EXDATE lines of a recurring event, parsed once and
+    expanded lazily for any window. Occurrences are computed in the
+    event's own time zone, so they keep their wall-clock time across DST
+    changes, and are returned as UTC epoch timestamps. All-day events use
+    midnight UTC, as event_store.to_timestamp does.
+    """
+
+    def __init__(self, event: dict):
+        start = event['start']
+        self.all_day = 'dateTime' not in start
+        if self.all_day:
+            self.tz = UTC
+            self.first_day = date.fromisoformat(start['date'])
+            self.start_time = time()
+        else:
+            parsed = datetime.fromisoformat(start['dateTime'])
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=ZoneInfo(start['timeZone']) if start.get('timeZone') else UTC)
+            self.tz = ZoneInfo(start['timeZone']) if start.get('timeZone') else parsed.tzinfo
+            local = parsed.astimezone(self.tz)
+            self.first_day = local.date()
+            self.start_time = local.time().replace(tzinfo=None)
+        self.first_stamp = self.stamp(self.first_day)
+        self.duration = to_timestamp(event['end']) - self.first_stamp
+
+        self.rules, self.rdates, self.exdates = [], [], set()
+        for line in event.get('recurrence', []):
+            name, _, value = line.partition(':')
+            name, *params = name.split(';')
+            params = dict(param.split('=', 1) for param in params)
+            if name == 'RRULE':
+                self.rules.append(parse_rule(value, self.tz))
+            elif name in ('RDATE', 'EXDATE') and params.get('VALUE') != 'PERIOD':
+                tz = ZoneInfo(params['TZID']) if 'TZID' in params else self.tz
+                stamps = [self.stamp(_parse_value(item, tz)) for item in value.split(',') if item]
+                if name == 'RDATE':
+                    self.rdates.extend(stamps)
+                else:
+                    self.exdates.update(stamps)
+            else:
+                raise UnsupportedRecurrence(line)
+        self.rdates.sort()
+
+    def stamp(self, value) -> float:
+        """Turns a day (at the event's start time) or an aware datetime into a timestamp."""
+        if isinstance(value, datetime):
+            return value.timestamp()
+        return datetime.combine(value, self.start_time, self.tz).timestamp()
+
+    def _rule_stamps(self, rule: Rule, earliest: float, latest: float):
+        until = None
+        if isinstance(rule.until, datetime):
+            until = self.stamp(rule.until.astimezone(UTC).date()) if self.all_day else rule.until.timestamp()
+        elif rule.until is not None:
+            # A date UNTIL on a timed series includes that whole day.
+            until = self.stamp(rule.until) if self.all_day else datetime.combine(rule.until, time.max, self.tz).timestamp()
+        horizon = latest if until is None else min(latest, until)
+        start_period = 0
+        if rule.count is None:
+            # Without COUNT nothing before the window matters, so skip to it.
+            start_period = _first_period(rule, self.first_day, datetime.fromtimestamp(earliest, self.tz).date() - timedelta(days=1))
+
+        produced = 1  # DTSTART is always the first occurrence.
+        for day in rule_days(rule, self.first_day, start_period, datetime.fromtimestamp(horizon, self.tz).date()):
+            stamp = self.stamp(day)
+            if stamp <= self.first_stamp:
+                continue
+            if rule.count is not None:
+                if produced >= rule.count:
+                    return
+                produced += 1
+            if stamp > horizon:
+                return
+            yield stamp
+
+    def occurrences(self, window_start: float, window_end: float):
+        """Lazily yields, in order, the start timestamps of the occurrences that overlap the window."""
+        earliest = window_start - self.duration
+        streams = [self._rule_stamps(rule, earliest, window_end) for rule in self.rules]
+        streams.append(iter([self.first_stamp]))
+        streams.append(iter(self.rdates))
+        previous = None
+        for stamp in heapq.merge(*streams):
+            if stamp >= window_end:
+                return
+            if stamp == previous or stamp in self.exdates:
+                continue
+            previous = stamp
+            if stamp + self.duration > window_start or stamp >= window_start:
+                yield stamp
+
+
+def _instance_id(event_id: str, stamp: float, all_day: bool) -> str:
+    # Calendar's ids for instances of a series: <series id>_<original start in UTC>.
+    moment = datetime.fromtimestamp(stamp, UTC).isoformat()  # e.g. 2024-05-21T17:00:00+00:00
+    if all_day:
+        return f"{event_id}_{moment[:4]}{moment[5:7]}{moment[8:10]}"
+    return f"{event_id}_{moment[:4]}{moment[5:7]}{moment[8:13]}{moment[14:16]}{moment[17:19]}Z"
+
+
+def _expand_series(master: dict, recurrence: Recurrence, replaced: set, window_start: float, window_end: float):
+    summary = master.get('summary')
+    for stamp in recurrence.occurrences(window_start, window_end):
+        if stamp in replaced:
+            continue
+        if recurrence.all_day:
+            first = datetime.fromtimestamp(stamp, UTC).date()
+            start, end = first.isoformat(), (first + timedelta(seconds=recurrence.duration)).isoformat()
+        else:
+            start = datetime.fromtimestamp(stamp, recurrence.tz).isoformat()
+            end = datetime.fromtimestamp(stamp + recurrence.duration, recurrence.tz).isoformat()
+        yield stamp, (_instance_id(master['id'], stamp, recurrence.all_day), start, end, summary, master['id'])
+
+
+def _event_row(event: dict) -> tuple:
+    start = to_timestamp(event['start'])
+    return start, (
+        event['id'],
+        event['start'].get('dateTime') or event['start'].get('date'),
+        event['end'].get('dateTime') or event['end'].get('date'),
+        event.get('summary'),
+        event.get('recurringEventId'),
+    )
+
+
+def expand_events(events, window_start: float, window_end: float, fallback=None):
+    """
+    Lazily yields the instances of `events` that overlap the window, ordered
+    by start, as INSTANCE_FIELDS tuples. `events` is an events().list
+    response with singleEvents=False and showDeleted=True, i.e. single
+    events, recurring series and the modified or cancelled instances of
+    those series.
+
+    Series whose recurrence can't be evaluated here are passed to
+    `fallback(series)`, which returns their instances as events in start
+    order (e.g. from events().instances()). Without a fallback,
+    UnsupportedRecurrence is raised.
+    """
+    singles, series, exceptions = [], [], {}
+    for event in events:
+        if event.get('recurringEventId'):
+            exceptions.setdefault(event['recurringEventId'], []).append(event)
+        elif event.get('status') == 'cancelled':
+            continue
+        elif event.get('recurrence'):
+            series.append(event)
+        else:
+            singles.append(event)
+
+    streams = []
+    for master in series:
+        instances = exceptions.pop(master['id'], [])
+        try:
+            recurrence = Recurrence(master)
+        except UnsupportedRecurrence:
+            if fallback is None:
+                raise
+            streams.append(_event_row(event) for event in fallback(master) if event.get('status') != 'cancelled')
+            continue
+        replaced = {to_timestamp(event['originalStartTime']) for event in instances}
+        streams.append(_expand_series(master, recurrence, replaced, window_start, window_end))
+        singles.extend(event for event in instances if event.get('status') != 'cancelled')
+
+    # Modified instances (and those of series outside the listing) appear as they are.
+    singles.extend(event for instances in exceptions.values() for event in instances if event.get('status') != 'cancelled')
+    rows = [_event_row(event) for event in singles]
+    streams.append(row for row in sorted(rows, key=itemgetter(0))
+                   if row[0] < window_end and to_timestamp(row[1][2]) > window_start)
+    return (row for _, row in heapq.merge(*streams, key=itemgetter(0)))
@@ -0,0 +1,275 @@
+# google_auth/services/request_executor.py
+
+import email.utils
+import os
+import random
+import threading
+import time
+from datetime import datetime, UTC
+
+from googleapiclient.errors import HttpError
+
+from google_auth.services.instrumentation import add_upstream_call
+from google_auth.services.metrics import register_stats
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Google reports some quota errors as 403 rather than 429.
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+MAX_RETRIES = int(os.environ.get('GOOGLE_API_MAX_RETRIES', '4'))
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_CAP = 32.0  # seconds
+RETRY_AFTER_CAP = 60.0  # seconds
+
+# Client-side request rates per API and user, in requests per second. They
+# sit below Google's default per-user quotas; the burst allows short spikes.
+# Override with e.g. GOOGLE_API_RATE_GMAIL=50.
+DEFAULT_RATES = {'calendar': 10.0, 'gmail': 25.0, 'meet': 10.0}
+BURST_SECONDS = 2.0
+
+
+def _rate_for(api: str) -> float:
+    return float(os.environ.get(f'GOOGLE_API_RATE_{api.upper()}', DEFAULT_RATES.get(api, 10.0)))
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket. reserve() takes a token immediately, even if
+    the bucket is empty, and tells the caller how long to sleep until that
+    token is due. Waiting callers are therefore served in arrival order,
+    without polling.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Takes `tokens` from the bucket and returns how many seconds the caller must wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def pause(self, seconds: float):
+        """Empties the bucket for `seconds`, e.g. after Google answered with Retry-After."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class RequestGovernor:
+    """
+    Applies a per (api, user) rate limit and retries to Google API calls,
+    and keeps the counters reported by get_server_metrics.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _bucket(self, api: str, user: str) -> TokenBucket:
+        key = (api, user)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    rate = _rate_for(api)
+                    bucket = self._buckets[key] = TokenBucket(rate, max(1.0, rate * BURST_SECONDS))
+        return bucket
+
+    def _api_counters(self, api: str) -> dict:
+        counters = self._counters.get(api)
+        if counters is None:
+            counters = self._counters[api] = {
+                "calls": 0,
+                "retries": 0,
+                "failures": 0,
+                "throttled": 0,
+                "throttle_wait_seconds": 0.0,
+                "rate_limited_by_google": 0,
+                "in_flight": 0,
+                "queue_depth": 0,
+                "max_queue_depth": 0,
+            }
+        return counters
+
+    def _update(self, api: str, **deltas):
+        with self._lock:
+            counters = self._api_counters(api)
+            for name, delta in deltas.items():
+                counters[name] += delta
+            counters["max_queue_depth"] = max(counters["max_queue_depth"], counters["queue_depth"])
+
+    def acquire(self, api: str, user: str = 'me', tokens: float = 1):
+        """Blocks until the rate limit for (api, user) allows `tokens` more requests."""
+        wait = self._bucket(api, user).reserve(tokens)
+        if wait > 0:
+            self._update(api, throttled=1, throttle_wait_seconds=wait, queue_depth=1)
+            try:
+                time.sleep(wait)
+            finally:
+                self._update(api, queue_depth=-1)
+
+    def call(self, fn, api: str, user: str = 'me', max_retries: int = MAX_RETRIES,
+             idempotent: bool = True, tokens: float = 1):
+        """
+        Calls `fn()` under the rate limit for (api, user). Retryable failures
+        are retried with exponential backoff and full jitter, or after the
+        delay Google asked for in Retry-After; see retry_delay(). Other errors
+        are raised straight away.
+        """
+        for attempt in range(max_retries + 1):
+            self.acquire(api, user, tokens)
+            self._update(api, calls=1, in_flight=1)
+            try:
+                return fn()
+            except Exception as e:
+                delay = retry_delay(e, attempt, idempotent)
+                if delay is None or attempt == max_retries:
+                    # A 304 answers a conditional request; it isn't a failure.
+                    if error_status(e) != 304:
+                        self._update(api, failures=1)
+                    raise
+                if error_status(e) in (429, 403):
+                    self._update(api, rate_limited_by_google=1)
+                    # Hold back every caller sharing this quota, not just this one.
+                    self._bucket(api, user).pause(delay)
+                self._update(api, retries=1)
+            finally:
+                self._update(api, in_flight=-1)
+            time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = {api: dict(counters) for api, counters in self._counters.items()}
+        for counters in report.values():
+            counters["throttle_wait_seconds"] = round(counters["throttle_wait_seconds"], 3)
+        report["rates"] = {f"{api}/{user}": bucket.rate for (api, user), bucket in self._buckets.items()}
+        return report
+
+
+def error_status(error: Exception):
+    """Returns the HTTP status of an HttpError or google.api_core error, or None."""
+    if isinstance(error, HttpError):
+        return error.resp.status
+    if type(error).__module__.startswith('google.api_core'):
+        # gRPC errors (Meet) carry the equivalent HTTP status, e.g. 429 for RESOURCE_EXHAUSTED.
+        code = getattr(error, 'code', None)
+        return code if isinstance(code, int) else None
+    return None
+
+
+def _is_rate_limit_403(error: Exception) -> bool:
+    details = getattr(error, 'error_details', None)
+    if not isinstance(details, list):
+        return False
+    return any(isinstance(d, dict) and d.get('reason') in RATE_LIMIT_REASONS for d in details)
+
+
+def retry_after(error: Exception):
+    """Returns the Retry-After delay of an HttpError in seconds, or None."""
+    if not isinstance(error, HttpError):
+        return None
+    value = error.resp.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(UTC)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE) -> float:
+    """Exponential backoff with full jitter for the given (0-based) attempt."""
+    return random.uniform(0, min(BACKOFF_CAP, base * (2 ** attempt)))
+
+
+def retry_delay(error: Exception, attempt: int, idempotent: bool = True):
+    """
+    Returns how long to wait before retrying after `error`, or None if it isn't retryable.
+    429s and rate-limit 403s are always retryable, since Google rejected the request
+    unprocessed. 5xx and connection errors are retryable only for `idempotent` requests:
+    Google may already have acted on the request, e.g. sent the email, before failing.
+    """
+    status = error_status(error)
+    rate_limited = status == 429 or (status == 403 and _is_rate_limit_403(error))
+    if rate_limited or (idempotent and status in RETRYABLE_STATUSES):
+        delay = retry_after(error)
+        if delay is not None:
+            return min(delay, RETRY_AFTER_CAP)
+        return backoff_delay(attempt)
+    if status is None and idempotent and isinstance(error, (ConnectionError, TimeoutError)):
+        return backoff_delay(attempt)
+    return None
+
+
+def api_for(request) -> str:
+    """Works out which API a googleapiclient HttpRequest is for from its URI."""
+    uri = getattr(request, 'uri', '') or ''
+    for api in ('gmail', 'calendar', 'meet'):
+        if f'/{api}/' in uri or f'//{api}.' in uri:
+            return api
+    return 'google'
+
+
+governor = RequestGovernor()
+register_stats('request_executor', governor.stats)
+
+
+def execute(request, api: str = None, user: str = 'me', max_retries: int = MAX_RETRIES, idempotent: bool = False):
+    """
+    Executes a googleapiclient HttpRequest through the shared governor. Use it
+    in place of request.execute(). POST requests are only retried after a
+    429 or a rate-limit 403, since Google may already have acted on them,
+    unless they are `idempotent` (e.g. batchModify, which sets labels).
+    """
+    return governor.call(
+        request.execute,
+        api or api_for(request),
+        user,
+        max_retries=max_retries,
+        idempotent=idempotent or getattr(request, 'method', 'GET') != 'POST',
+    )
+
+
+def _message_size(message) -> int:
+    # proto-plus messages (the Meet client's responses) expose the raw protobuf via type(message).pb().
+    to_pb = getattr(type(message), 'pb', None)
+    try:
+        return to_pb(message).ByteSize() if to_pb else 0
+    except Exception:
+        return 0
+
+
+def call(fn, api: str, user: str = 'me', max_retries: int = MAX_RETRIES, idempotent: bool = True):
+    """
+    Calls a client method that isn't an HttpRequest (e.g. a Meet gRPC call) through the governor.
+    Pass idempotent=False for calls that create something, as for POSTs in execute().
+    """
+    def timed():
+        # HttpRequests are counted by the HTTP transport; gRPC calls are counted here.
+        started = time.perf_counter()
+        response = None
+        try:
+            response = fn()
+            return response
+        finally:
+            add_upstream_call(time.perf_counter() - started, bytes_received=_message_size(response))
+
+    return governor.call(timed, api, user, max_retries=max_retries, idempotent=idempotent)
@@ -0,0 +1,153 @@
+# google_auth/services/response_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from google_auth.services.metrics import register_stats
+
+# How long (seconds) a cached response is served without asking Google. 0 disables the cache.
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', '60'))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+
+# Returned by a fetch function when the server answered 304 Not Modified.
+NOT_MODIFIED = object()
+
+
+@dataclass
+class _Entry:
+    text: str
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    A TTL + LRU cache of API responses, stored as JSON text and bounded by
+    the total size of that text.
+
+    Entries are keyed by resource, e.g. ('calendar', calendar_id, event_id).
+    An expired entry with an etag is kept so it can be revalidated with
+    If-None-Match. A 304 then renews it without transferring the resource
+    again. Expired entries without an etag count as misses.
+
+    A fetch runs outside the lock. If the key is written or invalidated
+    while it runs, its result is returned but not cached, so a read that
+    raced an update can't put the old version back.
+    """
+
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # key -> [generation, fetches in flight], only while a fetch of the key runs.
+        self._fetching = {}
+        self._counters = {"hits": 0, "misses": 0, "revalidations": 0, "not_modified": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def get_or_fetch(self, key: tuple, fetch) -> str:
+        """
+        Returns the cached JSON text for `key`, fetching it if needed.
+        `fetch(etag)` returns (text, etag), or NOT_MODIFIED if the etag it was
+        given is still current.
+        """
+        if not self.enabled:
+            return fetch(None)[0]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.expires_at > time.monotonic():
+                    self._counters["hits"] += 1
+                    return entry.text
+            self._counters["revalidations" if entry is not None and entry.etag else "misses"] += 1
+            fetching = self._fetching.setdefault(key, [0, 0])
+            fetching[1] += 1
+            generation = fetching[0]
+
+        try:
+            result = fetch(entry.etag if entry is not None else None)
+        except BaseException:
+            with self._lock:
+                self._end_fetch(key)
+            raise
+
+        with self._lock:
+            unchanged = self._end_fetch(key) == generation
+            if result is NOT_MODIFIED:
+                self._counters["not_modified"] += 1
+                # Only renew the entry we revalidated, and only if it wasn't replaced or invalidated meanwhile.
+                if unchanged and self._entries.get(key) is entry:
+                    entry.expires_at = time.monotonic() + self.ttl
+                return entry.text
+            text, etag = result
+            if unchanged:
+                self._store(key, text, etag)
+        return text
+
+    def put(self, key: tuple, text: str, etag: str = None):
+        """Caches a response, e.g. the result of a write, so the next read is a hit."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._changed(key)
+            self._store(key, text, etag)
+
+    def invalidate(self, key: tuple):
+        with self._lock:
+            self._changed(key)
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= len(entry.text)
+                self._counters["invalidations"] += 1
+
+    def _store(self, key: tuple, text: str, etag: str):
+        # Called with self._lock held.
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.text)
+        if len(text) > self.max_bytes:
+            return
+        self._entries[key] = _Entry(text, etag, time.monotonic() + self.ttl)
+        self._bytes += len(text)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.text)
+            self._counters["evictions"] += 1
+
+    def _changed(self, key: tuple):
+        # Called with self._lock held. Tells fetches of the key in flight that their result is stale.
+        fetching = self._fetching.get(key)
+        if fetching is not None:
+            fetching[0] += 1
+
+    def _end_fetch(self, key: tuple) -> int:
+        # Called with self._lock held. Returns the key's generation.
+        fetching = self._fetching[key]
+        fetching[1] -= 1
+        if fetching[1] == 0:
+            del self._fetching[key]
+        return fetching[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["entries"] = len(self._entries)
+            counters["bytes"] = self._bytes
+        lookups = counters["hits"] + counters["misses"] + counters["revalidations"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        counters["max_bytes"] = self.max_bytes
+        counters["ttl_seconds"] = self.ttl
+        return counters
+
+
+response_cache = ResponseCache()
+register_stats('response_cache', response_cache.stats)
@@ -0,0 +1,190 @@
+# google_auth/services/service_pool.py
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from google_auth.services.discovery import load_discovery_document
+from google_auth.services.instrumentation import instrumented_http
+from google_auth.services.metrics import register_stats
+
+
+_thread_local = threading.local()
+
+
+def thread_http(creds):
+    """
+    Returns this thread's AuthorizedHttp for `creds`. httplib2.Http objects are
+    not thread-safe, so every worker thread gets its own connections. Services
+    that share credentials (e.g. the unified server) share those connections.
+    """
+    https = getattr(_thread_local, 'https', None)
+    if https is None:
+        https = _thread_local.https = {}
+    # Keep a reference to creds in the value so its id() can't be reused.
+    cached = https.get(id(creds))
+    if cached is None:
+        from google_auth_httplib2 import AuthorizedHttp
+
+        # Counts requests and bytes against the tool call that sends them.
+        http = instrumented_http()
+        # Resumable uploads answer each chunk but the last with a 308, which
+        # isn't a redirect; googleapiclient's build_http does the same.
+        http.redirect_codes = http.redirect_codes - {308}
+        cached = https[id(creds)] = (creds, AuthorizedHttp(creds, http=http))
+    return cached[1]
+
+
+def build_thread_safe_service(api_name: str, api_version: str, creds, root_url: str = None):
+    """
+    Builds a discovery-based Resource that can be shared between threads:
+    every request is sent through the calling thread's own connection.
+    The Resource is built from the bundled discovery document, so no request
+    is made to the discovery endpoint. `root_url` replaces Google's host,
+    e.g. with a local fake backend for benchmarks.
+    """
+    # Imported on first use so that server startup doesn't pay for the client stack.
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.http import HttpRequest
+
+    def build_request(http, *args, **kwargs):
+        return HttpRequest(thread_http(creds), *args, **kwargs)
+
+    document = load_discovery_document(api_name, api_version)
+    if root_url:
+        document['rootUrl'] = root_url
+    return build_from_document(
+        document,
+        http=thread_http(creds),
+        requestBuilder=build_request,
+    )
+
+
+@dataclass
+class _ServiceSpec:
+    load_credentials: Callable
+    build_service: Callable
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class _StaticCredentials:
+    """Placeholder credentials for installed clients that handle their own auth."""
+    valid = True
+    expiry = None
+
+
+@dataclass
+class _PoolEntry:
+    service: object
+    creds: object
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class ServicePool:
+    """
+    Process-wide registry of authenticated Google API clients.
+
+    Each registered service is built once, on first use, and then handed out
+    to every tool call. The credential manager refreshes the underlying
+    credentials in place before they expire. Credentials that have expired
+    anyway go back through the manager, which refreshes them or, if the
+    refresh token was revoked, runs the login flow; only a service whose
+    credentials were replaced or lost is rebuilt or dropped.
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "rebuilds": 0,
+            "build_failures": 0,
+        }
+
+    def register(self, name: str, load_credentials, build_service):
+        """
+        Registers how to authenticate and build the service called `name`.
+        `load_credentials()` returns Credentials or None, and
+        `build_service(creds)` returns the client object or None.
+        """
+        self._specs[name] = _ServiceSpec(load_credentials, build_service)
+
+    def get(self, name: str):
+        """Returns the shared client for `name`, building it if needed. Returns None on failure."""
+        entry = self._entries.get(name)
+        if entry is not None and self._is_usable(entry.creds):
+            self._count("hits")
+            return entry.service
+
+        spec = self._specs[name]
+        with spec.lock:
+            # Another thread may have built the service while we waited.
+            entry = self._entries.get(name)
+            if entry is not None and self._is_usable(entry.creds):
+                self._count("hits")
+                return entry.service
+
+            creds = spec.load_credentials()
+            if entry is not None and creds is entry.creds:
+                # Refreshed in place, so the client built on them still works.
+                self._count("hits")
+                return entry.service
+
+            self._count("misses" if entry is None else "rebuilds")
+            service = spec.build_service(creds) if creds else None
+            if service is None:
+                self._count("build_failures")
+                self._entries.pop(name, None)
+                return None
+
+            self._entries[name] = _PoolEntry(service=service, creds=creds)
+
+        return service
+
+    def use_credentials(self, names: list[str], load_credentials):
+        """
+        Makes the given registered services authenticate through a different
+        credential loader, e.g. one shared token with the combined scopes.
+        Clients that are already built are dropped.
+        """
+        for name in names:
+            spec = self._specs[name]
+            spec.load_credentials = load_credentials
+            self.invalidate(name)
+
+    def install(self, name: str, service, creds=None):
+        """
+        Puts a prebuilt client into the pool, e.g. a client pointed at a fake
+        backend for benchmarks. Without credentials the client never expires.
+        """
+        self._entries[name] = _PoolEntry(service=service, creds=creds or _StaticCredentials())
+
+    def invalidate(self, name: str):
+        """Drops the cached client for `name`; the next get() rebuilds it."""
+        self._entries.pop(name, None)
+
+    def stats(self) -> dict:
+        """Returns the pool counters and the services that are currently warm."""
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"] + counters["rebuilds"]
+        counters["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        counters["warm_services"] = sorted(self._entries)
+        return counters
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    @staticmethod
+    def _is_usable(creds) -> bool:
+        # Expired credentials are checked with the credential manager rather
+        # than refreshed by the client, which can't recover from a revoked token.
+        return creds.valid
+
+
+service_pool = ServicePool()
+register_stats('service_pool', service_pool.stats)
@@ -0,0 +1,53 @@
+# google_auth/services/sync_state.py
+
+import json
+import os
+import sys
+import threading
+
+from google_auth.services.credential_store import FileTokenBackend
+
+# Incremental sync cursors (Calendar syncTokens, Gmail historyIds) are kept
+# next to the OAuth tokens so they survive restarts.
+SYNC_STATE_FILE = os.environ.get('GOOGLE_SYNC_STATE_FILE', 'credentials/sync_state.json')
+
+
+class SyncStateStore:
+    """
+    A small JSON file of sync cursors, grouped by namespace (e.g. 'calendar')
+    and keyed by resource (e.g. a calendar_id). Safe to use from several
+    threads and processes: every change re-reads the file under an flock
+    and writes it back atomically, so servers sharing the file never
+    overwrite each other's cursors.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = FileTokenBackend(path)
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str):
+        with self._lock:
+            return self._load().get(namespace, {}).get(key)
+
+    def set(self, namespace: str, key: str, value):
+        with self._lock, self._file.lock():
+            state = self._load()
+            state.setdefault(namespace, {})[key] = value
+            self._file.save(json.dumps(state))
+
+    def delete(self, namespace: str, key: str):
+        with self._lock, self._file.lock():
+            state = self._load()
+            if state.get(namespace, {}).pop(key, None) is not None:
+                self._file.save(json.dumps(state))
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self._file.load() or '{}')
+        except Exception as e:
+            print(f"Error loading sync state from {self._path}: {e}", file=sys.stderr)
+            return {}
+
+
+sync_state = SyncStateStore(SYNC_STATE_FILE)
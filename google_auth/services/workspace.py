@@ -0,0 +1,42 @@
+# google_auth/services/workspace.py
+
+import importlib
+
+from google_auth.services.credentials import load_credentials
+from google_auth.services.service_pool import service_pool
+
+# One token with the combined scopes of every service the unified server runs.
+WORKSPACE_TOKEN_FILE = 'credentials/token_workspace.json'
+
+SERVICE_MODULES = {
+    'calendar': 'google_auth.services.google_calendar',
+    'gmail': 'google_auth.services.google_mail',
+    'meet': 'google_auth.services.google_meet',
+}
+
+
+class SharedCredentials:
+    """
+    A credential loader that loads one token for several services. The
+    credential manager keeps one object per token file, so every service gets
+    the same object.
+    """
+
+    def __init__(self, scopes: list[str], token_file: str):
+        self.scopes = scopes
+        self.token_file = token_file
+
+    def __call__(self):
+        return load_credentials(self.scopes, self.token_file, "Workspace")
+
+
+def use_shared_credentials(services: list[str], token_file: str = WORKSPACE_TOKEN_FILE) -> SharedCredentials:
+    """
+    Switches the given services (e.g. ['calendar', 'gmail', 'meet']) to a single
+    token with their combined scopes. The services then also share HTTP connections.
+    """
+    modules = [importlib.import_module(SERVICE_MODULES[name]) for name in services]
+    scopes = sorted({scope for module in modules for scope in module.SCOPES})
+    shared = SharedCredentials(scopes, token_file)
+    service_pool.use_credentials(services, shared)
+    return shared
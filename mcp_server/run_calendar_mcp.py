@@ -1,7 +1,27 @@
+import hashlib
 import json
+import sys
+import uuid
+from itertools import islice
 from datetime import datetime, timedelta, UTC
 from fastmcp import FastMCP
+from googleapiclient.errors import HttpError
 from google_auth.services.google_calendar import get_calendar_service
+from google_auth.services.blocking import offload, run_parallel
+from google_auth.services.discovery import preload_discovery_documents
+from google_auth.services.batching import CALENDAR_BATCH_LIMIT, execute_batch, http_error_details
+from google_auth.services.calendar_sync import fetch_event_changes
+from google_auth.services.event_store import event_store, to_timestamp
+from google_auth.services.instrumentation import serve_metrics_from_env
+from google_auth.services.google_meet import get_meet_service
+from google_auth.services.job_queue import Job, PermanentJobError, job_queue, job_status
+from google_auth.services.intervals import find_free_slots as find_free_intervals, merge_intervals
+from google_auth.services.meet_space_pool import create_space, meet_space_pool
+from google_auth.services.pagination import decode_cursor, encode_cursor, iter_items, iter_pages
+from google_auth.services.recurrence import INSTANCE_FIELDS, expand_events
+from google_auth.services.request_executor import error_status, execute
+from google_auth.services.response_cache import NOT_MODIFIED, response_cache
+from google_auth.services.sync_state import sync_state
 
 mcp = FastMCP("GoogleCalendar")
 
@@ -11,99 +31,506 @@ def create_error_response(message: str, details: str = None) -> str:
         error_obj["details"] = details
     return json.dumps(error_obj)
 
+def create_conflict_response(event_id: str, sent_etag: str, current_etag: str = None) -> str:
+    conflict_obj = {
+        "status": "conflict",
+        "event_id": event_id,
+        "message": "The event was modified since the given etag. Fetch it again and retry.",
+        "sent_etag": sent_etag,
+    }
+    if current_etag:
+        conflict_obj["current_etag"] = current_etag
+    return json.dumps(conflict_obj)
+
+def normalize_attendees(attendees: list) -> list:
+    """Accepts attendees as email strings or {'email': ...} dicts and returns the dict form."""
+    new_attendees = []
+    for attendee in attendees:
+        if isinstance(attendee, dict) and 'email' in attendee:
+            new_attendees.append(attendee)
+        elif isinstance(attendee, str):
+            new_attendees.append({'email': attendee})
+    return new_attendees
+
+def build_event_body(summary: str, start_datetime: str, end_datetime: str, attendees: list = None, recurrence: str = None, color_id: str = None) -> dict:
+    """Builds the body of a new event from the create_event arguments."""
+    event_body = {
+        'summary': summary,
+        'start': {'dateTime': start_datetime, 'timeZone': 'UTC'},
+        'end': {'dateTime': end_datetime, 'timeZone': 'UTC'},
+    }
+    if attendees:
+        new_attendees = normalize_attendees(attendees)
+        if new_attendees:
+            event_body['attendees'] = new_attendees
+
+    if recurrence:
+        event_body['recurrence'] = [recurrence]
+
+    if color_id:
+        event_body['colorId'] = color_id
+    return event_body
+
+def build_event_patch(updated_summary: str = None, start_datetime: str = None, end_datetime: str = None, attendees: list = None, recurrence: str = None, color_id: str = None) -> dict:
+    """Builds a patch body that only contains the fields being changed."""
+    patch = {}
+    if updated_summary:
+        patch['summary'] = updated_summary
+    if start_datetime:
+        patch['start'] = {'dateTime': start_datetime}
+    if end_datetime:
+        patch['end'] = {'dateTime': end_datetime}
+    if attendees is not None:
+        patch['attendees'] = normalize_attendees(attendees)
+    if recurrence:
+        patch['recurrence'] = [recurrence]
+    if color_id:
+        patch['colorId'] = color_id
+    return patch
+
+def fresh_event_store(service, calendar_id: str):
+    """
+    Returns the local event store, first bringing calendar_id up to date if its last sync
+    is older than the staleness bound. Returns None when the store is disabled.
+    """
+    if event_store is None:
+        return None
+    if not event_store.is_fresh(calendar_id):
+        event_store.record_miss()
+        events, sync_token, full_sync = fetch_event_changes(service, calendar_id, event_store.sync_token(calendar_id))
+        event_store.apply_sync(calendar_id, events, sync_token, full_sync)
+    return event_store
+
+# The largest page events().list returns.
+MAX_EVENTS_PAGE_SIZE = 2500
+# How far past time_min list_events expands recurring events when no time_max is given.
+DEFAULT_EXPANSION_WINDOW = timedelta(days=30)
+
+def list_expanded_instances(service, calendar_id: str, time_min: str, time_max: str, max_results: int) -> str:
+    """
+    Lists events with singleEvents=False, i.e. every recurring series once instead of every instance,
+    and expands the series locally; see recurrence.py. Series with rules recurrence.py can't evaluate
+    are expanded by Google through events().instances().
+    """
+    window_start = to_timestamp(time_min)
+    window_end = to_timestamp(time_max) if time_max else window_start + DEFAULT_EXPANSION_WINDOW.total_seconds()
+    time_max = format_timestamp(window_end)
+    # showDeleted=True includes the cancelled instances of a series, which must not be expanded.
+    events = iter_items(
+        service.events().list,
+        calendarId=calendar_id, timeMin=time_min, timeMax=time_max,
+        singleEvents=False, showDeleted=True, maxResults=MAX_EVENTS_PAGE_SIZE,
+    )
+
+    def expand_on_google(series: dict):
+        return iter_items(
+            service.events().instances,
+            calendarId=calendar_id, eventId=series['id'], timeMin=time_min, timeMax=time_max,
+            maxResults=MAX_EVENTS_PAGE_SIZE,
+        )
+
+    instances = islice(expand_events(events, window_start, window_end, fallback=expand_on_google), max_results)
+    return json.dumps({"fields": INSTANCE_FIELDS, "instances": list(instances)})
+
 @mcp.tool()
-def list_events(calendar_id: str = 'primary', max_results: int = 10, time_min: str = None) -> str:
+@offload
+def list_events(calendar_id: str = 'primary', max_results: int = 10, time_min: str = None, paginate: bool = False, page_token: str = None, time_max: str = None, single_events: bool = True) -> str:
     """
     Lists events from a specified calendar. Defaults to the primary calendar.
     If time_min is not provided, it lists upcoming events.
-    time_min should be in ISO 8601 format (e.g., '2024-05-21T00:00:00Z').
+    time_min and time_max should be in ISO 8601 format (e.g., '2024-05-21T00:00:00Z').
     Returns a JSON string of the event list.
+    With paginate=True, returns one page of up to max_results events as
+    {"items": [...], "next_page_token": ..., "time_min": ..., "time_max": ...}. Pass next_page_token
+    back as page_token to get the next page; it carries the page's time_min and time_max, which
+    override the arguments. It is null on the last page.
+    With single_events=False, recurring events are fetched once as series and their
+    occurrences between time_min and time_max (default: 30 days later) are computed locally.
+    Returns up to max_results instances, ordered by start, as compact rows:
+    {"fields": ["id", "start", "end", "summary", "recurring_event_id"], "instances": [[...], ...]}.
     """
     service = get_calendar_service()
     if not service:
         return create_error_response("Failed to authenticate with Google Calendar.")
     
     try:
+        if page_token:
+            # The token is only valid for the query it was issued for.
+            page_token, window = decode_cursor(page_token)
+            time_min, time_max = window['time_min'], window.get('time_max')
         if not time_min:
             time_min = datetime.now(UTC).isoformat()
 
-        events_result = service.events().list(
+        if not single_events:
+            return list_expanded_instances(service, calendar_id, time_min, time_max, max_results)
+
+        store = None if (paginate or page_token or time_max) else fresh_event_store(service, calendar_id)
+        if store is not None:
+            return json.dumps(store.query(calendar_id, to_timestamp(time_min), max_results=max_results))
+
+        window = {'timeMax': time_max} if time_max else {}
+        pages = iter_pages(
+            service.events().list, page_token=page_token,
             calendarId=calendar_id, timeMin=time_min, maxResults=max_results,
-            singleEvents=True, orderBy='startTime'
-        ).execute()
+            singleEvents=True, orderBy='startTime', **window
+        )
+        events_result = next(pages)
 
+        if paginate or page_token:
+            next_page_token = events_result.get('nextPageToken')
+            return json.dumps({
+                "items": events_result.get('items', []),
+                "next_page_token": encode_cursor(next_page_token, {'time_min': time_min, 'time_max': time_max}) if next_page_token else None,
+                "time_min": time_min,
+                "time_max": time_max,
+            })
         return json.dumps(events_result.get('items', []))
     except Exception as e:
         return create_error_response("An API error occurred during list_events.", str(e))
+
+@mcp.tool()
+@offload
+def sync_events(calendar_id: str = 'primary', reset: bool = False) -> str:
+    """
+    Returns only the events that changed on a calendar since the previous sync_events call.
+    The first call (or reset=True) performs a full sync and returns every event.
+    Returns JSON {"full_sync": bool, "changed": [events], "deleted": [event ids]}.
+    """
+    service = get_calendar_service()
+    if not service:
+        return create_error_response("Failed to authenticate with Google Calendar.")
+
+    try:
+        sync_token = None if reset else sync_state.get('calendar', calendar_id)
+        events, next_sync_token, full_sync = fetch_event_changes(service, calendar_id, sync_token)
+        if next_sync_token:
+            sync_state.set('calendar', calendar_id, next_sync_token)
+
+        changed = [event for event in events if event.get('status') != 'cancelled']
+        deleted = [event['id'] for event in events if event.get('status') == 'cancelled']
+        # Changes made outside this server show up here; drop their cached copies.
+        for event in events:
+            response_cache.invalidate(('calendar', calendar_id, event['id']))
+        return json.dumps({
+            "calendar_id": calendar_id,
+            "full_sync": full_sync,
+            "changed": changed,
+            "deleted": deleted,
+        })
+    except Exception as e:
+        return create_error_response("An API error occurred during sync_events.", str(e))
     
+def insert_event(service, calendar_id: str, event_body: dict) -> dict:
+    """Inserts an event, notifying the attendees, and returns it. Raises on API errors."""
+    created_event = execute(service.events().insert(
+                                        calendarId=calendar_id, 
+                                        body=event_body,
+                                        sendNotifications=True,
+                                    ))
+    if event_store is not None:
+        event_store.put(calendar_id, created_event)
+    response_cache.put(('calendar', calendar_id, created_event['id']), json.dumps(created_event), created_event.get('etag'))
+    return created_event
+
 @mcp.tool()
-def create_event(summary: str, start_datetime: str, end_datetime: str, calendar_id: str = 'primary', attendees: list = None, recurrence: str = None, color_id: str = None) -> str:
+@offload
+def create_event(summary: str, start_datetime: str, end_datetime: str, calendar_id: str = 'primary', attendees: list = None, recurrence: str = None, color_id: str = None, async_mode: bool = False, idempotency_key: str = None) -> str:
     """
     Creates a new event on a specified calendar. Defaults to the primary calendar.
     'start_datetime' and 'end_datetime' must be in ISO 8601 format (e.g., '2024-05-21T10:00:00-07:00').
     Returns the created event object as a JSON string.
+    With async_mode=True, the event is queued durably and a job is returned right away; see job_status.
+    Creating the same event again returns the existing job; pass a different idempotency_key to create a duplicate on purpose.
     """
+    event_body = build_event_body(summary, start_datetime, end_datetime, attendees, recurrence, color_id)
+    if async_mode:
+        job, created = job_queue.enqueue('create_event', {'calendar_id': calendar_id, 'event_body': event_body}, idempotency_key)
+        return json.dumps({**job, "deduplicated": not created})
+
     service = get_calendar_service()
     if not service:
         return create_error_response("Failed to authenticate with Google Calendar.")
 
-    event_body = {
-        'summary': summary,
-        'start': {'dateTime': start_datetime, 'timeZone': 'UTC'},
-        'end': {'dateTime': end_datetime, 'timeZone': 'UTC'},
-    }
-    if attendees:
-        new_attendees = []
-        for attendee in attendees:
-            if isinstance(attendee, dict) and 'email' in attendee:
-                new_attendees.append(attendee)
-            elif isinstance(attendee, str):
-                new_attendees.append({'email': attendee})
-        if new_attendees:
-            event_body['attendees'] = new_attendees
+    try:
+        return json.dumps(insert_event(service, calendar_id, event_body))
+    except Exception as e:
+        return create_error_response("An API error occurred during create_event.", str(e))
 
-    if recurrence:
-        event_body['recurrence'] = [recurrence]
+def job_event_id(job: Job) -> str:
+    # Event IDs may use the characters 0-9 and a-v; a hex digest qualifies.
+    return hashlib.sha256(job.idempotency_key.encode()).hexdigest()
 
-    if color_id:
-        event_body['colorId'] = color_id
+def run_create_event_job(payload: dict, job: Job) -> dict:
+    """Creates a queued event under an ID derived from the job, so a retry can't create it twice."""
+    service = get_calendar_service()
+    if not service:
+        raise RuntimeError("Failed to authenticate with Google Calendar.")
+    event_id = job_event_id(job)
+    try:
+        return insert_event(service, payload['calendar_id'], {**payload['event_body'], 'id': event_id})
+    except HttpError as e:
+        if e.resp.status != 409:
+            raise
+        # An earlier attempt created it already, unless the event was deleted
+        # since: Google keeps the IDs of deleted events reserved.
+        event = execute(service.events().get(calendarId=payload['calendar_id'], eventId=event_id))
+        if event.get('status') == 'cancelled':
+            raise PermanentJobError(f"Event {event_id} was created by this job and has since been deleted.")
+        return event
+    
+# The freebusy endpoint accepts at most 50 calendars per query.
+FREEBUSY_CALENDAR_LIMIT = 50
+
+def query_busy_intervals(service, calendar_ids: list[str], time_min: str, time_max: str) -> tuple[list, dict]:
+    """
+    Runs freebusy().query for all calendars (in chunks of 50) and returns
+    (busy intervals as epoch-second tuples, {calendar_id: errors}).
+    """
+    busy, errors = [], {}
+    for start in range(0, len(calendar_ids), FREEBUSY_CALENDAR_LIMIT):
+        chunk = calendar_ids[start:start + FREEBUSY_CALENDAR_LIMIT]
+        # A read, even though it is sent as a POST, so it is safe to retry.
+        response = execute(service.freebusy().query(body={
+            'timeMin': time_min,
+            'timeMax': time_max,
+            'items': [{'id': calendar_id} for calendar_id in chunk],
+        }), idempotent=True)
+        for calendar_id, calendar in response.get('calendars', {}).items():
+            if calendar.get('errors'):
+                errors[calendar_id] = calendar['errors']
+            busy.extend(
+                (to_timestamp(interval['start']), to_timestamp(interval['end']))
+                for interval in calendar.get('busy', [])
+            )
+    return busy, errors
+
+def format_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, UTC).isoformat()
+
+@mcp.tool()
+@offload
+def find_free_slots(calendar_ids: list[str], time_min: str, time_max: str, duration_minutes: int = 30, max_slots: int = 10, step_minutes: int = 30, working_hours_start: int = None, working_hours_end: int = None, timezone: str = 'UTC') -> str:
+    """
+    Finds time slots in which all the given calendars (or attendee emails) are free, using one freebusy query.
+    time_min and time_max bound the search and must be in ISO 8601 format (e.g., '2024-05-21T00:00:00Z').
+    Candidate slots of duration_minutes start every step_minutes inside each free gap.
+    If working_hours_start and working_hours_end (hours, 0-24, in 'timezone') are given, weekday slots
+    inside those hours are ranked first. Otherwise the earliest slots come first.
+    Returns JSON {"slots": [{"start", "end"}], "errors": {calendar_id: [...]}}.
+    """
+    service = get_calendar_service()
+    if not service:
+        return create_error_response("Failed to authenticate with Google Calendar.")
+    if (working_hours_start is None) != (working_hours_end is None):
+        return create_error_response("Pass both working_hours_start and working_hours_end, or neither.")
+    if working_hours_start is not None and not 0 <= working_hours_start < working_hours_end <= 24:
+        return create_error_response("Working hours must satisfy 0 <= working_hours_start < working_hours_end <= 24.")
+    if duration_minutes <= 0 or step_minutes <= 0:
+        return create_error_response("duration_minutes and step_minutes must be positive.")
 
     try:
-        created_event = service.events().insert(
-                                            calendarId=calendar_id, 
-                                            body=event_body,
-                                            sendNotifications=True,
-                                        ).execute()
-        return json.dumps(created_event)
+        busy, errors = query_busy_intervals(service, calendar_ids, time_min, time_max)
+        working_hours = (working_hours_start, working_hours_end) if working_hours_start is not None else None
+        slots = find_free_intervals(
+            busy, to_timestamp(time_min), to_timestamp(time_max),
+            duration=duration_minutes * 60, step=step_minutes * 60, max_slots=max_slots,
+            working_hours=working_hours, timezone=timezone,
+        )
+        return json.dumps({
+            "slots": [{"start": format_timestamp(start), "end": format_timestamp(end)} for start, end in slots],
+            "errors": errors,
+        })
     except Exception as e:
-        return create_error_response("An API error occurred during create_event.", str(e))
-    
+        return create_error_response("An API error occurred during find_free_slots.", str(e))
+
+# How far past the requested meeting schedule_meeting looks for other slots when someone is busy.
+SUGGESTION_WINDOW = timedelta(days=7)
+CONFERENCE_TYPES = ('google_meet', 'pooled_space', 'none')
+
+def take_meet_space() -> dict:
+    """Returns a space from the Meet space pool, or creates one if the pool is empty, disabled or not run by this process."""
+    space = meet_space_pool.take()
+    if space is None:
+        service = get_meet_service()
+        if not service:
+            raise RuntimeError("Failed to authenticate with meet")
+        space = create_space(service)
+    return space
+
+def meet_conference_data(space: dict) -> dict:
+    """Builds the conferenceData that attaches an existing Meet space to an event."""
+    return {
+        'conferenceSolution': {'key': {'type': 'hangoutsMeet'}},
+        'conferenceId': json.loads(space['json']).get('meetingCode'),
+        'entryPoints': [{'entryPointType': 'video', 'uri': space['meeting_uri']}],
+    }
+
 @mcp.tool()
-def delete_event(event_id: str, calendar_id: str = 'primary') -> str:
-    """Deletes an event from a specified calendar using its unique event_id."""
+@offload
+def schedule_meeting(summary: str, start_datetime: str, end_datetime: str, attendees: list = None, calendar_id: str = 'primary', description: str = None, conference: str = 'google_meet', check_availability: bool = True, allow_conflicts: bool = False, max_suggestions: int = 3) -> str:
+    """
+    Books a video meeting in one call: checks that the calendar and the attendees are free,
+    creates the event with a Google Meet link and emails the invitations.
+    'start_datetime' and 'end_datetime' must be in ISO 8601 format (e.g., '2024-05-21T10:00:00-07:00').
+    conference='google_meet' has Calendar create the Meet link together with the event, 'pooled_space'
+    attaches a space from the Meet space pool (see create_meet_space), and 'none' adds no video call.
+    If anyone is busy, nothing is booked unless allow_conflicts=True. The response then lists the busy
+    periods and up to max_suggestions free slots of the same length in the following 7 days.
+    Returns JSON {"status": "booked", "meeting_uri", "event"} or {"status": "conflict", "conflicts", "suggested_slots"}.
+    """
     service = get_calendar_service()
     if not service:
         return create_error_response("Failed to authenticate with Google Calendar.")
-    
-    try:    
-        service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
-        return json.dumps({"status": "success", "message": f"Event {event_id} deleted."})
+    if conference not in CONFERENCE_TYPES:
+        return create_error_response(f"Invalid conference: '{conference}'", "Use 'google_meet', 'pooled_space' or 'none'.")
+
+    event_body = build_event_body(summary, start_datetime, end_datetime, attendees)
+    if description:
+        event_body['description'] = description
+    if conference == 'google_meet':
+        event_body['conferenceData'] = {'createRequest': {'requestId': uuid.uuid4().hex, 'conferenceSolutionKey': {'type': 'hangoutsMeet'}}}
+
+    space, insert_sent = None, False
+    try:
+        start, end = to_timestamp(start_datetime), to_timestamp(end_datetime)
+        if end <= start:
+            return create_error_response("end_datetime must be after start_datetime.")
+        # The availability check and getting a Meet space don't depend on each other, so they run together.
+        steps = {}
+        if check_availability:
+            calendar_ids = [calendar_id] + [attendee['email'] for attendee in event_body.get('attendees', [])]
+            window_end = format_timestamp(end + SUGGESTION_WINDOW.total_seconds())
+            steps['busy'] = lambda: query_busy_intervals(service, list(dict.fromkeys(calendar_ids)), start_datetime, window_end)
+        if conference == 'pooled_space':
+            steps['space'] = take_meet_space
+        outcomes = dict(zip(steps, run_parallel(list(steps.values()))))
+
+        if 'space' in outcomes:
+            space, error = outcomes['space']
+            if error is not None:
+                raise error
+            event_body['conferenceData'] = meet_conference_data(space)
+
+        unchecked = {}
+        if 'busy' in outcomes:
+            (busy, unchecked), error = outcomes['busy']
+            if error is not None:
+                raise error
+            conflicts = [(busy_start, busy_end) for busy_start, busy_end in merge_intervals(busy) if busy_start < end and busy_end > start]
+            if conflicts and not allow_conflicts:
+                if space is not None:
+                    meet_space_pool.release(space)
+                slots = find_free_intervals(
+                    busy, start, to_timestamp(window_end),
+                    duration=end - start, step=30 * 60, max_slots=max_suggestions,
+                )
+                return json.dumps({
+                    "status": "conflict",
+                    "conflicts": [{"start": format_timestamp(busy_start), "end": format_timestamp(busy_end)} for busy_start, busy_end in conflicts],
+                    "suggested_slots": [{"start": format_timestamp(slot_start), "end": format_timestamp(slot_end)} for slot_start, slot_end in slots],
+                    "unchecked": unchecked,
+                })
+
+        # sendUpdates has Google email the invitations as part of the insert.
+        insert_sent = True
+        created_event = execute(service.events().insert(
+            calendarId=calendar_id,
+            body=event_body,
+            conferenceDataVersion=0 if conference == 'none' else 1,
+            sendUpdates='all',
+        ))
     except Exception as e:
-        return create_error_response(f"Could not delete event {event_id}.", str(e))
+        # After a 5xx or a lost connection the event may exist with the space
+        # attached, so the space goes back to the pool only if Google rejected
+        # the insert or it was never sent.
+        status = error_status(e)
+        if space is not None and (not insert_sent or (status is not None and 400 <= status < 500)):
+            meet_space_pool.release(space)
+        return create_error_response("An API error occurred during schedule_meeting.", str(e))
+
+    if event_store is not None:
+        event_store.put(calendar_id, created_event)
+    response_cache.put(('calendar', calendar_id, created_event['id']), json.dumps(created_event), created_event.get('etag'))
+    video = [entry['uri'] for entry in created_event.get('conferenceData', {}).get('entryPoints', []) if entry.get('entryPointType') == 'video']
+    result = {
+        "status": "booked",
+        "meeting_uri": created_event.get('hangoutLink') or (video[0] if video else None),
+        "event": created_event,
+    }
+    if unchecked:
+        # Usually attendees outside the organization, whose free/busy isn't visible.
+        result["unchecked"] = unchecked
+    return json.dumps(result)
+
+def remove_event(service, calendar_id: str, event_id: str):
+    """Deletes an event and drops the local copies of it. Raises on API errors."""
+    execute(service.events().delete(calendarId=calendar_id, eventId=event_id))
+    if event_store is not None:
+        event_store.delete(calendar_id, event_id)
+    response_cache.invalidate(('calendar', calendar_id, event_id))
 
 @mcp.tool()
-def update_event(event_id: str, calendar_id: str = 'primary', updated_summary: str = None, start_datetime: str = None, end_datetime: str = None, attendees: list = None, recurrence: str = None, color_id: str = None) -> str:
+@offload
+def delete_event(event_id: str, calendar_id: str = 'primary', async_mode: bool = False) -> str:
     """
-    Updates an existing event. Fetches the event first and only modifies the provided fields.
-    All other fields like attendees and location will be preserved.
+    Deletes an event from a specified calendar using its unique event_id.
+    With async_mode=True, the deletion is queued durably and a job is returned right away; see job_status.
     """
+    if async_mode:
+        job, created = job_queue.enqueue('delete_event', {'calendar_id': calendar_id, 'event_id': event_id})
+        return json.dumps({**job, "deduplicated": not created})
+
     service = get_calendar_service()
     if not service:
         return create_error_response("Failed to authenticate with Google Calendar.")
     
+    try:    
+        remove_event(service, calendar_id, event_id)
+        return json.dumps({"status": "success", "message": f"Event {event_id} deleted."})
+    except Exception as e:
+        return create_error_response(f"Could not delete event {event_id}.", str(e))
+
+def run_delete_event_job(payload: dict, job: Job) -> dict:
+    service = get_calendar_service()
+    if not service:
+        raise RuntimeError("Failed to authenticate with Google Calendar.")
     try:
+        remove_event(service, payload['calendar_id'], payload['event_id'])
+    except HttpError as e:
+        # 410 Gone: an earlier attempt deleted it already.
+        if not (e.resp.status in (404, 410) and job.retried):
+            raise
+    return {"status": "success", "message": f"Event {payload['event_id']} deleted."}
+
+class EventConflict(Exception):
+    """The event's etag no longer matches the one the update was based on."""
+
+    def __init__(self, event_id: str, sent_etag: str, current_etag: str = None):
+        super().__init__(f"Event {event_id} was modified since etag {sent_etag}.")
+        self.event_id = event_id
+        self.sent_etag = sent_etag
+        self.current_etag = current_etag
+
+def modify_event(service, event_id: str, calendar_id: str = 'primary', updated_summary: str = None, start_datetime: str = None, end_datetime: str = None, attendees: list = None, recurrence: str = None, color_id: str = None, etag: str = None, fields: str = None, mode: str = 'patch') -> dict:
+    """
+    Applies an update_event change and returns the updated event.
+    Raises EventConflict if the event no longer matches 'etag', and HttpError on other API errors.
+    """
+    optional_params = {'fields': fields} if fields else {}
+    if mode == 'patch':
+        patch = build_event_patch(updated_summary, start_datetime, end_datetime, attendees, recurrence, color_id)
+        request = service.events().patch(
+            calendarId=calendar_id,
+            eventId=event_id,
+            body=patch,
+            sendNotifications=True,
+            **optional_params,
+        )
+    else:
         # Get the existing event
-        event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+        event = execute(service.events().get(calendarId=calendar_id, eventId=event_id))
+        if etag and event.get('etag') != etag:
+            raise EventConflict(event_id, etag, event.get('etag'))
 
         # Update only the provided fields
         if updated_summary:
@@ -113,30 +540,98 @@ def update_event(event_id: str, calendar_id: str = 'primary', updated_summary: s
         if end_datetime:
             event['end']['dateTime'] = end_datetime
         if attendees is not None:
-            new_attendees = []
-            for attendee in attendees:
-                if isinstance(attendee, dict) and 'email' in attendee:
-                    new_attendees.append(attendee)
-                elif isinstance(attendee, str):
-                    new_attendees.append({'email': attendee})
-            event['attendees'] = new_attendees
+            event['attendees'] = normalize_attendees(attendees)
         if recurrence:
             event['recurrence'] = [recurrence]
         if color_id:
             event['colorId'] = color_id
         # Update the event
-        updated_event = service.events().update(
+        request = service.events().update(
             calendarId=calendar_id,
             eventId=event_id,
             body=event,
             sendNotifications=True,
-        ).execute()
-        
-        return json.dumps(updated_event)
+            **optional_params,
+        )
+        # Guard the write against changes made between the get and the update.
+        etag = etag or event.get('etag')
+
+    if etag:
+        request.headers['If-Match'] = etag
+    try:
+        updated_event = execute(request)
+    except HttpError as e:
+        if e.resp.status == 412:
+            raise EventConflict(event_id, etag) from e
+        raise
+    if event_store is not None:
+        if fields:
+            # A partial response can't be stored; re-sync before the next read instead.
+            event_store.delete(calendar_id, event_id)
+            event_store.mark_stale(calendar_id)
+        else:
+            event_store.put(calendar_id, updated_event)
+
+    if fields:
+        response_cache.invalidate(('calendar', calendar_id, event_id))
+    else:
+        response_cache.put(('calendar', calendar_id, event_id), json.dumps(updated_event), updated_event.get('etag'))
+    return updated_event
+
+@mcp.tool()
+@offload
+def update_event(event_id: str, calendar_id: str = 'primary', updated_summary: str = None, start_datetime: str = None, end_datetime: str = None, attendees: list = None, recurrence: str = None, color_id: str = None, etag: str = None, fields: str = None, mode: str = 'patch', async_mode: bool = False, idempotency_key: str = None) -> str:
+    """
+    Updates an existing event. Only the provided fields are modified; all other fields like
+    attendees and location are preserved.
+    mode='patch' (default) sends a single patch request with just the changed fields.
+    mode='replace' fetches the full event first and writes the whole event back.
+    If 'etag' is given (the event's last known etag), the update only succeeds if nobody changed
+    the event since; otherwise a JSON object with "status": "conflict" is returned.
+    'fields' selects the parts of the updated event to return, e.g. 'id,etag,updated'.
+    With async_mode=True, the update is queued durably and a job is returned right away; see job_status.
+    Every call queues a new update, since setting a field back to an earlier value is a new change;
+    pass an idempotency_key to make retrying the same call safe.
+    """
+    if mode not in ('patch', 'replace'):
+        return create_error_response(f"Invalid mode: '{mode}'", "Use 'patch' or 'replace'.")
+
+    arguments = {
+        'event_id': event_id, 'calendar_id': calendar_id, 'updated_summary': updated_summary,
+        'start_datetime': start_datetime, 'end_datetime': end_datetime, 'attendees': attendees,
+        'recurrence': recurrence, 'color_id': color_id, 'etag': etag, 'fields': fields, 'mode': mode,
+    }
+    if async_mode:
+        job, created = job_queue.enqueue('update_event', arguments, idempotency_key or uuid.uuid4().hex)
+        return json.dumps({**job, "deduplicated": not created})
+
+    service = get_calendar_service()
+    if not service:
+        return create_error_response("Failed to authenticate with Google Calendar.")
+
+    try:
+        return json.dumps(modify_event(service, **arguments))
+    except EventConflict as e:
+        return create_conflict_response(e.event_id, e.sent_etag, e.current_etag)
     except Exception as e:
         return create_error_response(f"Could not update event: {e}")
+
+def run_update_event_job(payload: dict, job: Job) -> dict:
+    """Applies a queued update. Patches and replacements set the same fields again, so retrying is safe."""
+    service = get_calendar_service()
+    if not service:
+        raise RuntimeError("Failed to authenticate with Google Calendar.")
+    try:
+        return modify_event(service, **payload)
+    except EventConflict as e:
+        raise PermanentJobError(str(e)) from e
+
+job_queue.register('create_event', api='calendar', handler=run_create_event_job)
+job_queue.register('update_event', api='calendar', handler=run_update_event_job)
+job_queue.register('delete_event', api='calendar', handler=run_delete_event_job)
     
 @mcp.tool()
+@offload
 def get_event_by_id(event_id: str, calendar_id: str = 'primary') -> str:
     """Retrieves a specific event by its ID."""
     service = get_calendar_service()
@@ -144,11 +639,133 @@ def get_event_by_id(event_id: str, calendar_id: str = 'primary') -> str:
         return create_error_response("Failed to authenticate with Google Calendar.")
     
     try:
-        event = service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-        return json.dumps(event)
+        store = fresh_event_store(service, calendar_id)
+        if store is not None:
+            event = store.get(calendar_id, event_id)
+            if event is not None:
+                return json.dumps(event)
+
+        def fetch(etag):
+            request = service.events().get(calendarId=calendar_id, eventId=event_id)
+            if etag:
+                # Google answers 304 (raised as HttpError) if the event is unchanged.
+                request.headers['If-None-Match'] = etag
+            try:
+                event = execute(request)
+            except HttpError as e:
+                if etag and e.resp.status == 304:
+                    return NOT_MODIFIED
+                raise
+            if store is not None and event.get('status') != 'cancelled':
+                store.put(calendar_id, event)
+            return json.dumps(event), event.get('etag')
+
+        return response_cache.get_or_fetch(('calendar', calendar_id, event_id), fetch)
     except Exception as e:
         return create_error_response(f"Failed to retrieve event: {e}")
 
+def _build_batch_request(service, operation: dict, default_calendar_id: str):
+    """Turns one batch_calendar_operations entry into an HttpRequest. Raises ValueError if it is invalid."""
+    op = operation.get('op')
+    calendar_id = operation.get('calendar_id', default_calendar_id)
+    event_id = operation.get('event_id')
+    if op in ('update', 'delete', 'get') and not event_id:
+        raise ValueError(f"'{op}' operations need an 'event_id'.")
+
+    if op == 'create':
+        event_body = operation.get('event')
+        if event_body is None:
+            missing = [key for key in ('summary', 'start_datetime', 'end_datetime') if not operation.get(key)]
+            if missing:
+                raise ValueError(f"'create' operations need an 'event' body or {', '.join(missing)}.")
+            event_body = build_event_body(
+                operation['summary'], operation['start_datetime'], operation['end_datetime'],
+                operation.get('attendees'), operation.get('recurrence'), operation.get('color_id'),
+            )
+        return service.events().insert(calendarId=calendar_id, body=event_body, sendNotifications=True)
+    if op == 'update':
+        patch = operation.get('event') or build_event_patch(
+            operation.get('updated_summary'), operation.get('start_datetime'), operation.get('end_datetime'),
+            operation.get('attendees'), operation.get('recurrence'), operation.get('color_id'),
+        )
+        if not patch:
+            raise ValueError("'update' operations need at least one field to change.")
+        request = service.events().patch(calendarId=calendar_id, eventId=event_id, body=patch, sendNotifications=True)
+        if operation.get('etag'):
+            request.headers['If-Match'] = operation['etag']
+        return request
+    if op == 'delete':
+        request = service.events().delete(calendarId=calendar_id, eventId=event_id)
+        if operation.get('etag'):
+            request.headers['If-Match'] = operation['etag']
+        return request
+    if op == 'get':
+        return service.events().get(calendarId=calendar_id, eventId=event_id)
+    raise ValueError(f"Unknown op '{op}'. Use 'create', 'update', 'delete' or 'get'.")
+
+@mcp.tool()
+@offload
+def batch_calendar_operations(operations: list[dict], calendar_id: str = 'primary') -> str:
+    """
+    Runs many event operations in as few HTTP requests as possible, using the Calendar batch API.
+    Each operation is a dict with an 'op' key of 'create', 'update', 'delete' or 'get':
+      - create: an 'event' body, or 'summary', 'start_datetime', 'end_datetime' and optionally
+        'attendees', 'recurrence', 'color_id' (same as create_event).
+      - update: 'event_id' plus an 'event' patch body or the update_event fields. Only the given fields change.
+      - delete / get: 'event_id'.
+    Updates and deletes may pass the event's last known 'etag'; they then fail with status 412 if the
+    event changed since.
+    Any operation may set its own 'calendar_id'; otherwise calendar_id is used.
+    Returns a JSON list with one result per operation, in input order.
+    """
+    service = get_calendar_service()
+    if not service:
+        return create_error_response("Failed to authenticate with Google Calendar.")
+
+    results = [None] * len(operations)
+    requests, indexes = [], []
+    for index, operation in enumerate(operations):
+        try:
+            requests.append(_build_batch_request(service, operation, calendar_id))
+            indexes.append(index)
+        except Exception as e:
+            results[index] = {"index": index, "op": operation.get('op'), "status": "error", "error": {"status": None, "message": str(e)}}
+
+    try:
+        responses = execute_batch(service, requests, chunk_size=CALENDAR_BATCH_LIMIT)
+    except Exception as e:
+        return create_error_response("An API error occurred during batch_calendar_operations.", str(e))
+
+    for index, (response, error) in zip(indexes, responses):
+        op = operations[index].get('op')
+        if error is not None:
+            results[index] = {"index": index, "op": op, "status": "error", "error": http_error_details(error)}
+        else:
+            op_calendar_id = operations[index].get('calendar_id', calendar_id)
+            if op in ('update', 'delete'):
+                response_cache.invalidate(('calendar', op_calendar_id, operations[index]['event_id']))
+            if event_store is not None:
+                if op == 'delete':
+                    event_store.delete(op_calendar_id, operations[index]['event_id'])
+                else:
+                    event_store.put(op_calendar_id, response)
+            # Deletes have an empty response body.
+            results[index] = {"index": index, "op": op, "status": "success", "result": response or None}
+
+    return json.dumps(results)
+
+@mcp.tool()
+@offload
+def get_calendar_cache_stats() -> str:
+    """Returns hit rate, size and eviction counters of the local event cache (CALENDAR_EVENT_CACHE=1)."""
+    if event_store is None:
+        return json.dumps({"enabled": False})
+    return json.dumps({"enabled": True, **event_store.stats()})
+
 if __name__ == "__main__":
-    print("--- Google Calendar MCP Server starting up... ---")
+    print("--- Google Calendar MCP Server starting up... ---", file=sys.stderr)
+    preload_discovery_documents(('calendar', 'v3'))
+    serve_metrics_from_env()
+    mcp.tool()(job_status)
+    job_queue.start()
     mcp.run(transport="stdio")
\ No newline at end of file
@@ -1,125 +1,351 @@
 import json
-import base64
+import hashlib
 from datetime import datetime, timedelta, UTC
 from fastmcp import FastMCP
-import os
+import sys
+from itertools import islice
 from typing import Any
 
-import mimetypes
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+import tempfile
 
 from google_auth.services.google_mail import get_gmail_service
+from google_auth.services.blocking import offload, run_parallel
+from google_auth.services.discovery import preload_discovery_documents
+from google_auth.services.batching import execute_batch, http_error_details
+from google_auth.services.gmail_sync import HistoryExpired, fetch_mailbox_changes
+from google_auth.services.pagination import iter_items
+from google_auth.services.instrumentation import serve_metrics_from_env
+from google_auth.services.job_queue import Job, PermanentJobError, job_queue, job_status
+from google_auth.services.request_executor import execute
+from google_auth.services.response_cache import response_cache
+from google_auth.services.sync_state import sync_state
+from google_auth.services.mime_stream import MAX_MESSAGE_BYTES, check_attachments, write_mime_message
+from google_auth.services.mail_projection import DEFAULT_HEADERS, DEFAULT_MAX_BODY_CHARS, project_message
 
 mcp = FastMCP("Gmail")
 
+# The largest page users().messages().list returns.
+MAX_LIST_PAGE_SIZE = 500
+
 def create_error_response(message: str, details: str = None) -> str:
     error_obj = {"error": message}
     if details:
         error_obj["details"] = details
     return json.dumps(error_obj)
 
+# Gmail accepts up to 100 sub-requests per batch but starts rate limiting
+# well before that, so hydrate messages 50 at a time.
+HYDRATE_BATCH_SIZE = 50
+MESSAGE_FORMATS = ('minimal', 'metadata', 'full')
+
+def hydrate_messages(service, message_ids: list[str], format: str, metadata_headers: list[str] = None, view: str = 'compact') -> tuple[list, list]:
+    """
+    Fetches messages in the given format with batch requests instead of one call per message.
+    Returns (messages, errors), where errors lists the messages that could not be fetched.
+    """
+    get_params = {'userId': 'me', 'format': format}
+    if format == 'metadata' and metadata_headers:
+        get_params['metadataHeaders'] = metadata_headers
+    requests = [service.users().messages().get(id=message_id, **get_params) for message_id in message_ids]
+
+    hydrated, errors = [], []
+    for message_id, (message, error) in zip(message_ids, execute_batch(service, requests, chunk_size=HYDRATE_BATCH_SIZE)):
+        if error is not None:
+            errors.append({"id": message_id, **http_error_details(error)})
+        elif format == 'full' and view == 'compact':
+            hydrated.append(project_message(message))
+        else:
+            hydrated.append(message)
+    return hydrated, errors
+
 @mcp.tool()
-def list_emails(query: str = "is.inbox", max_results: int = 5) -> str:
+@offload
+def list_emails(query: str = "is.inbox", max_results: int = 5, format: str = None, metadata_headers: list[str] = None, view: str = 'compact') -> str:
     """
     Lists emails matching a query. Uses standard Gmail search syntax.
     Examples: 'from:boss@company.com is:unread', 'subject:"Project Update"'
+    Without 'format', returns only the message IDs. With format 'minimal', 'metadata' or 'full',
+    returns the messages themselves, fetched together in batch requests instead of one call per message.
+    For 'metadata', 'metadata_headers' limits the headers returned (e.g. ['From', 'Subject', 'Date']).
+    With format 'full', messages are returned in the compact form of get_email_details unless view='full'.
     """
     service = get_gmail_service()
     if not service:
         return create_error_response("Failed to authenticate with Gmail")
+    if format is not None and format not in MESSAGE_FORMATS:
+        return create_error_response(f"Invalid format: '{format}'", "Use 'minimal', 'metadata' or 'full'.")
     try:
-        results = service.users().messages().list(userId='me', q=query, maxResults=max_results).execute()
-        messages = results.get("messages", [])
+        # Follow nextPageToken until max_results messages have been listed.
+        messages = list(islice(iter_items(
+            service.users().messages().list, item_key='messages',
+            userId='me', q=query, maxResults=min(max_results, MAX_LIST_PAGE_SIZE),
+        ), max_results))
         if not messages:
             return "No emails found matching the query."
 
         # Just return the list of message IDs
         message_ids = [msg["id"] for msg in messages]
-        return json.dumps({"message_ids": message_ids})
+        if format is None:
+            return json.dumps({"message_ids": message_ids})
+
+        hydrated, errors = hydrate_messages(service, message_ids, format, metadata_headers, view)
+        result = {"messages": hydrated}
+        if errors:
+            result["errors"] = errors
+        return json.dumps(result)
     except Exception as e:
         return create_error_response("An API error occured during list_emails.", str(e))
 
 @mcp.tool()
-def get_email_details(message_id: str) -> str:
-    """Retrieves the full details of a single email using its message_id."""
+@offload
+def get_email_details(message_id: str, view: str = 'compact', headers: list[str] = None, max_body_chars: int = DEFAULT_MAX_BODY_CHARS) -> str:
+    """
+    Retrieves the details of a single email using its message_id.
+    By default (view='compact') returns the decoded plain-text body (HTML is converted to text),
+    the From/To/Cc/Subject/Date headers (or the names given in 'headers') and attachment metadata.
+    The body is cut to max_body_chars characters; 0 means no limit.
+    view='full' returns the complete Gmail API message, including every MIME part.
+    """
     service = get_gmail_service()
     if not service:
         return create_error_response("Failed to authenticate with Gmail")
+    if view not in ('compact', 'full'):
+        return create_error_response(f"Invalid view: '{view}'", "Use 'compact' or 'full'.")
     try:
-        message = service.users().messages().get(userId='me', id=message_id, format="full").execute()
-        return json.dumps(message)
+        # Gmail has no etags for messages, but their content never changes; only labels
+        # do, and tools that change labels invalidate the entry.
+        message_text = response_cache.get_or_fetch(
+            ('gmail', message_id),
+            lambda etag: (json.dumps(execute(service.users().messages().get(userId='me', id=message_id, format="full"))), None),
+        )
+        if view == 'full':
+            return message_text
+        return json.dumps(project_message(json.loads(message_text), headers or DEFAULT_HEADERS, max_body_chars))
     except Exception as e:
         return create_error_response("An API error occured during get_email_details", str(e))
 
 @mcp.tool()
-def send_email(to: str, subject: str, body: str, attachments: list[str] = None) -> str:
+@offload
+def sync_inbox(label_id: str = 'INBOX', reset: bool = False, max_results: int = 100, format: str = None, metadata_headers: list[str] = None, view: str = 'compact') -> str:
+    """
+    Returns only what changed in the mailbox since the previous sync_inbox call: messages added,
+    deleted or relabeled. Meant for polling; a call costs the same however large the mailbox is.
+    The first call (or reset=True, or once Gmail no longer keeps history that far back) does a full
+    sync instead and returns the max_results most recent messages as added.
+    label_id limits the sync to one label ('INBOX' by default); pass '' to sync the whole mailbox.
+    Without 'format', messages are {"id", "threadId", "labelIds"} stubs. With format 'minimal',
+    'metadata' or 'full', added messages are fetched as in list_emails.
+    Returns JSON {"full_sync": bool, "added": [...], "deleted": [ids], "relabeled": [...], "history_id": ...}.
+    """
+    service = get_gmail_service()
+    if not service:
+        return create_error_response("Failed to authenticate with Gmail")
+    if format is not None and format not in MESSAGE_FORMATS:
+        return create_error_response(f"Invalid format: '{format}'", "Use 'minimal', 'metadata' or 'full'.")
+
+    state_key = label_id or '*'
+    try:
+        changes = None
+        history_id = None if reset else sync_state.get('gmail', state_key)
+        if history_id:
+            try:
+                changes = fetch_mailbox_changes(service, history_id, label_id or None)
+            except HistoryExpired:
+                print(f"Gmail history {history_id} expired; doing a full sync.", file=sys.stderr)
+
+        full_sync = changes is None
+        if full_sync:
+            # Read the historyId before listing, so changes made meanwhile show up in the next sync.
+            history_id = execute(service.users().getProfile(userId='me'))['historyId']
+            list_params = {'userId': 'me', 'maxResults': min(max_results, MAX_LIST_PAGE_SIZE)}
+            if label_id:
+                list_params['labelIds'] = [label_id]
+            added = list(islice(iter_items(service.users().messages().list, item_key='messages', **list_params), max_results))
+            changes = {"added": added, "deleted": [], "relabeled": [], "history_id": history_id}
+
+        # Cached copies of relabeled or deleted messages are stale now.
+        for message_id in changes["deleted"] + [message['id'] for message in changes["relabeled"]]:
+            response_cache.invalidate(('gmail', message_id))
+
+        result = {"full_sync": full_sync, "label_id": label_id or None, **changes}
+        errors = []
+        added_ids = [message['id'] for message in changes["added"]]
+        if format is not None and added_ids:
+            result["added"], errors = hydrate_messages(service, added_ids, format, metadata_headers, view)
+        elif full_sync and added_ids:
+            # messages().list leaves out labelIds; fetch them so both kinds of sync return the same stubs.
+            messages, errors = hydrate_messages(service, added_ids, 'minimal')
+            result["added"] = [
+                {"id": message['id'], "threadId": message['threadId'], "labelIds": message.get('labelIds', [])}
+                for message in messages
+            ]
+        if errors:
+            result["errors"] = errors
+
+        # Only move the cursor once the changes are ready to be returned.
+        sync_state.set('gmail', state_key, changes["history_id"])
+        return json.dumps(result)
+    except Exception as e:
+        return create_error_response("An API error occured during sync_inbox.", str(e))
+
+# users().messages().batchModify accepts up to 1000 message IDs per call.
+BATCH_MODIFY_LIMIT = 1000
+
+def _batch_modify(service, message_ids: list[str], add_label_ids: list[str], remove_label_ids: list[str]):
+    body = {'ids': message_ids}
+    if add_label_ids:
+        body['addLabelIds'] = add_label_ids
+    if remove_label_ids:
+        body['removeLabelIds'] = remove_label_ids
+    # Setting labels twice has the same effect as once, so it is safe to retry after a connection error.
+    execute(service.users().messages().batchModify(userId='me', body=body), idempotent=True)
+
+@mcp.tool()
+@offload
+def bulk_modify_emails(message_ids: list[str] = None, query: str = None, add_label_ids: list[str] = None, remove_label_ids: list[str] = None, max_messages: int = 5000) -> str:
+    """
+    Adds and/or removes labels on many emails at once, given their message_ids or a Gmail search query
+    (up to max_messages matches). Label IDs are system labels such as 'INBOX', 'UNREAD', 'STARRED',
+    'IMPORTANT', 'SPAM', 'TRASH', or the IDs of user labels.
+    Examples: archive with remove_label_ids=['INBOX'], mark as read with remove_label_ids=['UNREAD'].
+    Messages are modified 1000 per request, and the requests run concurrently.
+    Returns JSON {"matched": n, "modified": n, "chunks": [{"count", "ok", ...}]}, with an error per failed chunk.
+    """
+    if not add_label_ids and not remove_label_ids:
+        return create_error_response("Nothing to do", "Pass add_label_ids and/or remove_label_ids.")
+    if (message_ids is None) == (query is None):
+        return create_error_response("Pass either message_ids or query.")
+
+    service = get_gmail_service()
+    if not service:
+        return create_error_response("Failed to authenticate with Gmail")
+    try:
+        if query is not None:
+            message_ids = [message['id'] for message in islice(iter_items(
+                service.users().messages().list, item_key='messages',
+                userId='me', q=query, maxResults=min(max_messages, MAX_LIST_PAGE_SIZE),
+            ), max_messages)]
+        # Keep the first occurrence of every ID.
+        message_ids = list(dict.fromkeys(message_ids))
+        if not message_ids:
+            return json.dumps({"matched": 0, "modified": 0, "chunks": []})
+
+        chunks = [message_ids[start:start + BATCH_MODIFY_LIMIT] for start in range(0, len(message_ids), BATCH_MODIFY_LIMIT)]
+        outcomes = run_parallel([
+            lambda chunk=chunk: _batch_modify(service, chunk, add_label_ids, remove_label_ids) for chunk in chunks
+        ])
+
+        report, modified = [], 0
+        for chunk, (_, error) in zip(chunks, outcomes):
+            # Whether or not the chunk went through, cached copies may now have the wrong labels.
+            for message_id in chunk:
+                response_cache.invalidate(('gmail', message_id))
+            if error is None:
+                modified += len(chunk)
+                report.append({"count": len(chunk), "ok": True})
+            else:
+                report.append({"count": len(chunk), "ok": False, "first_id": chunk[0], **http_error_details(error)})
+        return json.dumps({"matched": len(message_ids), "modified": modified, "chunks": report})
+    except Exception as e:
+        return create_error_response("An API error occured during bulk_modify_emails.", str(e))
+
+# Messages up to this size are uploaded in a single request; larger ones use a resumable upload.
+RESUMABLE_UPLOAD_THRESHOLD = 5 * 1024 * 1024
+# Resumable uploads are sent in chunks of this size (a multiple of 256 KB).
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# The MIME message is kept in memory up to this size and spooled to a temp file beyond it.
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+def deliver_email(service, to: str, subject: str, body: str, attachments: list[str] = None, message_id: str = None) -> dict:
+    """
+    Builds the message and sends it. Returns the sent message. Raises ValueError if it is too large.
+    'message_id' sets the Message-ID header, which lets a retry find out whether the message was sent.
+    """
+    #Getting the user's email
+    profile = execute(service.users().getProfile(userId="me"))
+    sender_email = profile['emailAddress']
+    headers = {'From': sender_email, 'To': to, 'Subject': subject}
+    if message_id:
+        headers['Message-ID'] = message_id
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES) as spool:
+        # Write the message, streaming attachments into the spool file
+        write_mime_message(spool, headers, body, attachments)
+        message_size = spool.tell()
+        if message_size > MAX_MESSAGE_BYTES:
+            raise ValueError(f"The message is {message_size} bytes; the limit is {MAX_MESSAGE_BYTES} bytes.")
+        spool.seek(0)
+
+        # Upload the raw message through the media endpoint instead of a base64 JSON body
+        from googleapiclient.http import MediaIoBaseUpload
+
+        media = MediaIoBaseUpload(
+            spool,
+            mimetype='message/rfc822',
+            chunksize=UPLOAD_CHUNK_SIZE,
+            resumable=message_size > RESUMABLE_UPLOAD_THRESHOLD,
+        )
+        return execute(service.users().messages().send(userId="me", media_body=media))
+
+@mcp.tool()
+@offload
+def send_email(to: str, subject: str, body: str, attachments: list[str] = None, async_mode: bool = False, idempotency_key: str = None) -> str:
     """
     Sends a new email. Can optionally include a list of file paths as attachments.
     'attachments' should be a list of strings, where each string is a valid path to a file.
+    With async_mode=True, the email is queued durably and a job is returned right away
+    ({"job_id", "status", ...}); check it with job_status. The attachments must still exist when
+    the job runs. Sending the same email again returns the existing job instead of sending twice;
+    pass a different idempotency_key to send it again on purpose.
     """
+    # 1. Check the attachments before doing any work
+    error = check_attachments(attachments or [])
+    if error:
+        return json.dumps({"error": error})
+
+    if async_mode:
+        payload = {'to': to, 'subject': subject, 'body': body, 'attachments': attachments or []}
+        job, created = job_queue.enqueue('send_email', payload, idempotency_key)
+        return json.dumps({**job, "deduplicated": not created})
+
     service = get_gmail_service()
     if not service:
         return json.dumps({"error": "Failed to authenticate with Gmail."})
         
     try:
-        # 1. Create the root message container
-        message = MIMEMultipart()
-
-        #Getting the user's email
-        profile = service.users().getProfile(userId="me").execute()
-        sender_email = profile['emailAddress']
-
-        # 2. Add the headers
-        profile = service.users().getProfile(userId='me').execute()
-        message['From'] = sender_email
-        message['To'] = to
-        message['Subject'] = subject
-
-        # 3. Attach the body of the email as the first part
-        message.attach(MIMEText(body, 'plain'))
-
-        # 4. Handle and attach files
-        if attachments:
-            for file_path in attachments:
-                if not os.path.exists(file_path):
-                    return json.dumps({"error": f"Attachment file not found: {file_path}"})
-
-                content_type, _ = mimetypes.guess_type(file_path)
-                if content_type is None:
-                    content_type = 'application/octet-stream' # Default if type is unknown
-                
-                main_type, sub_type = content_type.split('/', 1)
-
-                # Create the attachment part
-                with open(file_path, 'rb') as fp:
-                    part = MIMEBase(main_type, sub_type)
-                    part.set_payload(fp.read())
-                
-                # Encode the binary attachment data for email transport
-                encoders.encode_base64(part)
-                
-                # Add a header to identify the file
-                part.add_header(
-                    'Content-Disposition',
-                    'attachment',
-                    filename=os.path.basename(file_path)
-                )
-                
-                # Attach the file part to the root message
-                message.attach(part)
-
-        # 5. Prepare the message for the API
-        encoded_message = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        create_message = {'raw': encoded_message}
-        
-        # 6. Send the message
-        sent_message = service.users().messages().send(userId="me", body=create_message).execute()
+        # 2. Build and upload the message
+        sent_message = deliver_email(service, to, subject, body, attachments)
         return json.dumps(sent_message) # Return the full response object for consistency
-        
+    except ValueError as e:
+        return json.dumps({"error": str(e)})
     except Exception as e:
         return json.dumps({"error": f"An API error occurred while sending the email: {e}"})
+
+def run_send_email_job(payload: dict, job: Job) -> dict:
+    """Sends a queued email. The Message-ID is derived from the job, so a retry never sends it twice."""
+    service = get_gmail_service()
+    if not service:
+        raise RuntimeError("Failed to authenticate with Gmail.")
+    error = check_attachments(payload['attachments'])
+    if error:
+        raise PermanentJobError(error)
+
+    message_id = f"<{hashlib.sha256(job.idempotency_key.encode()).hexdigest()[:32]}.job@gmail-mcp.local>"
+    if job.retried:
+        # An earlier attempt may have been sent before the connection or the process died.
+        sent = execute(service.users().messages().list(userId='me', q=f"rfc822msgid:{message_id}", includeSpamTrash=True))
+        if sent.get('messages'):
+            return sent['messages'][0]
+    try:
+        return deliver_email(service, payload['to'], payload['subject'], payload['body'], payload['attachments'], message_id)
+    except ValueError as e:
+        raise PermanentJobError(str(e)) from e
+
+job_queue.register('send_email', api='gmail', handler=run_send_email_job)
+
 if __name__ == "__main__":
+    preload_discovery_documents(('gmail', 'v1'))
+    serve_metrics_from_env()
+    mcp.tool()(job_status)
+    job_queue.start()
     mcp.run(transport="stdio")
\ No newline at end of file
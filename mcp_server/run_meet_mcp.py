@@ -1,28 +1,15 @@
-import os.path
 import json
-import base64
-from fastmcp import FastMCP
-import os
+import sys
 from typing import Any, Union
 
-import sys
-import os
-# --- DEBUGGING STEP ---
-print("--- run_meet_mcp.py starting up inside container ---", file=sys.stderr)
-print(f"Current working directory: {os.getcwd()}", file=sys.stderr)
-print(f"Python path: {sys.path}", file=sys.stderr)
-
-# The rest of your script...
-from mcp.server.fastmcp import FastMCP
-# ...
-
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.apps import meet_v2
-from google.protobuf import field_mask_pb2
+from fastmcp import FastMCP
 
 from google_auth.services.google_meet import get_meet_service
+from google_auth.services.blocking import offload
+from google_auth.services.instrumentation import serve_metrics_from_env
+from google_auth.services.meet_space_pool import create_space, meet_space_pool
+from google_auth.services.request_executor import call
+from google_auth.services.response_cache import response_cache
 
 mcp = FastMCP("Meet")
 
@@ -33,31 +20,42 @@ def create_error_response(message: str, details: str = None) -> str:
     return json.dumps(error_obj)
 
 @mcp.tool()
+@offload
 def create_meet_space():
     """Creates a new Google Meet space and returns its URI and name."""
-    service = get_meet_service()
-    if not service:
-        return create_error_response("Failed to authenticate with meet")
-    try: 
-        request = meet_v2.CreateSpaceRequest()
-        response = service.create_space(request=request)
-
-        return json.dumps({"meeting_uri": response.meeting_uri, "name": response.name})
-    except Exception as e:
-        return create_error_response("An API error occured during create meet space.", str(e))
+    # A space from the pre-created pool costs no Google call.
+    space = meet_space_pool.take()
+    if space is None:
+        service = get_meet_service()
+        if not service:
+            return create_error_response("Failed to authenticate with meet")
+        try:
+            space = create_space(service)
+        except Exception as e:
+            return create_error_response("An API error occured during create meet space.", str(e))
+
+    # Agents usually look up the space they just created.
+    response_cache.put(('meet', space["name"]), space["json"])
+    return json.dumps({"meeting_uri": space["meeting_uri"], "name": space["name"]})
 
 @mcp.tool()
+@offload
 def get_meet_space(name: str) -> str:
     """Retrieves the details of a Google Meet space by its name (resource ID)."""
     service = get_meet_service()
     if not service:
         return create_error_response("Failed to authenticate with meet")
     try:
+        from google.apps import meet_v2
+
         request = meet_v2.GetSpaceRequest(
             name=name,
         )
-        response = service.get_space(request=request)
-        return meet_v2.Space.to_json(response)
+        # The Meet API has no etags, so cached spaces are only refreshed once they expire.
+        return response_cache.get_or_fetch(
+            ('meet', name),
+            lambda etag: (meet_v2.Space.to_json(call(lambda: service.get_space(request=request), 'meet')), None),
+        )
     except Exception as e:
         return create_error_response("An API error occured during searching for meet space.", str(e))
     
@@ -133,4 +131,7 @@ def get_meet_space(name: str) -> str:
 #         return create_error_response("An API error occured during getting conference name.", str(e))
 
 if __name__ == "__main__":
+    print("--- Google Meet MCP Server starting up... ---", file=sys.stderr)
+    serve_metrics_from_env()
+    meet_space_pool.start()
     mcp.run(transport="stdio")
\ No newline at end of file
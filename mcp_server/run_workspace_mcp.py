@@ -0,0 +1,76 @@
+import argparse
+import importlib
+import json
+import os
+import sys
+
+from fastmcp import FastMCP
+
+from google_auth.services import metrics
+from google_auth.services.discovery import preload_discovery_documents
+from google_auth.services.instrumentation import serve_metrics_from_env
+from google_auth.services.job_queue import job_queue, job_status
+from google_auth.services.workspace import use_shared_credentials
+
+# Runs the Calendar, Gmail and Meet tool sets in one process, with one
+# credential store, one set of HTTP connections and one metrics surface.
+SERVER_MODULES = {
+    'calendar': 'run_calendar_mcp',
+    'gmail': 'run_gmail_mcp',
+    'meet': 'run_meet_mcp',
+}
+DISCOVERY_APIS = {
+    'calendar': ('calendar', 'v3'),
+    'gmail': ('gmail', 'v1'),
+}
+
+mcp = FastMCP("GoogleWorkspace")
+
+@mcp.tool()
+def get_server_metrics() -> str:
+    """Returns the counters of the shared service pool, caches and other components as JSON."""
+    return json.dumps(metrics.collect())
+
+# The job queue is shared by the Calendar and Gmail tools, so its tool is registered here
+# rather than by each of them; the standalone servers register it in their __main__.
+mcp.tool()(job_status)
+
+def import_server(module_name: str):
+    """Imports a tool server module from the mcp_server package, or from the same directory in Docker."""
+    try:
+        return importlib.import_module(f"mcp_server.{module_name}")
+    except ModuleNotFoundError:
+        return importlib.import_module(module_name)
+
+def mount_services(services: list[str]):
+    for service in services:
+        mcp.mount(import_server(SERVER_MODULES[service]).mcp)
+    use_shared_credentials(services)
+
+def parse_services(value: str) -> list[str]:
+    services = [service.strip() for service in value.split(',') if service.strip()]
+    unknown = [service for service in services if service not in SERVER_MODULES]
+    if unknown or not services:
+        raise argparse.ArgumentTypeError(
+            f"Unknown service(s): {', '.join(unknown) or value!r}. Choose from {', '.join(SERVER_MODULES)}."
+        )
+    return services
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Google Workspace MCP server (Calendar, Gmail and Meet in one process).")
+    parser.add_argument(
+        '--services', type=parse_services,
+        default=parse_services(os.environ.get('MCP_SERVICES', ','.join(SERVER_MODULES))),
+        help="Comma-separated tool sets to serve (default: calendar,gmail,meet).",
+    )
+    args = parser.parse_args()
+
+    print(f"--- Google Workspace MCP Server starting up with {', '.join(args.services)} ---", file=sys.stderr)
+    mount_services(args.services)
+    preload_discovery_documents(*[DISCOVERY_APIS[service] for service in args.services if service in DISCOVERY_APIS])
+    serve_metrics_from_env()
+    job_queue.start()
+    if 'meet' in args.services:
+        from google_auth.services.meet_space_pool import meet_space_pool
+        meet_space_pool.start()
+    mcp.run(transport="stdio")
@@ -0,0 +1,216 @@
+import fcntl
+import json
+import threading
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+from google_auth.services import credentials as credentials_module
+from google_auth.services.credential_store import CredentialManager, FileTokenBackend
+from google_auth.services.service_pool import ServicePool
+
+SCOPES = ['https://www.googleapis.com/auth/calendar']
+
+
+def utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def stored_token(token: str, expires_in: timedelta, refresh_token: str = 'refresh-token') -> str:
+    return json.dumps({
+        'token': token,
+        'refresh_token': refresh_token,
+        'client_id': 'client-id',
+        'client_secret': 'client-secret',
+        'scopes': SCOPES,
+        'expiry': (utcnow() + expires_in).isoformat() + 'Z',
+    })
+
+
+@pytest.fixture
+def token_file(tmp_path):
+    return str(tmp_path / 'token.json')
+
+
+@pytest.fixture
+def refreshes(monkeypatch):
+    """Replaces Credentials.refresh; set outcome['error'] to make it fail."""
+    outcome = {'calls': 0, 'error': None}
+
+    def refresh(creds, request):
+        outcome['calls'] += 1
+        if outcome['error'] is not None:
+            raise outcome['error']
+        creds.token = f"refreshed-{outcome['calls']}"
+        creds.expiry = utcnow() + timedelta(hours=1)
+
+    monkeypatch.setattr(Credentials, 'refresh', refresh)
+    return outcome
+
+
+@pytest.fixture
+def logins(monkeypatch):
+    """Replaces the browser login flow with one that returns fresh credentials."""
+    made = []
+
+    def run_browser_flow(scopes, label="Google"):
+        creds = Credentials(token=f"login-{len(made)}", refresh_token='new-refresh-token', client_id='client-id',
+                            client_secret='client-secret', expiry=utcnow() + timedelta(hours=1))
+        made.append(creds)
+        return creds
+
+    monkeypatch.setattr(credentials_module, 'run_browser_flow', run_browser_flow)
+    return made
+
+
+def test_loads_stored_token(token_file, refreshes):
+    FileTokenBackend(token_file).save(stored_token('stored', timedelta(hours=1)))
+    manager = CredentialManager()
+    creds = manager.get(SCOPES, token_file)
+    assert creds.token == 'stored'
+    assert manager.get(SCOPES, token_file) is creds
+    assert refreshes['calls'] == 0
+    assert manager.stats()['loads'] == 1
+
+
+def test_refreshes_expiring_token_in_place_and_saves_it(token_file, refreshes):
+    backend = FileTokenBackend(token_file)
+    backend.save(stored_token('stored', timedelta(hours=1)))
+    manager = CredentialManager()
+    creds = manager.get(SCOPES, token_file)
+    # An hour later.
+    creds.expiry = utcnow() + timedelta(minutes=1)
+    backend.save(stored_token('stored', timedelta(minutes=1)))
+    manager.refresh_expiring()
+    assert creds.token == 'refreshed-1'
+    assert json.loads(backend.load())['token'] == 'refreshed-1'
+
+
+def test_adopts_token_refreshed_by_another_process(token_file, refreshes):
+    backend = FileTokenBackend(token_file)
+    backend.save(stored_token('stored', timedelta(minutes=1)))
+    manager = CredentialManager()
+    creds = manager.get(SCOPES, token_file)
+    assert creds.token == 'refreshed-1'
+    backend.save(stored_token('from-other-process', timedelta(hours=1)))
+    creds.expiry = utcnow() + timedelta(minutes=1)
+    manager.refresh_expiring()
+    assert creds.token == 'from-other-process'
+    assert refreshes['calls'] == 1
+    assert manager.stats()['adopted'] == 1
+
+
+def test_concurrent_gets_refresh_once(token_file, refreshes):
+    FileTokenBackend(token_file).save(stored_token('stored', timedelta(seconds=-10)))
+    manager = CredentialManager()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.get(SCOPES, token_file))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert refreshes['calls'] == 1
+    assert len({id(creds) for creds in results}) == 1
+
+
+def test_transient_refresh_failure_keeps_token(token_file, refreshes, logins):
+    backend = FileTokenBackend(token_file)
+    backend.save(stored_token('stored', timedelta(hours=1)))
+    manager = CredentialManager()
+    creds = manager.get(SCOPES, token_file)
+    # Inside the refresh margin, but still valid.
+    creds.expiry = utcnow() + timedelta(minutes=4)
+    backend.save(stored_token('stored', timedelta(minutes=4)))
+    refreshes['error'] = ConnectionError("unreachable")
+    manager.refresh_expiring()
+    assert manager.get(SCOPES, token_file) is creds
+    assert refreshes['calls'] == 1
+    assert logins == []
+
+
+def revoke(manager, backend, creds, refreshes):
+    """Revokes the refresh token and lets the access token run out."""
+    refreshes['error'] = RefreshError('invalid_grant')
+    creds.expiry = utcnow() - timedelta(minutes=1)
+    backend.save(stored_token('stored', timedelta(minutes=-1)))
+    manager.refresh_expiring()
+    assert manager.stats()['refresh_failures'] == 1
+
+
+def test_adopts_login_of_another_replica_after_revocation(token_file, refreshes, logins):
+    backend = FileTokenBackend(token_file)
+    backend.save(stored_token('stored', timedelta(hours=1)))
+    manager = CredentialManager()
+    creds = manager.get(SCOPES, token_file)
+    revoke(manager, backend, creds, refreshes)
+
+    # Another replica logs in again and stores a new refresh token.
+    backend.save(stored_token('other-login', timedelta(hours=1), refresh_token='new-refresh-token'))
+    assert manager.get(SCOPES, token_file) is creds
+    assert (creds.token, creds.refresh_token) == ('other-login', 'new-refresh-token')
+    assert logins == []
+
+    # The next refresh uses the new refresh token.
+    refreshes['error'] = None
+    creds.expiry = utcnow() + timedelta(minutes=1)
+    backend.save(stored_token('other-login', timedelta(minutes=1), refresh_token='new-refresh-token'))
+    manager.refresh_expiring()
+    assert creds.token == 'refreshed-2'
+    assert json.loads(backend.load())['refresh_token'] == 'new-refresh-token'
+
+
+def test_refresher_never_starts_a_login(token_file, refreshes, logins):
+    backend = FileTokenBackend(token_file)
+    backend.save(stored_token('stored', timedelta(hours=1)))
+    manager = CredentialManager()
+    creds = manager.get(SCOPES, token_file)
+    revoke(manager, backend, creds, refreshes)
+    manager.refresh_expiring()
+    assert logins == []
+    assert refreshes['calls'] == 1
+
+
+def test_login_runs_without_the_backend_lock(token_file, monkeypatch):
+    held = []
+
+    def run_browser_flow(scopes, label="Google"):
+        # Another replica can take the lock while the user logs in.
+        with open(token_file + '.lock', 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            except BlockingIOError:
+                held.append(True)
+        return Credentials(token='login', refresh_token='refresh-token', expiry=utcnow() + timedelta(hours=1))
+
+    monkeypatch.setattr(credentials_module, 'run_browser_flow', run_browser_flow)
+    creds = CredentialManager().get(SCOPES, token_file)
+    assert creds.token == 'login'
+    assert held == []
+    assert json.loads(FileTokenBackend(token_file).load())['token'] == 'login'
+
+
+def test_revoked_token_leads_the_pool_to_log_in_again(token_file, refreshes, logins):
+    backend = FileTokenBackend(token_file)
+    backend.save(stored_token('stored', timedelta(hours=1)))
+    manager = CredentialManager()
+    pool = ServicePool()
+    loads = []
+
+    def load_credentials():
+        loads.append(1)
+        return manager.get(SCOPES, token_file)
+
+    pool.register('calendar', load_credentials=load_credentials, build_service=lambda creds: {'creds': creds})
+    service = pool.get('calendar')
+    assert pool.get('calendar') is service
+
+    revoke(manager, backend, service['creds'], refreshes)
+
+    rebuilt = pool.get('calendar')
+    assert rebuilt is not service
+    assert rebuilt['creds'] is logins[0]
+    assert len(loads) == 2
+    assert json.loads(backend.load())['token'] == 'login-0'
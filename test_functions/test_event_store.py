@@ -0,0 +1,114 @@
+import pytest
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+from google_auth.services.event_store import EventStore
+from google_auth.services.service_pool import service_pool
+
+
+def event(event_id: str, day: int, summary: str = 'Meeting') -> dict:
+    return {
+        'id': event_id,
+        'summary': summary,
+        'start': {'dateTime': f'2030-01-{day:02d}T09:00:00Z'},
+        'end': {'dateTime': f'2030-01-{day:02d}T10:00:00Z'},
+    }
+
+
+def size_of(*events) -> int:
+    store = EventStore(':memory:')
+    store.apply_sync('size', list(events), 'token', full_sync=True)
+    return store.stats()['bytes']
+
+
+def test_full_then_delta_sync():
+    store = EventStore(':memory:')
+    assert not store.is_fresh('work') and store.sync_token('work') is None
+    store.apply_sync('work', [event('a', 1), event('b', 2)], 'sync1', full_sync=True)
+    assert store.is_fresh('work') and store.sync_token('work') == 'sync1'
+
+    store.apply_sync('work', [event('a', 3, 'Moved'), {'id': 'b', 'status': 'cancelled'}, event('c', 4)], 'sync2', full_sync=False)
+    assert store.sync_token('work') == 'sync2'
+    assert [(e['id'], e['summary']) for e in store.query('work', 0)] == [('a', 'Moved'), ('c', 'Meeting')]
+    assert store.get('work', 'b') is None
+
+    store.mark_stale('work')
+    assert not store.is_fresh('work')
+    # A stale calendar still has its delta sync.
+    assert store.sync_token('work') == 'sync2'
+
+
+def test_full_sync_replaces_the_calendar():
+    store = EventStore(':memory:')
+    store.apply_sync('work', [event('a', 1), event('b', 2)], 'sync1', full_sync=True)
+    store.apply_sync('work', [event('c', 3)], 'sync2', full_sync=True)
+    assert [e['id'] for e in store.query('work', 0)] == ['c']
+    assert store.stats()['bytes'] == size_of(event('c', 3))
+
+
+def test_delta_sync_does_not_complete_an_unknown_calendar():
+    store = EventStore(':memory:')
+    store.apply_sync('work', [event('a', 1)], 'sync1', full_sync=False)
+    assert not store.is_fresh('work')
+    assert store.sync_token('work') is None
+
+
+def test_evicts_least_recently_used_calendars_whole():
+    calendar_bytes = size_of(event('a', 1), event('b', 2))
+    store = EventStore(':memory:', max_bytes=int(calendar_bytes * 2.5))
+    store.apply_sync('old', [event('a', 1), event('b', 2)], 'old1', full_sync=True)
+    store.apply_sync('used', [event('a', 1), event('b', 2)], 'used1', full_sync=True)
+    store.get('old', 'a')
+    store.get('used', 'a')
+    store.apply_sync('new', [event('a', 1), event('b', 2)], 'new1', full_sync=True)
+
+    assert store.stats()['evictions'] == 2
+    assert store.stats()['bytes'] == 2 * calendar_bytes
+    assert store.get('old', 'a') is None and store.get('old', 'b') is None
+    assert not store.is_fresh('old') and store.sync_token('old') is None
+    for calendar_id in ('used', 'new'):
+        assert store.is_fresh(calendar_id)
+        assert len(store.query(calendar_id, 0)) == 2
+
+
+def test_keeps_a_calendar_larger_than_the_budget():
+    store = EventStore(':memory:', max_bytes=size_of(event('a', 1)))
+    store.apply_sync('small', [event('a', 1)], 'small1', full_sync=True)
+    store.apply_sync('big', [event(str(n), n) for n in range(1, 11)], 'big1', full_sync=True)
+    assert store.is_fresh('big') and store.sync_token('big') == 'big1'
+    assert len(store.query('big', 0)) == 10
+    assert store.sync_token('small') is None
+
+    # Deltas keep applying without a full resync.
+    store.apply_sync('big', [event('11', 11)], 'big2', full_sync=False)
+    assert store.sync_token('big') == 'big2'
+    assert len(store.query('big', 0)) == 11
+
+
+def test_write_through_does_not_evict_its_own_calendar():
+    store = EventStore(':memory:', max_bytes=size_of(event('a', 1)))
+    store.apply_sync('work', [event('a', 1)], 'sync1', full_sync=True)
+    store.put('work', event('b', 2))
+    assert store.is_fresh('work')
+    assert len(store.query('work', 0)) == 2
+
+
+@pytest.fixture
+def fake():
+    fake = FakeGoogle(events=20, messages=0).start()
+    install_fake_services(fake, services=('calendar',))
+    yield fake
+    service_pool.invalidate('calendar')
+    fake.stop()
+
+
+def test_reads_of_an_oversized_calendar_use_delta_syncs(fake, monkeypatch):
+    import mcp_server.run_calendar_mcp as calendar_server
+
+    store = EventStore(':memory:', max_bytes=1000, max_staleness=0)
+    monkeypatch.setattr(calendar_server, 'event_store', store)
+    service = calendar_server.get_calendar_service()
+    for _ in range(3):
+        assert calendar_server.fresh_event_store(service, 'primary') is store
+    assert store.stats()['syncs'] == 3
+    assert store.stats()['full_syncs'] == 1
+    assert store.stats()['evictions'] == 0
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+from google_auth.services import gmail_sync
+from google_auth.services.gmail_sync import HistoryExpired, fetch_mailbox_changes
+from google_auth.services.request_executor import execute
+from google_auth.services.service_pool import service_pool
+from google_auth.services.sync_state import SyncStateStore
+
+
+@pytest.fixture
+def fake():
+    fake = FakeGoogle(events=0, messages=5).start()
+    install_fake_services(fake, services=('gmail',))
+    yield fake
+    service_pool.invalidate('gmail')
+    fake.stop()
+
+
+@pytest.fixture
+def service(fake):
+    return service_pool.get('gmail')
+
+
+def current_history_id(service) -> str:
+    return execute(service.users().getProfile(userId='me'))['historyId']
+
+
+def relabel(service, message_id: str, add: list = None, remove: list = None):
+    body = {'ids': [message_id], 'addLabelIds': add or [], 'removeLabelIds': remove or []}
+    execute(service.users().messages().batchModify(userId='me', body=body))
+
+
+def test_reports_added_messages(fake, service):
+    start = current_history_id(service)
+    first, second = fake.receive_message(), fake.receive_message()
+    changes = fetch_mailbox_changes(service, start)
+    assert [message['id'] for message in changes['added']] == [first, second]
+    assert changes['added'][0]['labelIds'] == ['INBOX', 'UNREAD']
+    assert changes['deleted'] == [] and changes['relabeled'] == []
+    assert changes['history_id'] == current_history_id(service)
+
+
+def test_added_then_deleted_is_only_deleted(fake, service):
+    start = current_history_id(service)
+    kept, dropped = fake.receive_message(), fake.receive_message()
+    relabel(service, dropped, add=['STARRED'])
+    fake.delete_message(dropped)
+    changes = fetch_mailbox_changes(service, start)
+    assert [message['id'] for message in changes['added']] == [kept]
+    assert changes['deleted'] == [dropped]
+    assert changes['relabeled'] == []
+
+
+def test_relabeled_new_message_is_added_with_its_latest_labels(fake, service):
+    start = current_history_id(service)
+    message_id = fake.receive_message()
+    relabel(service, message_id, remove=['UNREAD'])
+    relabel(service, message_id, add=['STARRED'])
+    changes = fetch_mailbox_changes(service, start)
+    assert [(message['id'], message['labelIds']) for message in changes['added']] == [(message_id, ['INBOX', 'STARRED'])]
+    assert changes['relabeled'] == []
+
+
+def test_relabeled_existing_message(fake, service):
+    message_id = sorted(fake.messages)[0]
+    start = current_history_id(service)
+    relabel(service, message_id, remove=['INBOX'])
+    relabel(service, message_id, add=['IMPORTANT'])
+    changes = fetch_mailbox_changes(service, start)
+    assert changes['added'] == []
+    assert [(message['id'], message['labelIds']) for message in changes['relabeled']] == [(message_id, ['UNREAD', 'IMPORTANT'])]
+
+
+def test_folds_changes_across_pages(fake, service, monkeypatch):
+    monkeypatch.setattr(gmail_sync, 'MAX_HISTORY_PAGE_SIZE', 2)
+    start = current_history_id(service)
+    received = [fake.receive_message() for _ in range(3)]
+    fake.delete_message(received[0])
+    relabel(service, received[1], add=['STARRED'])
+    changes = fetch_mailbox_changes(service, start)
+    assert [message['id'] for message in changes['added']] == received[1:]
+    assert changes['added'][0]['labelIds'] == ['INBOX', 'UNREAD', 'STARRED']
+    assert changes['deleted'] == [received[0]]
+
+
+def test_expired_history(fake, service):
+    start = current_history_id(service)
+    fake.receive_message()
+    fake.expire_history()
+    with pytest.raises(HistoryExpired):
+        fetch_mailbox_changes(service, start)
+
+
+def sync_inbox(**kwargs) -> dict:
+    from mcp_server.run_gmail_mcp import sync_inbox
+
+    return json.loads(asyncio.run(sync_inbox(**kwargs)))
+
+
+def test_sync_inbox_falls_back_to_a_full_sync(fake, tmp_path, monkeypatch):
+    import mcp_server.run_gmail_mcp as gmail_server
+
+    monkeypatch.setattr(gmail_server, 'sync_state', SyncStateStore(str(tmp_path / 'sync_state.json')))
+    first = sync_inbox()
+    assert first['full_sync']
+    # Full syncs return the same stubs as delta syncs.
+    assert sorted(first['added'], key=lambda message: message['id']) == [
+        {'id': message_id, 'threadId': message_id, 'labelIds': ['INBOX', 'UNREAD']} for message_id in sorted(fake.messages)
+    ]
+
+    message_id = fake.receive_message()
+    second = sync_inbox()
+    assert not second['full_sync']
+    assert [message['id'] for message in second['added']] == [message_id]
+
+    fake.receive_message()
+    fake.expire_history()
+    third = sync_inbox()
+    assert third['full_sync']
+    assert len(third['added']) == len(fake.messages)
+    assert third['history_id'] == current_history_id(service_pool.get('gmail'))
+    # The cursor moved on, so the next sync is a delta again.
+    fourth = sync_inbox()
+    assert not fourth['full_sync']
+    assert (fourth['added'], fourth['deleted'], fourth['relabeled']) == ([], [], [])
@@ -0,0 +1,26 @@
+from google_auth.services.blocking import run_parallel
+from google_auth.services.instrumentation import add_auth_time, add_upstream_call, current_call, tool_call
+
+
+def test_records_figures_of_the_current_call():
+    with tool_call('test_tool') as call:
+        assert current_call() is call
+        add_auth_time(0.5)
+        add_upstream_call(0.25, bytes_sent=10, bytes_received=20)
+    assert current_call() is None
+    assert call.as_dict() == {
+        'queue_seconds': 0, 'auth_seconds': 0.5, 'upstream_calls': 1, 'upstream_seconds': 0.25,
+        'bytes_sent': 10, 'bytes_received': 20, 'response_bytes': 0,
+    }
+
+
+def test_fanned_out_calls_add_up():
+    def many_upstream_calls():
+        for _ in range(2000):
+            add_upstream_call(0.001, bytes_received=1)
+
+    with tool_call('test_fan_out') as call:
+        results = run_parallel([many_upstream_calls] * 8)
+    assert all(error is None for _, error in results)
+    assert call.upstream_calls == 16000
+    assert call.bytes_received == 16000
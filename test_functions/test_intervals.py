@@ -0,0 +1,67 @@
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from google_auth.services.intervals import find_free_slots, free_gaps, merge_intervals
+
+HOUR = 3600
+BERLIN = ZoneInfo('Europe/Berlin')
+
+
+def at(year, month, day, hour=0, minute=0, tz=BERLIN) -> float:
+    return datetime(year, month, day, hour, minute, tzinfo=tz).timestamp()
+
+
+def test_merge_intervals_joins_overlapping_and_touching():
+    assert merge_intervals([(5, 7), (1, 3), (2, 4), (4, 5), (9, 10)]) == [(1, 7), (9, 10)]
+    assert merge_intervals([(1, 10), (2, 3)]) == [(1, 10)]
+    assert merge_intervals([]) == []
+
+
+def test_free_gaps_inside_window():
+    assert list(free_gaps([(0, 2), (4, 6), (8, 20)], 1, 10)) == [(2, 4), (6, 8)]
+    assert list(free_gaps([], 0, 5)) == [(0, 5)]
+    assert list(free_gaps([(0, 10)], 2, 5)) == []
+
+
+def test_slots_step_through_gaps():
+    slots = find_free_slots([(HOUR, 2 * HOUR)], 0, 4 * HOUR, duration=HOUR, step=HOUR / 2)
+    assert slots == [(0, HOUR), (2 * HOUR, 3 * HOUR), (2.5 * HOUR, 3.5 * HOUR), (3 * HOUR, 4 * HOUR)]
+
+
+def test_working_hours_rank_first():
+    # Monday 2026-10-19: 07:00-09:00 is outside 9-17, 09:00 onwards inside.
+    start, end = at(2026, 10, 19, 7), at(2026, 10, 19, 11)
+    slots = find_free_slots([], start, end, duration=HOUR, max_slots=4, working_hours=(9, 17), timezone='Europe/Berlin')
+    assert slots == [(at(2026, 10, 19, 9), at(2026, 10, 19, 10)), (at(2026, 10, 19, 10), at(2026, 10, 19, 11)),
+                     (at(2026, 10, 19, 7), at(2026, 10, 19, 8)), (at(2026, 10, 19, 8), at(2026, 10, 19, 9))]
+
+
+def test_working_hours_until_midnight():
+    start = at(2026, 10, 19, 22)
+    slots = find_free_slots([], start, start + 2 * HOUR, duration=HOUR, working_hours=(20, 24), timezone='Europe/Berlin')
+    assert slots == [(start, start + HOUR), (start + HOUR, start + 2 * HOUR)]
+
+
+def test_working_hours_exclude_weekends():
+    saturday = at(2026, 10, 24, 10)
+    slots = find_free_slots([], saturday, saturday + HOUR, duration=HOUR, working_hours=(9, 17), timezone='Europe/Berlin')
+    # Still returned, but only as a fallback.
+    assert slots == [(saturday, saturday + HOUR)]
+    monday = at(2026, 10, 26, 9)
+    slots = find_free_slots([], saturday, monday + HOUR, duration=HOUR, step=HOUR, max_slots=1, working_hours=(9, 17), timezone='Europe/Berlin')
+    assert slots == [(monday, monday + HOUR)]
+
+
+def test_working_hours_across_dst_change():
+    # Clocks go back on Sunday 2026-10-25; Monday 9:00 is 08:00 UTC.
+    monday = at(2026, 10, 26, 9)
+    slots = find_free_slots([], monday - HOUR, monday + HOUR, duration=HOUR, max_slots=1, working_hours=(9, 17), timezone='Europe/Berlin')
+    assert slots == [(monday, monday + HOUR)]
+
+
+@pytest.mark.parametrize('duration, step', [(0, 0), (HOUR, 0), (0, HOUR), (-HOUR, None), (HOUR, -HOUR)])
+def test_rejects_non_positive_duration_and_step(duration, step):
+    with pytest.raises(ValueError):
+        find_free_slots([], 0, 10 * HOUR, duration=duration, step=step, working_hours=(9, 17))
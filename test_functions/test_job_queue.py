@@ -0,0 +1,234 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+from google_auth.services import job_queue as job_queue_module
+from google_auth.services.job_queue import Job, JobQueue, PermanentJobError
+from google_auth.services.service_pool import service_pool
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(job_queue_module, 'RETRY_BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(job_queue_module, 'POLL_INTERVAL', 0.02)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'jobs.sqlite3')
+
+
+def wait_for(queue: JobQueue, job_id: str, statuses=('succeeded', 'failed'), timeout=5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} is still {queue.get(job_id)['status']}")
+
+
+def test_runs_a_job_and_deduplicates_it(path):
+    queue = JobQueue(path, workers=2)
+    runs = []
+    queue.register('echo', 'test', lambda payload, job: runs.append(job) or payload)
+    job, created = queue.enqueue('echo', {'value': 1})
+    assert created
+    assert wait_for(queue, job['job_id'])['result'] == {'value': 1}
+    again, created = queue.enqueue('echo', {'value': 1})
+    assert not created and again['job_id'] == job['job_id']
+    assert queue.get(job['idempotency_key'])['status'] == 'succeeded'
+    assert len(runs) == 1 and not runs[0].retried
+    assert queue.stats()['deduplicated'] == 1
+
+
+def test_retries_transient_failures(path):
+    queue = JobQueue(path, workers=1)
+    attempts = []
+
+    def flaky(payload, job):
+        attempts.append(job.attempt)
+        if job.attempt < 3:
+            raise ConnectionError("unreachable")
+        return 'done'
+
+    queue.register('flaky', 'test', flaky)
+    job, _ = queue.enqueue('flaky', {})
+    finished = wait_for(queue, job['job_id'])
+    assert (finished['status'], finished['attempts'], finished['result']) == ('succeeded', 3, 'done')
+    assert attempts == [1, 2, 3]
+    assert queue.stats()['retries'] == 2
+
+
+def test_gives_up_after_max_attempts(path):
+    queue = JobQueue(path, workers=1, max_attempts=3)
+
+    def down(payload, job):
+        raise ConnectionError("unreachable")
+
+    queue.register('down', 'test', down)
+    job, _ = queue.enqueue('down', {})
+    finished = wait_for(queue, job['job_id'])
+    assert (finished['status'], finished['attempts'], finished['error']) == ('failed', 3, 'unreachable')
+
+
+@pytest.mark.parametrize('error', [PermanentJobError("bad request"), ValueError("bad request")])
+def test_permanent_errors_are_not_retried(path, error):
+    queue = JobQueue(path, workers=1)
+
+    def fail(payload, job):
+        raise error
+
+    queue.register('invalid', 'test', fail)
+    job, _ = queue.enqueue('invalid', {})
+    finished = wait_for(queue, job['job_id'])
+    assert (finished['status'], finished['attempts']) == ('failed', 1)
+
+
+def test_job_of_a_dead_worker_is_run_again(path):
+    # A queue without workers claims the job and then "dies" holding it.
+    dead = JobQueue(path, workers=0)
+    dead.register('work', 'test', lambda payload, job: None)
+    job, _ = dead.enqueue('work', {})
+    with dead._wake:
+        assert dead._claim()[0] == job['job_id']
+    dead._connect().execute("UPDATE jobs SET lease_until = ?", (time.time() - 1,))
+
+    live = JobQueue(path, workers=1)
+    runs = []
+    live.register('work', 'test', lambda payload, job: runs.append(job) or 'ok')
+    live.start()
+    finished = wait_for(live, job['job_id'])
+    assert (finished['status'], finished['attempts']) == ('succeeded', 2)
+    assert runs[0].retried
+
+
+def test_limits_concurrency_per_api(path, monkeypatch):
+    monkeypatch.setenv('MCP_JOB_CONCURRENCY_SLOW', '2')
+    queue = JobQueue(path, workers=4)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def slow(payload, job):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+
+    queue.register('slow', 'slow', slow)
+    jobs = [queue.enqueue('slow', {'n': n})[0] for n in range(6)]
+    for job in jobs:
+        wait_for(queue, job['job_id'])
+    assert peak[0] == 2
+
+
+def test_worker_survives_a_failure_to_record_the_outcome(path, monkeypatch, capsys):
+    queue = JobQueue(path, workers=1)
+    queue.register('work', 'test', lambda payload, job: payload['n'])
+    finish = queue._finish
+    failures = []
+
+    def locked_once(job_id, status, **kwargs):
+        if not failures:
+            failures.append(job_id)
+            raise sqlite3.OperationalError("database is locked")
+        finish(job_id, status, **kwargs)
+
+    monkeypatch.setattr(queue, '_finish', locked_once)
+    first, _ = queue.enqueue('work', {'n': 1})
+    second, _ = queue.enqueue('work', {'n': 2})
+    assert wait_for(queue, second['job_id'])['result'] == 2
+    # The first job keeps its lease until it runs out, then runs again.
+    assert failures == [first['job_id']]
+    assert queue.get(first['job_id'])['status'] == 'running'
+    assert queue.stats()['running_by_api'] == {}
+    assert 'database is locked' in capsys.readouterr().err
+
+
+class LockedOnce:
+    """Wraps a connection so that the first lease renewal fails as if the database stayed locked."""
+
+    def __init__(self, conn, failures):
+        self._conn = conn
+        self._failures = failures
+
+    def execute(self, sql, *args):
+        if sql.startswith("UPDATE jobs SET lease_until") and not self._failures:
+            self._failures.append(sql)
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, *args)
+
+
+def test_leases_are_renewed_after_a_failed_renewal(path, monkeypatch, capsys):
+    monkeypatch.setattr(job_queue_module, 'JOB_LEASE_SECONDS', 0.3)
+    queue = JobQueue(path, workers=2)
+    connect = queue._connect
+    failures = []
+    monkeypatch.setattr(queue, '_connect', lambda: LockedOnce(connect(), failures))
+    release = threading.Event()
+    runs = []
+
+    def long_send(payload, job):
+        runs.append(job.attempt)
+        release.wait(5)
+        return 'sent'
+
+    queue.register('send', 'test', long_send)
+    job, _ = queue.enqueue('send', {})
+    deadline = time.monotonic() + 5
+    while not failures and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Several lease lengths later the job still holds a live lease.
+    time.sleep(0.9)
+    lease_until = connect().execute("SELECT lease_until FROM jobs WHERE id = ?", (job['job_id'],)).fetchone()[0]
+    assert lease_until > time.time()
+    release.set()
+    assert wait_for(queue, job['job_id'])['attempts'] == 1
+    assert runs == [1]
+    assert 'Could not renew job leases' in capsys.readouterr().err
+
+
+@pytest.fixture
+def fake():
+    fake = FakeGoogle(events=0, messages=0).start()
+    install_fake_services(fake, services=('calendar',))
+    yield fake
+    service_pool.invalidate('calendar')
+    fake.stop()
+
+
+def create_event_payload():
+    return {'calendar_id': 'primary', 'event_body': {
+        'summary': 'Queued',
+        'start': {'dateTime': '2030-01-01T09:00:00Z'},
+        'end': {'dateTime': '2030-01-01T10:00:00Z'},
+    }}
+
+
+def test_create_event_job_adopts_the_event_of_an_earlier_attempt(fake):
+    from mcp_server.run_calendar_mcp import job_event_id, run_create_event_job
+
+    job = Job('job1', 'key1', attempt=1)
+    created = run_create_event_job(create_event_payload(), job)
+    assert created['id'] == job_event_id(job)
+    retried = run_create_event_job(create_event_payload(), Job('job1', 'key1', attempt=2))
+    assert retried['id'] == created['id']
+    assert len(fake.calendars['primary']) == 1
+
+
+def test_create_event_job_fails_if_its_event_was_deleted(fake):
+    from mcp_server.run_calendar_mcp import job_event_id, run_create_event_job
+
+    job = Job('job1', 'key1', attempt=2)
+    # Google keeps deleted events, and their IDs, as cancelled.
+    event_id = job_event_id(job)
+    fake.calendars.setdefault('primary', {})[event_id] = {
+        **create_event_payload()['event_body'], 'id': event_id, 'status': 'cancelled', 'etag': '"1"',
+    }
+    with pytest.raises(PermanentJobError):
+        run_create_event_job(create_event_payload(), job)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+from google_auth.services.meet_space_pool import MeetSpacePool
+from google_auth.services.service_pool import service_pool
+
+
+def saved_pool(path, count):
+    spaces = [{"name": f"spaces/{i}", "meeting_uri": f"https://meet.google.com/{i}", "created_at": time.time(), "json": "{}"}
+              for i in range(count)]
+    path.write_text(json.dumps(spaces))
+    return spaces
+
+
+def test_not_started_pool_leaves_the_file_alone(tmp_path):
+    path = tmp_path / 'pool.json'
+    saved_pool(path, 2)
+    pool = MeetSpacePool(size=2, low_water=0, path=str(path))
+    assert pool.take() is None
+    pool.release({"name": "spaces/x"})
+    assert len(json.loads(path.read_text())) == 2
+
+
+def test_hands_out_saved_spaces_once(tmp_path):
+    path = tmp_path / 'pool.json'
+    spaces = saved_pool(path, 2)
+    pool = MeetSpacePool(size=2, low_water=0, path=str(path))
+    pool.start()
+    assert pool.take() == spaces[0]
+    # A restart continues from the saved file.
+    restarted = MeetSpacePool(size=2, low_water=0, path=str(path))
+    restarted.start()
+    assert restarted.take() == spaces[1]
+    assert restarted.take() is None
+    restarted.release(spaces[1])
+    assert json.loads(path.read_text()) == [spaces[1]]
+
+
+def test_drops_expired_spaces(tmp_path):
+    path = tmp_path / 'pool.json'
+    spaces = saved_pool(path, 2)
+    spaces[0]["created_at"] = 0
+    path.write_text(json.dumps(spaces))
+    pool = MeetSpacePool(size=2, low_water=0, path=str(path))
+    pool.start()
+    assert pool.take() == spaces[1]
+    assert pool.stats()["expired"] == 1
+
+
+def test_disabled_pool_hands_out_nothing(tmp_path):
+    path = tmp_path / 'pool.json'
+    saved_pool(path, 1)
+    pool = MeetSpacePool(size=0, low_water=0, path=str(path))
+    pool.start()
+    assert pool.take() is None
+
+
+@pytest.fixture
+def fake():
+    fake = FakeGoogle(events=0, messages=0).start()
+    install_fake_services(fake, services=('calendar',))
+    yield fake
+    service_pool.invalidate('calendar')
+    fake.stop()
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    import mcp_server.run_calendar_mcp as calendar_server
+
+    path = tmp_path / 'pool.json'
+    saved_pool(path, 2)
+    pool = MeetSpacePool(size=2, low_water=0, path=str(path))
+    pool.start()
+    monkeypatch.setattr(calendar_server, 'meet_space_pool', pool)
+    return pool
+
+
+def schedule(**kwargs) -> dict:
+    from mcp_server.run_calendar_mcp import schedule_meeting
+
+    return json.loads(asyncio.run(schedule_meeting(
+        'Review', '2030-01-01T09:00:00Z', '2030-01-01T10:00:00Z',
+        conference='pooled_space', check_availability=False, **kwargs,
+    )))
+
+
+def test_space_of_a_rejected_booking_goes_back_to_the_pool(fake, pool):
+    fake.fail_next(400)
+    assert 'error' in schedule()
+    assert pool.take()['name'] == 'spaces/0'
+    assert pool.stats()['released'] == 1
+
+
+def test_space_of_a_booking_that_may_exist_is_not_reused(fake, pool):
+    # The event is created, but the response is lost in a 503.
+    fake.fail_next(503, after_processing=True)
+    assert 'error' in schedule()
+    assert [event['conferenceData']['entryPoints'][0]['uri'] for event in fake.calendars['primary'].values()] == [
+        'https://meet.google.com/0',
+    ]
+    assert pool.take()['name'] == 'spaces/1'
+    assert pool.stats()['released'] == 0
@@ -0,0 +1,125 @@
+import base64
+import email
+import io
+import os
+from email import policy
+
+import pytest
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+from google_auth.services import mime_stream
+from google_auth.services.mime_stream import check_attachments, encoded_size, write_mime_message
+from google_auth.services.service_pool import service_pool
+
+HEADERS = {
+    'From': 'me@example.com',
+    'To': 'Zoë Müller <zoe@example.com>',
+    'Subject': 'Über das Café ☕ — ' + 'sehr lange Betreffzeile ' * 8,
+}
+BODY = "Hallo Zoë,\n\nanbei die Unterlagen. 日本語も大丈夫です。\n"
+
+
+@pytest.fixture
+def files(tmp_path):
+    """An odd-sized binary file, a non-ASCII file name and an empty file."""
+    paths = {
+        'résumé final.pdf': os.urandom(200_003),
+        'notes.txt': b'plain text\r\nwith lines\n',
+        'empty.bin': b'',
+    }
+    for name, data in paths.items():
+        (tmp_path / name).write_bytes(data)
+    return {str(tmp_path / name): data for name, data in paths.items()}
+
+
+def parse(raw: bytes):
+    return email.message_from_bytes(raw, policy=policy.default)
+
+
+def check_message(raw: bytes, files: dict):
+    # Lines end in CRLF and stay within the SMTP limit.
+    assert b'\n' not in raw.replace(b'\r\n', b'')
+    assert max(len(line) for line in raw.split(b'\r\n')) <= 998
+    message = parse(raw)
+    assert message.defects == []
+    assert message['Subject'] == HEADERS['Subject']
+    assert message['To'] == HEADERS['To']
+    assert message.get_content_type() == 'multipart/mixed'
+
+    body, *attachments = message.iter_parts()
+    assert body.get_content() == BODY
+    assert [part.get_filename() for part in attachments] == [os.path.basename(path) for path in files]
+    for part, data in zip(attachments, files.values()):
+        assert part.get_payload(decode=True) == data
+    assert attachments[0].get_content_type() == 'application/pdf'
+    assert attachments[2].get_content_type() == 'application/octet-stream'
+
+
+def test_round_trip(files):
+    out = io.BytesIO()
+    write_mime_message(out, HEADERS, BODY, list(files))
+    check_message(out.getvalue(), files)
+
+
+def test_without_attachments():
+    out = io.BytesIO()
+    write_mime_message(out, {'To': 'zoe@example.com', 'Subject': 'Hi'}, 'Hello')
+    parts = list(parse(out.getvalue()).iter_parts())
+    assert [part.get_content() for part in parts] == ['Hello']
+
+
+@pytest.mark.parametrize('size', [0, 1, 2, 56, 57, 58, 76, 57 * 1024, 57 * 1024 + 1, 200_003])
+def test_encoded_size_is_exact(size):
+    assert encoded_size(size) == len(base64.encodebytes(b'x' * size).replace(b'\n', b'\r\n'))
+
+
+def test_attachment_sizes_add_up(files):
+    out = io.BytesIO()
+    write_mime_message(out, HEADERS, BODY, list(files))
+    without = io.BytesIO()
+    write_mime_message(without, HEADERS, BODY)
+    attachment_bytes = sum(encoded_size(len(data)) for data in files.values())
+    # What's left is the part headers and boundaries.
+    assert 0 < len(out.getvalue()) - len(without.getvalue()) - attachment_bytes < 1000
+
+
+def test_check_attachments_limits(files, monkeypatch):
+    paths = list(files)
+    assert check_attachments(paths) is None
+    assert 'not found' in check_attachments(paths + ['/nonexistent/file.pdf'])
+
+    monkeypatch.setattr(mime_stream, 'MAX_ATTACHMENT_BYTES', 200_002)
+    assert 'résumé final.pdf' in check_attachments(paths)
+    monkeypatch.setattr(mime_stream, 'MAX_ATTACHMENT_BYTES', 200_003)
+    assert check_attachments(paths) is None
+
+    total = sum(encoded_size(len(data)) for data in files.values())
+    monkeypatch.setattr(mime_stream, 'MAX_MESSAGE_BYTES', total - 1)
+    assert 'message limit' in check_attachments(paths)
+    monkeypatch.setattr(mime_stream, 'MAX_MESSAGE_BYTES', total)
+    assert check_attachments(paths) is None
+
+
+@pytest.fixture
+def fake():
+    fake = FakeGoogle(events=0, messages=0).start()
+    install_fake_services(fake, services=('gmail',))
+    yield fake
+    service_pool.invalidate('gmail')
+    fake.stop()
+
+
+@pytest.mark.parametrize('resumable', [False, True])
+def test_sent_through_the_media_upload(fake, files, monkeypatch, resumable):
+    import mcp_server.run_gmail_mcp as gmail_server
+
+    if resumable:
+        monkeypatch.setattr(gmail_server, 'RESUMABLE_UPLOAD_THRESHOLD', 1024)
+        monkeypatch.setattr(gmail_server, 'UPLOAD_CHUNK_SIZE', 256 * 1024)
+    service = gmail_server.get_gmail_service()
+    sent = gmail_server.deliver_email(service, HEADERS['To'], HEADERS['Subject'], BODY, list(files), message_id='<m1@example.com>')
+    assert sent['labelIds'] == ['SENT']
+    assert fake.sent == [len(fake.last_sent)]
+    assert parse(fake.last_sent)['Message-ID'] == '<m1@example.com>'
+    assert parse(fake.last_sent)['From'] == 'bench@example.com'
+    check_message(fake.last_sent, files)
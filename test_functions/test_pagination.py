@@ -0,0 +1,58 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.fake_google import FakeGoogle, install_fake_services
+from google_auth.services.pagination import decode_cursor, encode_cursor
+from google_auth.services.service_pool import service_pool
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('CigKGjQ', {'time_min': '2024-05-21T00:00:00Z', 'time_max': None})
+    assert decode_cursor(cursor) == ('CigKGjQ', {'time_min': '2024-05-21T00:00:00Z', 'time_max': None})
+
+
+@pytest.mark.parametrize('cursor', ['CigKGjQ', '', encode_cursor('x', {})[:-4], 'WzEsIDJd'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def fake():
+    fake = FakeGoogle(events=20, messages=0).start()
+    install_fake_services(fake, services=('calendar',))
+    yield fake
+    service_pool.invalidate('calendar')
+    fake.stop()
+
+
+def list_events(**kwargs) -> dict:
+    from mcp_server.run_calendar_mcp import list_events
+
+    return json.loads(asyncio.run(list_events(**kwargs)))
+
+
+def test_next_page_keeps_the_default_time_min(fake, monkeypatch):
+    import mcp_server.run_calendar_mcp as calendar_server
+
+    expected = list_events(max_results=6, paginate=True)['items']
+    first = list_events(max_results=3, paginate=True)
+    assert first['time_min'] and first['time_max'] is None
+
+    class ThreeDaysLater(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return datetime.now(tz) + timedelta(days=3)
+
+    # The next page is requested later, without repeating time_min.
+    monkeypatch.setattr(calendar_server, 'datetime', ThreeDaysLater)
+    second = list_events(max_results=3, page_token=first['next_page_token'])
+    assert second['time_min'] == first['time_min']
+    assert [event['id'] for event in first['items'] + second['items']] == [event['id'] for event in expected]
+
+
+def test_invalid_page_token_is_an_error(fake):
+    assert 'error' in list_events(page_token='not-a-cursor')
@@ -0,0 +1,206 @@
+from datetime import datetime, UTC
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from google_auth.services.recurrence import INSTANCE_FIELDS, Recurrence, UnsupportedRecurrence, expand_events
+
+NEW_YORK = ZoneInfo('America/New_York')
+
+
+def series(start: str, end: str, *recurrence, event_id='series', tz='America/New_York'):
+    """A recurring event as events().list returns it; `start` and `end` carry their UTC offset."""
+    return {
+        'id': event_id,
+        'summary': 'Standup',
+        'start': {'dateTime': start, 'timeZone': tz},
+        'end': {'dateTime': end, 'timeZone': tz},
+        'recurrence': list(recurrence),
+    }
+
+
+def stamp(value: str, tz=NEW_YORK) -> float:
+    return datetime.fromisoformat(value).replace(tzinfo=tz).timestamp()
+
+
+def starts(event: dict, first: str, last: str, tz=NEW_YORK) -> list:
+    """The wall-clock starts of the occurrences between two local times."""
+    occurrences = Recurrence(event).occurrences(stamp(first, tz), stamp(last, tz))
+    return [datetime.fromtimestamp(value, tz).strftime('%Y-%m-%d %H:%M') for value in occurrences]
+
+
+def daily(*recurrence):
+    return series('2024-01-01T09:00:00-05:00', '2024-01-01T09:30:00-05:00', *recurrence)
+
+
+def test_count_includes_the_first_occurrence():
+    event = daily('RRULE:FREQ=DAILY;COUNT=3')
+    assert starts(event, '2024-01-01', '2025-01-01') == ['2024-01-01 09:00', '2024-01-02 09:00', '2024-01-03 09:00']
+
+
+def test_weekly_by_day_until():
+    event = daily('RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR;UNTIL=20240112T140000Z')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == [
+        '2024-01-01', '2024-01-03', '2024-01-05', '2024-01-08', '2024-01-10', '2024-01-12',
+    ]
+
+
+def test_until_excludes_a_later_time_on_the_same_day():
+    event = daily('RRULE:FREQ=DAILY;UNTIL=20240103T135959Z')
+    assert starts(event, '2024-01-01', '2025-01-01') == ['2024-01-01 09:00', '2024-01-02 09:00']
+
+
+def test_date_until_includes_the_whole_day():
+    event = daily('RRULE:FREQ=DAILY;UNTIL=20240103')
+    assert len(starts(event, '2024-01-01', '2025-01-01')) == 3
+
+
+def test_interval():
+    event = daily('RRULE:FREQ=WEEKLY;INTERVAL=2;COUNT=3')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == ['2024-01-01', '2024-01-15', '2024-01-29']
+
+
+def test_monthly_nth_weekday():
+    event = series('2024-01-09T09:00:00-05:00', '2024-01-09T10:00:00-05:00', 'RRULE:FREQ=MONTHLY;BYDAY=2TU;COUNT=3')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == ['2024-01-09', '2024-02-13', '2024-03-12']
+
+
+def test_monthly_last_weekday():
+    event = series('2024-01-26T09:00:00-05:00', '2024-01-26T10:00:00-05:00', 'RRULE:FREQ=MONTHLY;BYDAY=-1FR;COUNT=3')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == ['2024-01-26', '2024-02-23', '2024-03-29']
+
+
+def test_negative_month_day_is_the_last_day():
+    event = series('2024-01-31T09:00:00-05:00', '2024-01-31T10:00:00-05:00', 'RRULE:FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=4')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == [
+        '2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30',
+    ]
+
+
+def test_months_without_the_day_are_skipped():
+    event = series('2024-01-31T09:00:00-05:00', '2024-01-31T10:00:00-05:00', 'RRULE:FREQ=MONTHLY;COUNT=3')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == ['2024-01-31', '2024-03-31', '2024-05-31']
+
+
+def test_yearly_leap_day():
+    event = series('2024-02-29T09:00:00-05:00', '2024-02-29T10:00:00-05:00', 'RRULE:FREQ=YEARLY;COUNT=2')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2030-01-01')] == ['2024-02-29', '2028-02-29']
+
+
+def test_yearly_by_month_and_day():
+    # Thanksgiving: the fourth Thursday of November.
+    event = series('2024-11-28T12:00:00-05:00', '2024-11-28T15:00:00-05:00', 'RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=4TH;COUNT=3')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2030-01-01')] == ['2024-11-28', '2025-11-27', '2026-11-26']
+
+
+def test_by_set_pos_picks_the_last_weekday_of_the_month():
+    event = series('2024-01-31T09:00:00-05:00', '2024-01-31T10:00:00-05:00',
+                   'RRULE:FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1;COUNT=4')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == [
+        '2024-01-31', '2024-02-29', '2024-03-29', '2024-04-30',
+    ]
+
+
+def test_exdate_still_counts_towards_count():
+    event = daily('RRULE:FREQ=DAILY;COUNT=5', 'EXDATE;TZID=America/New_York:20240103T090000')
+    assert [day[:10] for day in starts(event, '2024-01-01', '2025-01-01')] == [
+        '2024-01-01', '2024-01-02', '2024-01-04', '2024-01-05',
+    ]
+
+
+def test_rdate_adds_occurrences_at_their_own_time():
+    event = daily('RRULE:FREQ=DAILY;COUNT=2', 'RDATE;TZID=America/New_York:20240110T140000,20240102T090000')
+    # An RDATE that repeats a rule occurrence appears once.
+    assert starts(event, '2024-01-01', '2025-01-01') == ['2024-01-01 09:00', '2024-01-02 09:00', '2024-01-10 14:00']
+
+
+def test_wall_clock_time_is_kept_across_dst():
+    event = daily('RRULE:FREQ=DAILY')
+    occurrences = list(Recurrence(event).occurrences(stamp('2024-03-09'), stamp('2024-03-12')))
+    assert [datetime.fromtimestamp(value, UTC).strftime('%m-%d %H:%M') for value in occurrences] == [
+        '03-09 14:00', '03-10 13:00', '03-11 13:00',
+    ]
+    assert starts(event, '2024-11-02', '2024-11-05') == ['2024-11-02 09:00', '2024-11-03 09:00', '2024-11-04 09:00']
+
+
+def test_skips_to_a_distant_window():
+    event = daily('RRULE:FREQ=DAILY')
+    assert starts(event, '2030-06-10', '2030-06-12') == ['2030-06-10 09:00', '2030-06-11 09:00']
+    biweekly = daily('RRULE:FREQ=WEEKLY;INTERVAL=2')
+    assert [day[:10] for day in starts(biweekly, '2024-06-01', '2024-07-01')] == ['2024-06-03', '2024-06-17']
+
+
+def test_count_is_kept_when_the_window_starts_later():
+    event = daily('RRULE:FREQ=DAILY;COUNT=10')
+    assert [day[:10] for day in starts(event, '2024-01-08', '2024-01-20')] == ['2024-01-08', '2024-01-09', '2024-01-10']
+
+
+def test_occurrence_overlapping_the_window_start_is_included():
+    event = series('2024-01-01T08:00:00-05:00', '2024-01-01T10:00:00-05:00', 'RRULE:FREQ=DAILY')
+    assert starts(event, '2024-01-05T09:00', '2024-01-06T09:00') == ['2024-01-05 08:00', '2024-01-06 08:00']
+
+
+@pytest.mark.parametrize('line', [
+    'RRULE:FREQ=DAILY;BYHOUR=9,17',
+    'RRULE:FREQ=HOURLY',
+    'RDATE;VALUE=PERIOD:20240110T140000Z/PT1H',
+    'EXRULE:FREQ=WEEKLY',
+])
+def test_unsupported_recurrence(line):
+    with pytest.raises(UnsupportedRecurrence):
+        Recurrence(daily(line))
+
+
+def test_expand_events_applies_modified_and_cancelled_instances():
+    master = daily('RRULE:FREQ=DAILY;COUNT=3')
+    cancelled = {
+        'id': 'series_20240102T140000Z', 'recurringEventId': 'series', 'status': 'cancelled',
+        'originalStartTime': {'dateTime': '2024-01-02T09:00:00-05:00'},
+        'start': {'dateTime': '2024-01-02T09:00:00-05:00'}, 'end': {'dateTime': '2024-01-02T09:30:00-05:00'},
+    }
+    moved = {
+        'id': 'series_20240103T140000Z', 'recurringEventId': 'series', 'summary': 'Late standup',
+        'originalStartTime': {'dateTime': '2024-01-03T09:00:00-05:00'},
+        'start': {'dateTime': '2024-01-03T11:00:00-05:00'}, 'end': {'dateTime': '2024-01-03T11:30:00-05:00'},
+    }
+    single = {
+        'id': 'lunch', 'summary': 'Lunch',
+        'start': {'dateTime': '2024-01-02T12:00:00-05:00'}, 'end': {'dateTime': '2024-01-02T13:00:00-05:00'},
+    }
+    rows = [dict(zip(INSTANCE_FIELDS, row))
+            for row in expand_events([master, cancelled, moved, single], stamp('2024-01-01'), stamp('2024-01-10'))]
+    assert [(row['id'], row['start']) for row in rows] == [
+        ('series_20240101T140000Z', '2024-01-01T09:00:00-05:00'),
+        ('lunch', '2024-01-02T12:00:00-05:00'),
+        ('series_20240103T140000Z', '2024-01-03T11:00:00-05:00'),
+    ]
+    assert rows[0]['end'] == '2024-01-01T09:30:00-05:00'
+    assert rows[0]['recurring_event_id'] == 'series'
+
+
+def test_expand_events_all_day_series():
+    birthday = {
+        'id': 'birthday', 'summary': 'Birthday',
+        'start': {'date': '2024-03-15'}, 'end': {'date': '2024-03-16'},
+        'recurrence': ['RRULE:FREQ=YEARLY'],
+    }
+    rows = list(expand_events([birthday], stamp('2025-01-01', UTC), stamp('2026-01-01', UTC)))
+    assert rows == [('birthday_20250315', '2025-03-15', '2025-03-16', 'Birthday', 'birthday')]
+
+
+def test_expand_events_falls_back_for_unsupported_series():
+    master = daily('RRULE:FREQ=DAILY;BYHOUR=9,17')
+    with pytest.raises(UnsupportedRecurrence):
+        list(expand_events([master], stamp('2024-01-01'), stamp('2024-01-02')))
+
+    def instances(event):
+        assert event is master
+        return [
+            {'id': 'series_a', 'summary': 'Standup', 'recurringEventId': 'series',
+             'start': {'dateTime': '2024-01-01T09:00:00-05:00'}, 'end': {'dateTime': '2024-01-01T09:30:00-05:00'}},
+            {'id': 'series_b', 'recurringEventId': 'series', 'status': 'cancelled',
+             'start': {'dateTime': '2024-01-01T17:00:00-05:00'}, 'end': {'dateTime': '2024-01-01T17:30:00-05:00'}},
+        ]
+
+    rows = list(expand_events([master], stamp('2024-01-01'), stamp('2024-01-02'), fallback=instances))
+    assert [row[0] for row in rows] == ['series_a']
@@ -0,0 +1,159 @@
+import email.utils
+from datetime import datetime, timedelta, UTC
+
+import httplib2
+import pytest
+from google.oauth2.credentials import Credentials
+from googleapiclient.errors import HttpError
+
+from benchmarks.fake_google import FakeGoogle
+from google_auth.services import request_executor
+from google_auth.services.request_executor import RequestGovernor, TokenBucket, execute, retry_after
+from google_auth.services.service_pool import build_thread_safe_service
+
+
+class FakeClock:
+    """Stands in for the time module in request_executor, so waits take no real time."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(request_executor, 'time', clock)
+    # A fresh governor, so rate limits start full and use the fake clock.
+    monkeypatch.setattr(request_executor, 'governor', RequestGovernor())
+    return clock
+
+
+@pytest.fixture(scope='module')
+def fake():
+    fake = FakeGoogle(events=10, messages=10).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture(scope='module')
+def calendar(fake):
+    return build_thread_safe_service('calendar', 'v3', Credentials(token='fake-token'), root_url=f"{fake.url}/")
+
+
+def new_event(calendar, summary='Test'):
+    start = datetime.now(UTC) + timedelta(days=1)
+    body = {
+        'summary': summary,
+        'start': {'dateTime': start.strftime('%Y-%m-%dT%H:%M:%SZ')},
+        'end': {'dateTime': (start + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%SZ')},
+    }
+    return calendar.events().insert(calendarId='primary', body=body)
+
+
+def test_get_is_retried_with_backoff(fake, calendar, clock):
+    fake.fail_next(503, count=2)
+    response = execute(calendar.events().list(calendarId='primary', maxResults=5))
+    assert len(response['items']) == 5
+    assert len(clock.sleeps) == 2
+    assert 0 <= clock.sleeps[0] <= 0.5 and 0 <= clock.sleeps[1] <= 1.0
+    assert request_executor.governor.stats()['calendar']['retries'] == 2
+
+
+def test_gives_up_after_max_retries(fake, calendar, clock):
+    fake.fail_next(500, count=3)
+    with pytest.raises(HttpError) as raised:
+        execute(calendar.events().list(calendarId='primary'), max_retries=2)
+    assert raised.value.resp.status == 500
+    assert len(clock.sleeps) == 2
+    assert request_executor.governor.stats()['calendar']['failures'] == 1
+
+
+def test_client_errors_are_not_retried(calendar, clock):
+    with pytest.raises(HttpError) as raised:
+        execute(calendar.events().get(calendarId='primary', eventId='missing'))
+    assert raised.value.resp.status == 404
+    assert clock.sleeps == []
+
+
+def test_retry_after_is_honoured(fake, calendar, clock):
+    fake.fail_next(429, retry_after='7')
+    execute(calendar.events().list(calendarId='primary', maxResults=1))
+    # The Retry-After, then the rate limit's pacing of the retry itself.
+    assert clock.sleeps[0] == 7.0
+    assert sum(clock.sleeps) <= 7.0 + 1 / request_executor.DEFAULT_RATES['calendar']
+    assert request_executor.governor.stats()['calendar']['rate_limited_by_google'] == 1
+
+
+def test_retry_after_is_capped(fake, calendar, clock):
+    fake.fail_next(503, retry_after='3600')
+    execute(calendar.events().list(calendarId='primary', maxResults=1))
+    assert clock.sleeps == [request_executor.RETRY_AFTER_CAP]
+
+
+def test_retry_after_parses_seconds_and_dates():
+    def error(value):
+        return HttpError(httplib2.Response({'status': 429, 'retry-after': value}), b'')
+
+    assert retry_after(error('12')) == 12.0
+    when = email.utils.format_datetime(datetime.now(UTC) + timedelta(seconds=30), usegmt=True)
+    assert 28 <= retry_after(error(when)) <= 30
+    assert retry_after(error('soon')) is None
+    assert retry_after(ValueError()) is None
+
+
+def test_post_is_not_retried_after_a_server_error(fake, calendar, clock):
+    before = len(fake.calendars['primary'])
+    fake.fail_next(502, after_processing=True)
+    with pytest.raises(HttpError) as raised:
+        execute(new_event(calendar, 'Not repeated'))
+    assert raised.value.resp.status == 502
+    assert clock.sleeps == []
+    # Google acted on the request once, and it wasn't sent again.
+    assert len(fake.calendars['primary']) == before + 1
+
+
+def test_post_is_retried_when_rate_limited(fake, calendar, clock):
+    before = len(fake.calendars['primary'])
+    fake.fail_next(429, retry_after='1')
+    created = execute(new_event(calendar, 'Rate limited'))
+    assert created['summary'] == 'Rate limited'
+    assert len(fake.calendars['primary']) == before + 1
+    assert clock.sleeps[0] == 1.0
+
+
+def test_idempotent_post_is_retried_after_a_server_error(fake, calendar, clock):
+    fake.fail_next(503)
+    execute(new_event(calendar), idempotent=True)
+    assert len(clock.sleeps) == 1
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert [round(bucket.reserve(), 3) for _ in range(4)] == [0.0, 0.0, 0.1, 0.2]
+    clock.now += 1
+    assert bucket.reserve() == 0.0
+    # After a Retry-After, every caller sharing the bucket waits it out.
+    bucket.pause(5)
+    assert round(bucket.reserve(), 3) == 5.1
+    assert round(bucket.reserve(), 3) == 5.2
+
+
+def test_governor_limits_the_request_rate(monkeypatch, clock):
+    monkeypatch.setenv('GOOGLE_API_RATE_CALENDAR', '5')
+    governor = RequestGovernor()
+    for _ in range(20):
+        governor.call(lambda: None, 'calendar')
+    # A burst of 2 seconds' worth of requests, then 5 per second.
+    assert round(sum(clock.sleeps), 3) == 2.0
+    assert governor.stats()['calendar']['throttled'] == 10
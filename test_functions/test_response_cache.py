@@ -0,0 +1,134 @@
+import pytest
+
+from google_auth.services import response_cache as response_cache_module
+from google_auth.services.response_cache import NOT_MODIFIED, ResponseCache
+
+KEY = ('calendar', 'primary', 'event1')
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache_module, 'time', clock)
+    return clock
+
+
+def fetcher(*responses):
+    """Returns a fetch function that answers with `responses` in turn and records the etags it got."""
+    calls = []
+
+    def fetch(etag):
+        calls.append(etag)
+        return responses[len(calls) - 1]
+
+    fetch.calls = calls
+    return fetch
+
+
+def test_caches_until_the_ttl_runs_out(clock):
+    cache = ResponseCache(ttl=60)
+    fetch = fetcher(('v1', None), ('v2', None))
+    assert cache.get_or_fetch(KEY, fetch) == 'v1'
+    assert cache.get_or_fetch(KEY, fetch) == 'v1'
+    clock.now += 61
+    assert cache.get_or_fetch(KEY, fetch) == 'v2'
+    assert fetch.calls == [None, None]
+    assert cache.stats()['hits'] == 1
+
+
+def test_revalidates_with_the_etag(clock):
+    cache = ResponseCache(ttl=60)
+    fetch = fetcher(('v1', '"1"'), NOT_MODIFIED, ('v2', '"2"'))
+    cache.get_or_fetch(KEY, fetch)
+    clock.now += 61
+    assert cache.get_or_fetch(KEY, fetch) == 'v1'
+    # The 304 renewed the entry.
+    assert cache.get_or_fetch(KEY, fetch) == 'v1'
+    clock.now += 61
+    assert cache.get_or_fetch(KEY, fetch) == 'v2'
+    assert fetch.calls == [None, '"1"', '"1"']
+    assert cache.stats()['not_modified'] == 1
+
+
+def test_evicts_least_recently_used_beyond_max_bytes(clock):
+    cache = ResponseCache(ttl=60, max_bytes=10)
+    cache.put(('a',), 'aaaa')
+    cache.put(('b',), 'bbbb')
+    cache.get_or_fetch(('a',), fetcher())
+    cache.put(('c',), 'cccc')
+    assert cache.stats()['entries'] == 2
+    assert cache.get_or_fetch(('a',), fetcher()) == 'aaaa'
+    assert cache.get_or_fetch(('b',), fetcher(('B', None))) == 'B'
+
+
+def test_oversized_write_drops_the_old_version(clock):
+    cache = ResponseCache(ttl=60, max_bytes=10)
+    cache.put(KEY, 'old')
+    cache.put(KEY, 'x' * 20)
+    assert cache.get_or_fetch(KEY, fetcher(('new', None))) == 'new'
+
+
+def test_read_racing_an_invalidation_is_not_cached(clock):
+    cache = ResponseCache(ttl=60)
+
+    def stale_read(etag):
+        # delete_event runs while the read is in flight.
+        cache.invalidate(KEY)
+        return 'old', '"1"'
+
+    assert cache.get_or_fetch(KEY, stale_read) == 'old'
+    assert cache.get_or_fetch(KEY, fetcher(('fresh', '"2"'))) == 'fresh'
+
+
+def test_read_racing_a_write_keeps_the_write(clock):
+    cache = ResponseCache(ttl=60)
+
+    def stale_read(etag):
+        # update_event caches its result while the read is in flight.
+        cache.put(KEY, 'updated', '"2"')
+        return 'old', '"1"'
+
+    assert cache.get_or_fetch(KEY, stale_read) == 'old'
+    assert cache.get_or_fetch(KEY, fetcher()) == 'updated'
+
+
+def test_revalidation_racing_an_invalidation_does_not_renew(clock):
+    cache = ResponseCache(ttl=60)
+    cache.put(KEY, 'v1', '"1"')
+    clock.now += 61
+
+    def not_modified(etag):
+        cache.invalidate(KEY)
+        return NOT_MODIFIED
+
+    assert cache.get_or_fetch(KEY, not_modified) == 'v1'
+    assert cache.get_or_fetch(KEY, fetcher(('v2', '"2"'))) == 'v2'
+
+
+def test_failed_fetch_leaves_no_state(clock):
+    cache = ResponseCache(ttl=60)
+
+    def failing(etag):
+        raise RuntimeError("unreachable")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch(KEY, failing)
+    assert cache._fetching == {}
+    assert cache.get_or_fetch(KEY, fetcher(('v1', None))) == 'v1'
+    assert cache.get_or_fetch(KEY, fetcher()) == 'v1'
+
+
+def test_disabled_cache_always_fetches():
+    cache = ResponseCache(ttl=0)
+    fetch = fetcher(('v1', None), ('v2', None))
+    cache.put(KEY, 'v0')
+    assert cache.get_or_fetch(KEY, fetch) == 'v1'
+    assert cache.get_or_fetch(KEY, fetch) == 'v2'
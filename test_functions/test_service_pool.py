@@ -0,0 +1,72 @@
+from google_auth.services.service_pool import ServicePool
+
+
+class FakeCredentials:
+    def __init__(self):
+        self.valid = True
+
+
+def make_pool(load_credentials):
+    pool = ServicePool()
+    builds = []
+
+    def build_service(creds):
+        builds.append(creds)
+        return {'creds': creds, 'build': len(builds)}
+
+    pool.register('calendar', load_credentials=load_credentials, build_service=build_service)
+    return pool, builds
+
+
+def test_builds_once_and_shares_the_client():
+    creds = FakeCredentials()
+    pool, builds = make_pool(lambda: creds)
+    assert pool.get('calendar') is pool.get('calendar')
+    assert len(builds) == 1
+    assert pool.stats()['hits'] == 1
+
+
+def test_keeps_client_when_credentials_are_refreshed_in_place():
+    creds = FakeCredentials()
+    loads = []
+
+    def load_credentials():
+        loads.append(1)
+        creds.valid = True
+        return creds
+
+    pool, builds = make_pool(load_credentials)
+    service = pool.get('calendar')
+    creds.valid = False
+    assert pool.get('calendar') is service
+    assert len(loads) == 2
+    assert len(builds) == 1
+
+
+def test_rebuilds_client_when_credentials_are_replaced():
+    current = [FakeCredentials()]
+    pool, builds = make_pool(lambda: current[0])
+    service = pool.get('calendar')
+    current[0].valid = False
+    current[0] = FakeCredentials()
+    rebuilt = pool.get('calendar')
+    assert rebuilt is not service and rebuilt['creds'] is current[0]
+    assert pool.stats()['rebuilds'] == 1
+
+
+def test_drops_client_when_credentials_are_lost():
+    current = [FakeCredentials()]
+    pool, builds = make_pool(lambda: current[0])
+    pool.get('calendar')
+    current[0].valid = False
+    current[0] = None
+    assert pool.get('calendar') is None
+    assert pool.stats()['warm_services'] == []
+
+
+def test_installed_client_never_expires():
+    pool, builds = make_pool(lambda: None)
+    service = object()
+    pool.install('calendar', service)
+    assert pool.get('calendar') is service
+    assert builds == []
@@ -0,0 +1,41 @@
+import multiprocessing
+
+from google_auth.services.sync_state import SyncStateStore
+
+
+def _write_cursors(path, namespace):
+    store = SyncStateStore(path)
+    for i in range(100):
+        store.set(namespace, f"key{i % 5}", i)
+
+
+def test_set_get_delete(tmp_path):
+    store = SyncStateStore(str(tmp_path / 'sync_state.json'))
+    assert store.get('calendar', 'primary') is None
+    store.set('calendar', 'primary', 'token1')
+    assert store.get('calendar', 'primary') == 'token1'
+    store.delete('calendar', 'primary')
+    assert store.get('calendar', 'primary') is None
+
+
+def test_sees_cursors_written_by_another_instance(tmp_path):
+    path = str(tmp_path / 'sync_state.json')
+    first, second = SyncStateStore(path), SyncStateStore(path)
+    first.get('calendar', 'primary')
+    second.set('gmail', 'me', '1530')
+    first.set('calendar', 'primary', 'sync1180')
+    assert second.get('calendar', 'primary') == 'sync1180'
+    assert first.get('gmail', 'me') == '1530'
+
+
+def test_processes_do_not_overwrite_each_other(tmp_path):
+    path = str(tmp_path / 'sync_state.json')
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_write_cursors, args=(path, namespace)) for namespace in ('calendar', 'gmail', 'meet')]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    store = SyncStateStore(path)
+    for namespace in ('calendar', 'gmail', 'meet'):
+        assert [store.get(namespace, f"key{i}") for i in range(5)] == [95, 96, 97, 98, 99]